@@ -1,26 +1,353 @@
-from fastapi import FastAPI, Depends
+import asyncio
+import logging
+import os
+import signal
+import threading
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+import orjson
+from fastapi import FastAPI, Depends, HTTPException, Query, Request
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
-from main import run_crew_task
+from main import run_crew, get_pooled_llm, load_llms, resolve_llm_name, resolve_pinned_llms
+from executor import ExecutorSaturatedError, get_crew_executor
+from config_loader import get_config_snapshot
+from providers import HealthMonitor, LLMUnavailableError, llm_health, make_llm_calls_thread_safe
+from storage.jobs import JobStore
+from storage.results import get_result_store
+from storage.semantic_cache import get_semantic_cache
 
-app = FastAPI()
+SHUTDOWN_DEFAULTS = {
+    "drain_seconds": 120,          # how long running crews may take after SIGTERM
+    "jobs_path": "data/jobs.db",   # unfinished requests for the next process
+}
+
+def run_crew_job(payload):
+    run = run_crew(payload["topic"], payload.get("llm_name"), payload.get("variables"))
+    store_result(run, payload.get("variables"))
+    return run
+
+def store_result(run, variables):
+    """Keep a fresh result for GET /results; a storage failure does not fail the crew"""
+    if run.cached:
+        # Already stored when it was first produced
+        return
+    store = get_result_store(get_config_snapshot().settings.get("results"))
+    if store is None:
+        return
+    try:
+        store.add(run.topic, run.llm_name, run.config_version, variables, build_crew_response(run).model_dump())
+    except Exception as e:
+        logging.error(f"Could not store the result for '{run.topic}': {str(e)}")
+
+def resume_jobs(executor, store, poll_seconds=1.0):
+    """
+    Queue the requests a previous process handed over while draining.
+    
+    Jobs are claimed only as workers free up, so a backlog larger than the
+    executor stays in the store instead of overflowing the queue, and the
+    queue is left for live requests. Returns the background thread feeding
+    the executor, or None when there is nothing to resume.
+    """
+    def log_failure(future, payload):
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            logging.error(f"Resumed crew for '{payload['topic']}' failed: {str(error)}")
+    
+    def resume():
+        resumed = 0
+        while not executor.draining:
+            stats = executor.stats()
+            free = stats["max_workers"] - stats["active"] - stats["queued"]
+            jobs = store.claim(free)
+            for position, payload in enumerate(jobs):
+                try:
+                    future = executor.submit(run_crew_job, payload, payload=payload)
+                except ExecutorSaturatedError:
+                    # Live requests got there first, or the executor drains;
+                    # keep the rest for later or for the next process
+                    for unsubmitted in jobs[position:]:
+                        store.add(unsubmitted)
+                    break
+                future.add_done_callback(lambda done, payload=payload: log_failure(done, payload))
+                resumed += 1
+            if free > 0 and not jobs:
+                break
+            time.sleep(poll_seconds)
+        if resumed:
+            logging.warning(f"Resumed {resumed} crews handed over by the previous process")
+    
+    if not len(store):
+        return None
+    thread = threading.Thread(target=resume, name="resume-jobs", daemon=True)
+    thread.start()
+    return thread
+
+def install_drain_handler(executor, store, drain_seconds):
+    """
+    Drain the executor on SIGTERM, then hand over to uvicorn's own handler.
+    
+    uvicorn stops accepting connections and waits for open requests; the
+    drain answers queued requests at once and running ones by the deadline.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        # Signal handlers can only be installed from the main thread
+        return
+    previous = signal.getsignal(signal.SIGTERM)
+    
+    def handle_sigterm(signum, frame):
+        if not executor.draining:
+            threading.Thread(
+                target=executor.drain,
+                args=(drain_seconds, store.add),
+                name="crew-drain",
+                daemon=True,
+            ).start()
+        if callable(previous):
+            previous(signum, frame)
+    
+    signal.signal(signal.SIGTERM, handle_sigterm)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Crews run on executor threads
+    make_llm_calls_thread_safe()
+    # Probe LLM backends in the background so get_llm can route around
+    # unhealthy ones; settings are read once at startup
+    settings = get_config_snapshot().settings
+    shutdown = {**SHUTDOWN_DEFAULTS, **(settings.get("shutdown") or {})}
+    executor = get_crew_executor(settings.get("executor"))
+    store = JobStore(shutdown["jobs_path"])
+    resume_jobs(executor, store)
+    install_drain_handler(executor, store, shutdown["drain_seconds"])
+    monitor = HealthMonitor(llm_health, load_llms, get_pooled_llm, settings.get("llm_health"))
+    if monitor.settings["enabled"]:
+        monitor.start()
+    yield
+    monitor.stop()
+    if executor.draining:
+        # Crews without an open request (resumed ones) may still be running
+        await asyncio.to_thread(executor.wait_drained, shutdown["drain_seconds"] + 5)
+    else:
+        # Shutdown without SIGTERM, e.g. Ctrl+C
+        await asyncio.to_thread(executor.drain, shutdown["drain_seconds"], store.add)
+    executor.shutdown()
+
+app = FastAPI(default_response_class=ORJSONResponse, lifespan=lifespan)
+
+# Compress large articles on the wire: "gzip" (default), "brotli" or "none".
+# Brotli needs the optional brotli-asgi package.
+RESPONSE_COMPRESSION = os.environ.get("RESPONSE_COMPRESSION", "gzip").lower()
+COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", "1024"))
+
+if RESPONSE_COMPRESSION == "brotli":
+    try:
+        from brotli_asgi import BrotliMiddleware
+    except ImportError:
+        raise ImportError("brotli-asgi is not installed. Please install it with `pip install brotli-asgi`.")
+    # Falls back to gzip for clients that do not accept br
+    app.add_middleware(BrotliMiddleware, minimum_size=COMPRESSION_MIN_SIZE, gzip_fallback=True)
+elif RESPONSE_COMPRESSION == "gzip":
+    app.add_middleware(GZipMiddleware, minimum_size=COMPRESSION_MIN_SIZE)
 
 # Define the request model with optional llm_name
 class TopicRequest(BaseModel):
     topic: str
     llm_name: str = None  # Optional parameter for LLM selection
+    variables: Dict[str, str] = {}  # Extra template variables beyond topic
+
+class TaskResult(BaseModel):
+    name: Optional[str] = None
+    agent: str
+    llm: Optional[str] = None  # Differs from the crew's llm for pinned agents and tasks
+    output: str
+    duration_seconds: Optional[float] = None
+
+class UsageResult(BaseModel):
+    total_tokens: int = 0
+    prompt_tokens: int = 0
+    cached_prompt_tokens: int = 0
+    completion_tokens: int = 0
+    successful_requests: int = 0
+
+class CrewResponse(BaseModel):
+    topic: str
+    llm: str
+    result: str
+    tasks: List[TaskResult]
+    duration_seconds: float
+    usage: UsageResult
+    cached: bool = False  # Served from the semantic topic cache
+
+class StoredResult(BaseModel):
+    id: int
+    topic: str
+    llm_name: str
+    config_version: Optional[str] = None
+    variables: Dict[str, str] = {}
+    created: float  # Unix time
+    response: CrewResponse
+
+class ResultPage(BaseModel):
+    results: List[StoredResult]
+    next_cursor: Optional[str] = None  # Pass as `cursor` for the next page
+
+def build_crew_response(run) -> CrewResponse:
+    """Flatten a CrewRun into plain, typed fields"""
+    tasks = [
+        TaskResult(
+            name=task_output.name,
+            agent=task_output.agent,
+            llm=run.task_llms.get(task_output.name),
+            output=task_output.raw,
+            duration_seconds=run.task_durations.get(task_output.name)
+        )
+        for task_output in run.output.tasks_output
+    ]
+    usage = run.output.token_usage
+    return CrewResponse(
+        topic=run.topic,
+        llm=run.llm_name,
+        result=run.output.raw,
+        tasks=tasks,
+        duration_seconds=run.duration,
+        usage=UsageResult(**usage.model_dump()) if usage else UsageResult(),
+        cached=run.cached
+    )
+
+@app.exception_handler(LLMUnavailableError)
+async def llm_unavailable_handler(request: Request, exc: LLMUnavailableError):
+    return ORJSONResponse(status_code=503, content={"detail": str(exc)})
 
-@app.post("/run-crew/")
+@app.exception_handler(ExecutorSaturatedError)
+async def executor_saturated_handler(request: Request, exc: ExecutorSaturatedError):
+    return ORJSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "5"})
+
+@app.post("/run-crew/", response_model=CrewResponse)
 async def execute_crew(request: TopicRequest):
     """Endpoint to trigger CrewAI execution with configurable LLM"""
-    result = run_crew_task(request.topic, request.llm_name)
-    return {"topic": request.topic, "llm": request.llm_name, "result": result}
+    # Crews block on LLM calls, so they run on the bounded worker pool
+    executor = get_crew_executor(get_config_snapshot().settings.get("executor"))
+    payload = {"topic": request.topic, "llm_name": request.llm_name, "variables": request.variables}
+    future = executor.submit(run_crew_job, payload, payload=payload)
+    run = await asyncio.wrap_future(future)
+    # Returning the response directly skips FastAPI's generic encoder;
+    # the model is already plain data that orjson serializes natively
+    return ORJSONResponse(build_crew_response(run).model_dump())
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Hit/miss counters of the semantic topic cache and its embedding cache"""
+    cache = get_semantic_cache(get_config_snapshot().settings.get("semantic_cache"))
+    if cache is None:
+        return {"enabled": False}
+    stats = {"enabled": True, **cache.stats()}
+    if hasattr(cache.embedder, "stats"):
+        stats["embeddings"] = cache.embedder.stats()
+    return stats
+
+def result_filters(
+    topic: Optional[str] = None,
+    llm_name: Optional[str] = None,
+    config_version: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+):
+    """Query parameters shared by the result listing and export; naive times are UTC"""
+    def timestamp(value):
+        if value is None:
+            return None
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    
+    return {
+        "topic": topic,
+        "llm_name": llm_name,
+        "config_version": config_version,
+        "since": timestamp(since),
+        "until": timestamp(until),
+    }
+
+def require_result_store():
+    store = get_result_store(get_config_snapshot().settings.get("results"))
+    if store is None:
+        raise HTTPException(status_code=404, detail="Result storage is disabled")
+    return store
+
+@app.get("/results", response_model=ResultPage)
+def list_results(
+    filters: dict = Depends(result_filters),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    store = Depends(require_result_store),
+):
+    """Stored crew results, newest first, one page at a time"""
+    try:
+        records, next_cursor = store.query(limit=limit, after=cursor, **filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return ORJSONResponse({"results": records, "next_cursor": next_cursor})
+
+@app.get("/results/export")
+def export_results(filters: dict = Depends(result_filters), store = Depends(require_result_store)):
+    """Every matching result as JSON lines, streamed as they are read"""
+    lines = (orjson.dumps(record) + b"\n" for record in store.export(**filters))
+    return StreamingResponse(lines, media_type="application/x-ndjson")
 
 # Simple health check endpoint
 @app.get("/health")
 async def health_check():
     return {"status": "ok"}
 
+READINESS_DEFAULTS = {
+    "max_saturation": 1.0,       # busy workers / max_workers
+    "max_queue_depth": 8,        # crews waiting for a worker
+    "require_healthy_llm": True,  # the default LLM (or a fallback) must be available
+}
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness for new traffic: 503 while saturated, backed up or without a healthy LLM"""
+    snapshot = get_config_snapshot()
+    settings = snapshot.settings
+    thresholds = {**READINESS_DEFAULTS, **(settings.get("readiness") or {})}
+    executor = get_crew_executor(settings.get("executor"))
+    stats = executor.stats()
+    
+    reasons = []
+    if stats["draining"]:
+        reasons.append("draining for shutdown")
+    if stats["saturation"] >= thresholds["max_saturation"]:
+        reasons.append(f"{stats['active']} of {stats['max_workers']} workers busy")
+    if stats["queued"] >= thresholds["max_queue_depth"]:
+        reasons.append(f"{stats['queued']} requests queued")
+    if thresholds["require_healthy_llm"]:
+        try:
+            resolve_llm_name()
+            # Pinned agents and tasks need their model (or a fallback) too
+            resolve_pinned_llms(snapshot)
+        except (LLMUnavailableError, ValueError) as e:
+            # ValueError: no default LLM, or a pin naming an unknown one
+            reasons.append(str(e))
+    
+    content = {"status": "not ready" if reasons else "ready", "reasons": reasons, "executor": stats}
+    return ORJSONResponse(status_code=503 if reasons else 200, content=content)
+
+@app.get("/health/llms")
+async def llm_health_check():
+    """Health and capability records of every configured LLM"""
+    records = llm_health.snapshot()
+    for name in load_llms():
+        records.setdefault(name, {"name": name, "status": "unknown"})
+    return records
+
 # Run the API: uvicorn api:app --host 0.0.0.0 --port 8000
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -1,23 +1,47 @@
 
 
 import argparse
+import ast
+import gc
 import importlib
-import inspect
+import importlib.util
+import itertools
+import json
+import linecache
+import math
 import os
 import pkgutil
+import re
+import sqlite3
 import sys
 import textwrap
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple, Union
+from typing import Any, Dict, Iterator, List, Optional, Set, TextIO, Tuple, Union
+
+# Extracted per file: {'classes': [...], 'functions': [...]} and import statements
+CodeBlocks = Dict[str, List[Dict[str, Any]]]
+Imports = List[Dict[str, Any]]
+
+# Below this many files a process pool costs more than it saves
+PARALLEL_MIN_FILES = 16
+
+# Parsed symbols and imports are kept here between runs (--index)
+DEFAULT_INDEX_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'package_explorer', 'index.db')
+
+# Parsed files written to the index per transaction
+INDEX_BATCH_SIZE = 64
 
 
 def get_installed_package_location(package_name: str) -> Optional[str]:
     """Find the installation location of a pip package."""
     try:
-        package = importlib.import_module(package_name)
-        package_path = os.path.dirname(inspect.getfile(package))
-        return package_path
-    except (ImportError, AttributeError) as e:
+        # find_spec locates the package without importing (and running) it
+        spec = importlib.util.find_spec(package_name)
+        if spec is None or not spec.origin:
+            raise ImportError(f"No module named '{package_name}'")
+        return os.path.dirname(spec.origin)
+    except (ImportError, AttributeError, ValueError) as e:
         print(f"Error: Package '{package_name}' not found or not properly installed. {e}")
         return None
 
@@ -42,75 +66,58 @@ def list_package_modules(package_name: str, package_path: str) -> List[str]:
     return modules
 
 
-def get_package_files(package_path: str, max_files: int = 20, focus_modules: List[str] = None) -> List[Tuple[str, str]]:
+def iter_package_files(package_path: str, focus_modules: List[str] = None) -> Iterator[Tuple[str, str]]:
     """
-    Get key Python files from the package directory.
-    Returns a list of (file_path, relative_path) tuples.
-    
-    Args:
-        package_path: Path to the package directory
-        max_files: Maximum number of files to return
-        focus_modules: Optional list of specific modules to prioritize (e.g., ['llm', 'utilities/llm_utils'])
+    Yield (file_path, relative_path) tuples for a package's Python files.
+
+    Focus modules come first, then the rest of the tree in sorted order.
+    The tree is walked lazily, so a consumer that stops early never visits
+    the remaining directories.
     """
-    python_files = []
     excluded_dirs = {'__pycache__', 'tests', 'examples', 'docs', 'test'}
     
     # Get the parent directory to calculate relative paths
     package_parent = os.path.dirname(package_path)
+    seen = set()
+    
+    def candidate(file_path):
+        if file_path in seen or not os.path.isfile(file_path):
+            return None
+        seen.add(file_path)
+        return (file_path, os.path.relpath(file_path, package_parent))
     
     # First, handle specific focus modules if provided
-    if focus_modules and len(focus_modules) > 0:
-        focused_files = []
-        for module in focus_modules:
-            # Try direct file match
-            file_path = os.path.join(package_path, f"{module}.py")
-            if os.path.isfile(file_path):
-                rel_path = os.path.relpath(file_path, package_parent)
-                focused_files.append((file_path, rel_path))
-            
-            # Try as directory with __init__.py
-            dir_path = os.path.join(package_path, module)
-            init_path = os.path.join(dir_path, "__init__.py")
-            if os.path.isfile(init_path):
-                rel_path = os.path.relpath(init_path, package_parent)
-                focused_files.append((init_path, rel_path))
-            
-            # Try with path separators
-            if '/' in module or '\\' in module:
-                file_path = os.path.join(package_path, module.replace('/', os.sep).replace('\\', os.sep) + '.py')
-                if os.path.isfile(file_path):
-                    rel_path = os.path.relpath(file_path, package_parent)
-                    focused_files.append((file_path, rel_path))
-        
-        # If we found specific files, return them first
-        python_files.extend(focused_files)
-        
-        # If we have enough files from focused modules, return early
-        if len(python_files) >= max_files:
-            return python_files[:max_files]
+    for module in focus_modules or []:
+        module_path = os.path.join(package_path, module.replace('/', os.sep).replace('\\', os.sep))
+        # Try direct file match, then as directory with __init__.py
+        for file_path in (module_path + '.py', os.path.join(module_path, '__init__.py')):
+            found = candidate(file_path)
+            if found:
+                yield found
     
     # Walk through the package directory for remaining files
     for root, dirs, files in os.walk(package_path):
-        # Skip excluded directories
-        dirs[:] = [d for d in dirs if d not in excluded_dirs]
+        # Skip excluded directories; sorting makes reports reproducible
+        dirs[:] = sorted(d for d in dirs if d not in excluded_dirs)
         
-        # Add Python files
-        for file in files:
+        for file in sorted(files):
             if file.endswith('.py'):
-                file_path = os.path.join(root, file)
-                rel_path = os.path.relpath(file_path, package_parent)
-                
-                # Skip if we already have this file from focus_modules
-                if any(existing_path == file_path for existing_path, _ in python_files):
-                    continue
-                
-                python_files.append((file_path, rel_path))
-                
-                # Respect max_files limit
-                if len(python_files) >= max_files:
-                    return python_files
+                found = candidate(os.path.join(root, file))
+                if found:
+                    yield found
+
+
+def get_package_files(package_path: str, max_files: int = 20, focus_modules: List[str] = None) -> List[Tuple[str, str]]:
+    """
+    Get key Python files from the package directory.
+    Returns a list of (file_path, relative_path) tuples.
     
-    return python_files
+    Args:
+        package_path: Path to the package directory
+        max_files: Maximum number of files to return
+        focus_modules: Optional list of specific modules to prioritize (e.g., ['llm', 'utilities/llm_utils'])
+    """
+    return list(itertools.islice(iter_package_files(package_path, focus_modules), max_files))
 
 
 def read_file_content(file_path: str) -> Optional[str]:
@@ -123,83 +130,504 @@ def read_file_content(file_path: str) -> Optional[str]:
         return f"Error reading file: {e}"
 
 
-def extract_key_classes_functions(content: str) -> Dict[str, List[str]]:
+# Statement fields holding nested blocks (if/for/while/with/try bodies)
+_BLOCK_FIELDS = ('body', 'orelse', 'finalbody')
+
+
+def _format_arguments(args: ast.arguments) -> str:
+    try:
+        return ast.unparse(args)
+    except Exception:
+        return '...'
+
+
+def _definition_header(node: ast.AST) -> str:
+    """Rebuild a one-line header such as `@classmethod def f(a: int) -> str:`"""
+    decorators = ''.join(f"@{ast.unparse(decorator)} " for decorator in node.decorator_list)
+    if isinstance(node, ast.ClassDef):
+        bases = [ast.unparse(base) for base in node.bases]
+        bases += [ast.unparse(keyword) for keyword in node.keywords]
+        return f"{decorators}class {node.name}({', '.join(bases)}):" if bases else f"{decorators}class {node.name}:"
+    prefix = 'async def' if isinstance(node, ast.AsyncFunctionDef) else 'def'
+    returns = f" -> {ast.unparse(node.returns)}" if node.returns else ''
+    return f"{decorators}{prefix} {node.name}({_format_arguments(node.args)}){returns}:"
+
+
+def _symbol(node: ast.AST, qualname: str) -> Dict[str, Any]:
+    return {
+        'name': node.name,
+        'qualname': qualname,
+        'kind': 'class' if isinstance(node, ast.ClassDef) else 'function',
+        'header': _definition_header(node),
+        'lineno': node.lineno,
+        'end_lineno': getattr(node, 'end_lineno', node.lineno),
+        'docstring': ast.get_docstring(node) or '',
+        'methods': [],
+    }
+
+
+def parse_source(content: str) -> Optional[ast.Module]:
+    """Parse Python source, returning None when the running Python cannot"""
+    # AST nodes hold no reference cycles; pausing the cyclic GC while a
+    # large tree is built avoids repeated full collections
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return ast.parse(content)
+    except (SyntaxError, ValueError):
+        return None
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def extract_key_classes_functions(content: str, tree: Optional[ast.Module] = None) -> Dict[str, List[Dict[str, Any]]]:
     """
     Extract class and function definitions from Python content.
     Returns a dictionary with 'classes' and 'functions' keys.
+    
+    Definitions are found with the ast module, so decorated, async and
+    nested definitions are included: methods are listed under their class,
+    and classes or functions defined inside functions appear with a
+    qualified name such as `outer.<locals>.helper`.
     """
-    lines = content.split('\n')
+    tree = tree or parse_source(content)
+    if tree is None:
+        return _scan_definitions(content)
+    
     classes = []
     functions = []
-    current_block = []
-    in_class = False
-    in_function = False
+    definitions = (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)
     
-    for i, line in enumerate(lines):
-        stripped = line.strip()
-        
-        # Check for class definition
-        if stripped.startswith('class ') and not in_class and not in_function:
-            in_class = True
-            current_block = [line]
-        
-        # Check for function definition outside of a class
-        elif stripped.startswith('def ') and not in_class and not in_function:
-            in_function = True
-            current_block = [line]
-        
-        # Add line to current block
-        elif (in_class or in_function) and current_block:
-            current_block.append(line)
-            
-            # Check for end of block (unindented line)
-            if (i < len(lines) - 1 and 
-                lines[i+1].strip() and 
-                not lines[i+1].startswith(' ') and 
-                not lines[i+1].startswith('\t')):
-                
-                block_content = '\n'.join(current_block)
-                if in_class:
-                    classes.append(block_content)
-                    in_class = False
+    def visit(statements: List[ast.stmt], prefix: str, owner: Optional[Dict[str, Any]]) -> None:
+        for node in statements:
+            if isinstance(node, definitions):
+                qualname = f"{prefix}{node.name}"
+                symbol = _symbol(node, qualname)
+                if isinstance(node, ast.ClassDef):
+                    classes.append(symbol)
+                    visit(node.body, f"{qualname}.", symbol)
                 else:
-                    functions.append(block_content)
-                    in_function = False
-                current_block = []
-    
-    # Handle last block
-    if current_block:
-        block_content = '\n'.join(current_block)
-        if in_class:
-            classes.append(block_content)
-        elif in_function:
-            functions.append(block_content)
-            
+                    if owner is not None:
+                        owner['methods'].append(symbol)
+                    else:
+                        functions.append(symbol)
+                    visit(node.body, f"{qualname}.<locals>.", None)
+                continue
+            # Definitions under if/try/with/for blocks still belong to this
+            # scope; simple statements cannot contain definitions
+            for field in _BLOCK_FIELDS:
+                block = getattr(node, field, None)
+                if block:
+                    visit(block, prefix, owner)
+            for handler in getattr(node, 'handlers', None) or []:
+                visit(handler.body, prefix, owner)
+            for case in getattr(node, 'cases', None) or []:
+                visit(case.body, prefix, owner)
+    
+    visit(tree.body, '', None)
     return {
         'classes': classes,
         'functions': functions
     }
 
 
-def analyze_imports(files_content: Dict[str, str]) -> Set[str]:
-    """Analyze imports across all files to identify dependencies."""
+def _scan_definitions(content: str) -> Dict[str, List[Dict[str, Any]]]:
+    """Line-based fallback for files the running Python cannot parse"""
+    classes = []
+    functions = []
+    for lineno, line in enumerate(content.split('\n'), 1):
+        stripped = line.strip()
+        if line[:1] in (' ', '\t'):
+            continue
+        if stripped.startswith('class ') or stripped.startswith('def '):
+            kind = 'class' if stripped.startswith('class ') else 'function'
+            name = stripped.split()[1].split('(')[0].rstrip(':')
+            symbol = {
+                'name': name,
+                'qualname': name,
+                'kind': kind,
+                'header': stripped,
+                'lineno': lineno,
+                'end_lineno': lineno,
+                'docstring': '',
+                'methods': [],
+            }
+            (classes if kind == 'class' else functions).append(symbol)
+    return {
+        'classes': classes,
+        'functions': functions
+    }
+
+
+def _is_type_checking(test: ast.expr) -> bool:
+    """`if TYPE_CHECKING:` or `if typing.TYPE_CHECKING:`"""
+    return (isinstance(test, ast.Name) and test.id == 'TYPE_CHECKING') or \
+        (isinstance(test, ast.Attribute) and test.attr == 'TYPE_CHECKING')
+
+
+def extract_imports(content: str, tree: Optional[ast.Module] = None) -> Imports:
+    """
+    List the import statements of a file, in source order.
+    
+    Each import is a dict with the imported `module` (relative imports keep
+    their leading dots, e.g. `..utils`), the `names` taken from it by
+    `from ... import`, its `lineno`, and `runtime`: False for imports that
+    do not run when the module is imported (inside functions or under
+    `if TYPE_CHECKING:`).
+    """
+    tree = tree or parse_source(content)
+    if tree is None:
+        return _scan_imports(content)
+    
+    imports = []
+    
+    def visit(statements: List[ast.stmt], runtime: bool) -> None:
+        for node in statements:
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    imports.append({'module': alias.name, 'names': [], 'lineno': node.lineno, 'runtime': runtime})
+            elif isinstance(node, ast.ImportFrom):
+                imports.append({
+                    'module': '.' * node.level + (node.module or ''),
+                    'names': [alias.name for alias in node.names],
+                    'lineno': node.lineno,
+                    'runtime': runtime,
+                })
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                visit(node.body, False)
+            elif isinstance(node, ast.If) and _is_type_checking(node.test):
+                visit(node.body, False)
+                visit(node.orelse, runtime)
+            else:
+                for field in _BLOCK_FIELDS:
+                    visit(getattr(node, field, None) or [], runtime)
+                for handler in getattr(node, 'handlers', None) or []:
+                    visit(handler.body, runtime)
+                for case in getattr(node, 'cases', None) or []:
+                    visit(case.body, runtime)
+    
+    visit(tree.body, True)
+    return imports
+
+
+def _scan_imports(content: str) -> Imports:
+    """Line-based fallback for files the running Python cannot parse"""
+    imports = []
+    for lineno, line in enumerate(content.split('\n'), 1):
+        parts = line.strip().split()
+        if len(parts) > 1 and parts[0] in ('import', 'from'):
+            imports.append({'module': parts[1].rstrip(','), 'names': [], 'lineno': lineno, 'runtime': True})
+    return imports
+
+
+def analyze_file(file_path: str) -> Tuple[str, CodeBlocks, Imports]:
+    """
+    Read and parse one file; runs in worker processes.
+
+    Returns:
+        (content, code_blocks, imports)
+    """
+    content = read_file_content(file_path)
+    if not content:
+        return content, {'classes': [], 'functions': []}, []
+    tree = parse_source(content)
+    return content, extract_key_classes_functions(content, tree), extract_imports(content, tree)
+
+
+def analyze_files(file_paths: List[str], workers: Optional[int] = None) -> Iterator[Tuple[str, CodeBlocks, Imports]]:
+    """
+    Analyze files across a process pool, yielding results in input order.
+
+    Args:
+        file_paths: Files to read and parse
+        workers: Number of worker processes; 1 analyzes in this process
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(file_paths) < PARALLEL_MIN_FILES:
+        yield from map(analyze_file, file_paths)
+        return
+    
+    chunksize = max(1, len(file_paths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(analyze_file, file_paths, chunksize=chunksize)
+
+
+# Postings weights: a hit on a definition name outranks one in a
+# docstring, which outranks a plain source line
+SEARCH_FIELDS = {'symbol': 8.0, 'docstring': 3.0, 'line': 1.0}
+_FIELD_IDS = {field: number for number, field in enumerate(SEARCH_FIELDS)}
+_WORD = re.compile(r'[A-Za-z0-9]+')
+_WORD_PART = re.compile(r'[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|[0-9]+')
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase search terms.
+
+    Identifiers are broken at underscores and case changes, so
+    `GEMINI_API_KEY`, `gemini_api_key` and `GeminiApiKey` all produce
+    gemini, api and key. Single characters are dropped.
+    """
+    terms = []
+    for word in _WORD.findall(text):
+        for part in _WORD_PART.findall(word):
+            if len(part) > 1:
+                terms.append(part.lower())
+    return terms
+
+
+def _postings(content: str, code_blocks: Dict[str, List[Dict[str, Any]]]) -> Set[Tuple[str, int, int]]:
+    """(term, lineno, field id) entries for one file"""
+    postings = set()
+    line_field = _FIELD_IDS['line']
+    for lineno, line in enumerate(content.split('\n'), 1):
+        for term in tokenize(line):
+            postings.add((term, lineno, line_field))
+    
+    symbols = list(code_blocks['classes']) + list(code_blocks['functions'])
+    symbols += [method for class_def in code_blocks['classes'] for method in class_def['methods']]
+    for symbol in symbols:
+        for term in tokenize(symbol['name']):
+            postings.add((term, symbol['lineno'], _FIELD_IDS['symbol']))
+        for term in tokenize(symbol['docstring']):
+            postings.add((term, symbol['lineno'], _FIELD_IDS['docstring']))
+    return postings
+
+
+class PackageIndex:
+    """
+    SQLite cache of extracted symbols and imports per file, with an
+    inverted index over symbol names, docstrings and source lines.
+
+    Rows are keyed by absolute file path and remember the file's mtime and
+    size when it was parsed; a file whose stat no longer matches is parsed
+    again. Bump SCHEMA_VERSION whenever the shape of the extracted data
+    changes so older indexes are rebuilt.
+    """
+    
+    SCHEMA_VERSION = 3
+    
+    def __init__(self, path: str = DEFAULT_INDEX_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30)
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != self.SCHEMA_VERSION:
+            self._conn.execute("DROP TABLE IF EXISTS postings")
+            self._conn.execute("DROP TABLE IF EXISTS files")
+            self._conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS files (
+                id INTEGER PRIMARY KEY,
+                path TEXT UNIQUE,
+                mtime_ns INTEGER,
+                size INTEGER,
+                lines INTEGER,
+                symbols TEXT,
+                imports TEXT
+            );
+            CREATE TABLE IF NOT EXISTS postings (
+                term TEXT,
+                file_id INTEGER,
+                lineno INTEGER,
+                field INTEGER,
+                PRIMARY KEY (term, file_id, lineno, field)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS postings_file ON postings (file_id);
+            """
+        )
+        self._conn.commit()
+    
+    @staticmethod
+    def stat(file_path: str) -> Optional[Tuple[int, int]]:
+        """(mtime_ns, size) of a file, or None when it cannot be read"""
+        try:
+            result = os.stat(file_path)
+        except OSError:
+            return None
+        return result.st_mtime_ns, result.st_size
+    
+    def lookup(self, file_paths: List[str]) -> Tuple[Dict[str, Tuple[CodeBlocks, Imports]], Dict[str, Tuple[int, int]]]:
+        """
+        Split files into indexed and stale ones
+        
+        Args:
+            file_paths: Files about to be analyzed
+            
+        Returns:
+            ({path: (code_blocks, imports)} for unchanged files,
+             {path: (mtime_ns, size)} for files that need parsing)
+        """
+        fresh = {}
+        stale = {}
+        rows = {}
+        # Stay under SQLite's bound parameter limit
+        for start in range(0, len(file_paths), 500):
+            batch = file_paths[start:start + 500]
+            placeholders = ', '.join('?' * len(batch))
+            query = f"SELECT path, mtime_ns, size, symbols, imports FROM files WHERE path IN ({placeholders})"
+            for path, mtime_ns, size, symbols, imports in self._conn.execute(query, batch):
+                rows[path] = ((mtime_ns, size), symbols, imports)
+        
+        for file_path in file_paths:
+            # Stat before the file is read, so an edit racing with parsing
+            # leaves a stale stamp and the file is parsed again next run
+            stamp = self.stat(file_path)
+            row = rows.get(file_path)
+            if row is not None and stamp == row[0]:
+                fresh[file_path] = (json.loads(row[1]), json.loads(row[2]))
+            elif stamp is not None:
+                stale[file_path] = stamp
+        return fresh, stale
+    
+    def store(self, entries: List[Tuple[str, Tuple[int, int], str, CodeBlocks, Imports]]) -> None:
+        """Record (path, (mtime_ns, size), content, code_blocks, imports) entries"""
+        with self._conn:
+            for path, (mtime_ns, size), content, code_blocks, imports in entries:
+                file_id = self._conn.execute(
+                    """
+                    INSERT INTO files (path, mtime_ns, size, lines, symbols, imports) VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (path) DO UPDATE SET
+                        mtime_ns = excluded.mtime_ns, size = excluded.size, lines = excluded.lines,
+                        symbols = excluded.symbols, imports = excluded.imports
+                    RETURNING id
+                    """,
+                    (path, mtime_ns, size, content.count('\n') + 1, json.dumps(code_blocks), json.dumps(imports))
+                ).fetchone()[0]
+                self._conn.execute("DELETE FROM postings WHERE file_id = ?", (file_id,))
+                self._conn.executemany(
+                    "INSERT INTO postings (term, file_id, lineno, field) VALUES (?, ?, ?, ?)",
+                    [(term, file_id, lineno, field) for term, lineno, field in _postings(content, code_blocks)]
+                )
+    
+    def prune(self, root: str, keep: List[str]) -> int:
+        """Forget files under root that are not in keep, e.g. deleted ones"""
+        keep = set(keep)
+        prefix = os.path.join(root, '')
+        rows = self._conn.execute(
+            "SELECT id, path FROM files WHERE substr(path, 1, ?) = ?", (len(prefix), prefix)
+        ).fetchall()
+        removed = [(file_id,) for file_id, path in rows if path not in keep]
+        with self._conn:
+            self._conn.executemany("DELETE FROM postings WHERE file_id = ?", removed)
+            self._conn.executemany("DELETE FROM files WHERE id = ?", removed)
+        return len(removed)
+    
+    def search(self, query: str, root: str, limit: int = 20, paths: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Rank lines under root that match the query terms
+        
+        Lines matching more of the query terms rank first; ties are broken
+        by where the terms matched (definition name, docstring, source
+        line) and how rare they are across the indexed lines.
+        
+        Args:
+            query: Free text; split into terms like indexed text
+            root: Only files below this directory are searched
+            limit: Maximum number of matches
+            paths: Only these files are searched (default: every indexed file under root)
+            
+        Returns:
+            [{"path": ..., "lineno": ..., "field": ..., "score": ..., "terms": [...]}, ...]
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        prefix = os.path.join(root, '')
+        selected = set(paths) if paths is not None else None
+        files = {
+            file_id: (path, lines)
+            for file_id, path, lines in self._conn.execute(
+                "SELECT id, path, lines FROM files WHERE substr(path, 1, ?) = ?", (len(prefix), prefix)
+            )
+            if selected is None or path in selected
+        }
+        total_lines = sum(lines for _, lines in files.values()) or 1
+        
+        placeholders = ', '.join('?' * len(terms))
+        matches = {}
+        frequency = {term: set() for term in terms}
+        rows = self._conn.execute(
+            f"SELECT term, file_id, lineno, field FROM postings WHERE term IN ({placeholders})", terms
+        )
+        for term, file_id, lineno, field in rows:
+            if file_id not in files:
+                continue
+            location = (file_id, lineno)
+            frequency[term].add(location)
+            # Field ids are ordered by weight; keep each term's best field
+            match = matches.setdefault(location, {})
+            match[term] = min(match.get(term, field), field)
+        
+        weights = list(SEARCH_FIELDS.values())
+        names = list(SEARCH_FIELDS)
+        idf = {term: math.log(1 + total_lines / (1 + len(locations))) for term, locations in frequency.items()}
+        ranked = []
+        for (file_id, lineno), match in matches.items():
+            score = sum(weights[field] * idf[term] for term, field in match.items())
+            ranked.append((len(match), score, files[file_id][0], lineno, match))
+        ranked.sort(key=lambda item: (-item[0], -item[1], item[2], item[3]))
+        
+        return [
+            {
+                'path': path,
+                'lineno': lineno,
+                'field': names[min(match.values())],
+                'score': round(score, 3),
+                'terms': sorted(match),
+            }
+            for _, score, path, lineno, match in ranked[:limit]
+        ]
+    
+    def close(self) -> None:
+        self._conn.close()
+
+
+def update_index(
+    index: 'PackageIndex',
+    files: List[Tuple[str, str]],
+    workers: Optional[int] = None
+) -> Tuple[Dict[str, Tuple[CodeBlocks, Imports]], Dict[str, Tuple[CodeBlocks, Imports]]]:
+    """
+    Parse the files that changed since they were indexed
+    
+    Parsed files are stored in batches as they arrive, so sources are not
+    held in memory beyond one batch.
+    
+    Returns:
+        ({path: (code_blocks, imports)} served from the index,
+         {path: (code_blocks, imports)} parsed in this run)
+    """
+    indexed, stale = index.lookup([file_path for file_path, _ in files])
+    parsed = {}
+    batch = []
+    for file_path, (content, code_blocks, imports) in zip(stale, analyze_files(list(stale), workers)):
+        parsed[file_path] = (code_blocks, imports)
+        batch.append((file_path, stale[file_path], content, code_blocks, imports))
+        if len(batch) >= INDEX_BATCH_SIZE:
+            index.store(batch)
+            batch = []
+    index.store(batch)
+    return indexed, parsed
+
+
+def analyze_imports(files_imports: Dict[str, Imports]) -> Set[str]:
+    """Collect the external top-level packages imported across all files."""
     imports = set()
     
-    for content in files_content.values():
-        lines = content.split('\n')
-        for line in lines:
-            stripped = line.strip()
-            if stripped.startswith('import ') or stripped.startswith('from '):
-                # Extract the main package being imported
-                parts = stripped.split()
-                if stripped.startswith('import '):
-                    pkg = parts[1].split('.')[0]
-                else:  # from ... import ...
-                    pkg = parts[1].split('.')[0]
-                
-                # Exclude standard library modules
-                if not is_stdlib_module(pkg):
-                    imports.add(pkg)
+    for file_imports in files_imports.values():
+        for entry in file_imports:
+            # Relative imports stay inside the package
+            if entry['module'].startswith('.'):
+                continue
+            pkg = entry['module'].split('.')[0]
+            # Exclude standard library modules
+            if not is_stdlib_module(pkg):
+                imports.add(pkg)
     
     return imports
 
@@ -210,86 +638,276 @@ def is_stdlib_module(module_name: str) -> bool:
     return module_name in stdlib_modules
 
 
+def module_name(rel_path: str) -> Tuple[str, bool]:
+    """
+    Dotted module name of a file relative to the package's parent directory
+    
+    Returns:
+        (name, is_package): `crewai/llm.py` gives ('crewai.llm', False) and
+        `crewai/tools/__init__.py` gives ('crewai.tools', True)
+    """
+    parts = list(Path(rel_path).with_suffix('').parts)
+    is_package = parts[-1] == '__init__'
+    if is_package:
+        parts = parts[:-1]
+    return '.'.join(parts), is_package
+
+
+def resolve_import(importer: str, is_package: bool, module: str) -> Optional[str]:
+    """
+    Absolute name of an imported module
+    
+    Relative imports are resolved against the importing module the way the
+    import system does: one dot is the importer's own package. Returns None
+    for relative imports that climb above the top-level package.
+    """
+    level = len(module) - len(module.lstrip('.'))
+    if not level:
+        return module
+    package = importer.split('.') if is_package else importer.split('.')[:-1]
+    if level - 1 >= len(package):
+        return None
+    base = package[:len(package) - (level - 1)]
+    rest = module[level:]
+    return '.'.join(base + [rest]) if rest else '.'.join(base)
+
+
+def parse_importtime_log(text: str) -> Dict[str, Dict[str, int]]:
+    """
+    Read the stderr of `python -X importtime -c "import pkg"`
+    
+    Returns:
+        {module: {"self_us": ..., "cumulative_us": ...}}; a module imported
+        more than once (subinterpreters, reloads) keeps its first entry
+    """
+    timings = {}
+    for line in text.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3:
+            continue
+        try:
+            self_us, cumulative_us = int(fields[0]), int(fields[1])
+        except ValueError:
+            # The header line: "self [us] | cumulative | imported package"
+            continue
+        timings.setdefault(fields[2].strip(), {'self_us': self_us, 'cumulative_us': cumulative_us})
+    return timings
+
+
+def build_import_graph(
+    files: List[Tuple[str, Imports]],
+    timings: Optional[Dict[str, Dict[str, int]]] = None
+) -> Dict[str, Any]:
+    """
+    Build a module-level import graph of a package
+    
+    Every analyzed file is a node named by its module. Imports of other
+    modules in the package become edges to them (`from . import sibling`
+    points at the submodule when it exists, otherwise at the package);
+    imports of anything else point at a node for the top-level package,
+    marked "stdlib" or "external". Edges merge repeated imports between two
+    modules, keep their line numbers and are "runtime" when at least one
+    of them runs at import time.
+    
+    Args:
+        files: (relative_path, imports) per file, as returned by extract_imports
+        timings: Optional parse_importtime_log output; matching nodes get
+            self_us and cumulative_us
+        
+    Returns:
+        {"nodes": [...], "edges": [...]} sorted by name
+    """
+    modules = {}
+    for rel_path, _ in files:
+        name, is_package = module_name(rel_path)
+        modules[name] = (rel_path, is_package)
+    internal_roots = {name.split('.')[0] for name in modules}
+    
+    nodes = {
+        name: {'id': name, 'kind': 'module', 'path': rel_path}
+        for name, (rel_path, _) in modules.items()
+    }
+    edges = {}
+    
+    def target_node(target: str) -> str:
+        root = target.split('.')[0]
+        if root not in internal_roots:
+            nodes.setdefault(root, {'id': root, 'kind': 'stdlib' if is_stdlib_module(root) else 'external'})
+            return root
+        # Attribute imports and modules outside the analyzed files point at
+        # the closest analyzed ancestor
+        parts = target.split('.')
+        while len(parts) > 1 and '.'.join(parts) not in modules:
+            parts.pop()
+        name = '.'.join(parts)
+        nodes.setdefault(name, {'id': name, 'kind': 'module', 'path': None})
+        return name
+    
+    for rel_path, imports in files:
+        source, is_package = module_name(rel_path)
+        for entry in imports:
+            target = resolve_import(source, is_package, entry['module'])
+            if target is None:
+                continue
+            # `from pkg import sub` imports the submodule; names that are
+            # not analyzed modules are attributes of the imported module
+            submodules = [f"{target}.{name}" for name in entry['names'] if f"{target}.{name}" in modules]
+            if len(submodules) < len(entry['names']) or not entry['names']:
+                submodules.append(target)
+            for name in dict.fromkeys(target_node(module) for module in submodules):
+                if name == source:
+                    continue
+                edge = edges.setdefault((source, name), {'source': source, 'target': name, 'lines': [], 'runtime': False})
+                edge['lines'].append(entry['lineno'])
+                edge['runtime'] = edge['runtime'] or entry['runtime']
+    
+    for edge in edges.values():
+        nodes[edge['source']]['imports'] = nodes[edge['source']].get('imports', 0) + 1
+        nodes[edge['target']]['imported_by'] = nodes[edge['target']].get('imported_by', 0) + 1
+    for name, node in nodes.items():
+        node.setdefault('imports', 0)
+        node.setdefault('imported_by', 0)
+        if timings and name in timings:
+            node.update(timings[name])
+    
+    return {
+        'nodes': [nodes[name] for name in sorted(nodes)],
+        'edges': [edges[key] for key in sorted(edges)],
+    }
+
+
+def format_graph_dot(graph: Dict[str, Any]) -> str:
+    """Render an import graph as Graphviz DOT; deferred imports are dashed"""
+    lines = [
+        'digraph imports {',
+        '  rankdir=LR;',
+        '  node [shape=box, fontsize=10];',
+    ]
+    for node in graph['nodes']:
+        label = node['id']
+        if 'cumulative_us' in node:
+            label += f"\\n{node['cumulative_us'] / 1000:.1f} ms"
+        style = ', style=filled, fillcolor=lightgrey' if node['kind'] != 'module' else ''
+        lines.append(f'  "{node["id"]}" [label="{label}"{style}];')
+    for edge in graph['edges']:
+        style = '' if edge['runtime'] else ' [style=dashed]'
+        lines.append(f'  "{edge["source"]}" -> "{edge["target"]}"{style};')
+    lines.append('}')
+    return '\n'.join(lines)
+
+
+def _qualifier(symbol: Dict[str, Any]) -> str:
+    """Name nested definitions by where they live"""
+    return f" (in `{symbol['qualname']}`)" if symbol['qualname'] != symbol['name'] else ''
+
+
 def generate_report(
     package_name: str, 
     package_path: str, 
-    files_data: List[Tuple[str, str, str, Dict[str, List[str]]]], 
-    dependencies: Set[str]
-) -> str:
+    files_data: List[Tuple[str, str, Dict[str, List[Dict[str, Any]]]]], 
+    dependencies: Set[str],
+    include_source: bool = True
+) -> Iterator[str]:
     """
-    Generate a comprehensive report about the package.
+    Generate a comprehensive report about the package, one line at a time.
+    
+    Sources are read from disk only while their section is written, so a
+    consumer that streams the lines out holds one file at a time.
     
     For CrewAI and Gemini integration specifically, this will focus on:
     - How LLM class works with different model providers
     - Environment variable configuration
     - Model name formatting requirements
-    """
-    report = []
     
+    Args:
+        files_data: (file_path, relative_path, code_blocks) per file
+        include_source: Append the full source of every file
+    """
     # Package information
-    report.append(f"# Package Analysis: {package_name}")
-    report.append(f"\nInstallation path: {package_path}")
+    yield f"# Package Analysis: {package_name}"
+    yield f"\nInstallation path: {package_path}"
     
     # Dependencies
-    report.append("\n## External Dependencies")
+    yield "\n## External Dependencies"
     if dependencies:
-        report.append("\nThis package depends on:")
+        yield "\nThis package depends on:"
         for dep in sorted(dependencies):
-            report.append(f"- {dep}")
+            yield f"- {dep}"
     else:
-        report.append("\nNo external dependencies found.")
+        yield "\nNo external dependencies found."
     
     # Files analysis
-    report.append("\n## Key Files Analysis")
+    yield "\n## Key Files Analysis"
     
-    for file_path, rel_path, _, code_blocks in files_data:
-        report.append(f"\n### {rel_path}")
+    for file_path, rel_path, code_blocks in files_data:
+        yield f"\n### {rel_path}"
         
-        # Classes
+        # Classes, with their methods
         if code_blocks['classes']:
-            report.append("\n#### Classes:")
+            yield "\n#### Classes:"
             for i, class_def in enumerate(code_blocks['classes']):
-                # Extract just the class definition line
-                class_header = class_def.split('\n')[0]
-                report.append(f"{i+1}. `{class_header}`")
+                yield f"{i+1}. `{class_def['header']}`" + _qualifier(class_def)
+                for method in class_def['methods']:
+                    yield f"   - `{method['header']}`"
         
         # Functions
         if code_blocks['functions']:
-            report.append("\n#### Functions:")
+            yield "\n#### Functions:"
             for i, func_def in enumerate(code_blocks['functions']):
-                # Extract just the function definition line
-                func_header = func_def.split('\n')[0]
-                report.append(f"{i+1}. `{func_header}`")
+                yield f"{i+1}. `{func_def['header']}`" + _qualifier(func_def)
     
-    # Detailed code section
-    report.append("\n## Detailed Source Code")
+    if not include_source:
+        return
     
-    for file_path, rel_path, content, _ in files_data:
-        report.append(f"\n### {rel_path}")
-        report.append("```python")
-        report.append(content)
-        report.append("```")
+    # Detailed code section
+    yield "\n## Detailed Source Code"
     
-    return '\n'.join(report)
+    for file_path, rel_path, _ in files_data:
+        yield f"\n### {rel_path}"
+        yield "```python"
+        yield read_file_content(file_path)
+        yield "```"
+
+
+def write_report(lines: Iterator[str], stream: TextIO) -> None:
+    """Write report lines as they are generated, without a trailing newline"""
+    for i, line in enumerate(lines):
+        if i:
+            stream.write('\n')
+        stream.write(line)
 
 
-def explore_package(package_name: str, max_files: int = 20, output_file: Optional[str] = None, focus_modules: List[str] = None) -> str:
+def explore_package(
+    package_name: str,
+    max_files: int = 20,
+    output_file: Optional[str] = None,
+    focus_modules: List[str] = None,
+    workers: Optional[int] = None,
+    index_path: Optional[str] = DEFAULT_INDEX_PATH,
+    include_source: bool = True
+) -> bool:
     """
-    Main function to explore a package and generate a report.
+    Main function to explore a package and stream a report.
     
     Args:
         package_name: Name of the pip package to analyze
         max_files: Maximum number of files to analyze (default: 20)
-        output_file: Optional file path to save the report
+        output_file: File path to write the report to (default: stdout)
         focus_modules: Optional list of specific modules to focus on
+        workers: Processes used to parse files (default: one per CPU)
+        index_path: SQLite index of parsed files reused across runs; None parses everything
+        include_source: Append the full source of every file
         
     Returns:
-        A string containing the analysis report
+        Whether a report was written
     """
     # Find package location
     package_path = get_installed_package_location(package_name)
     if not package_path:
-        return f"Error: Could not find package '{package_name}'"
+        print(f"Error: Could not find package '{package_name}'")
+        return False
     
     print(f"Analyzing package: {package_name}")
     print(f"Package location: {package_path}")
@@ -298,78 +916,214 @@ def explore_package(package_name: str, max_files: int = 20, output_file: Optiona
     files = get_package_files(package_path, max_files, focus_modules)
     
     if not files:
-        return f"Error: Could not find Python files in package '{package_name}'"
+        print(f"Error: Could not find Python files in package '{package_name}'")
+        return False
     
     print(f"Found {len(files)} Python files")
     
-    # Read file contents
+    # Only files that changed since the last run are parsed again
+    if index_path:
+        index = PackageIndex(index_path)
+        indexed, parsed = update_index(index, files, workers)
+        index.close()
+        print(f"Parsed {len(parsed)} changed files, {len(indexed)} from index")
+    else:
+        file_paths = [file_path for file_path, _ in files]
+        results = analyze_files(file_paths, workers)
+        indexed, parsed = {}, {file_path: (code_blocks, imports) for file_path, (_, code_blocks, imports) in zip(file_paths, results)}
+    
+    # Keep symbols and imports; sources are read again while writing
     files_data = []
-    files_content = {}
+    files_imports = {}
     
     for file_path, rel_path in files:
-        content = read_file_content(file_path)
-        if content:
-            code_blocks = extract_key_classes_functions(content)
-            files_data.append((file_path, rel_path, content, code_blocks))
-            files_content[rel_path] = content
+        result = indexed.get(file_path) or parsed.get(file_path)
+        # Empty files (such as bare __init__.py) have nothing to report
+        if result is None or not os.path.getsize(file_path):
+            continue
+        code_blocks, imports = result
+        files_data.append((file_path, rel_path, code_blocks))
+        files_imports[rel_path] = imports
     
     # Analyze dependencies
-    dependencies = analyze_imports(files_content)
-    
-    # Generate report
-    report = generate_report(package_name, package_path, files_data, dependencies)
+    dependencies = analyze_imports(files_imports)
     
-    # Save to file if requested
+    # Stream the report to the output file or stdout
+    lines = generate_report(package_name, package_path, files_data, dependencies, include_source)
     if output_file:
         try:
             with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(report)
+                write_report(lines, f)
             print(f"Report saved to: {output_file}")
         except Exception as e:
             print(f"Error saving report: {e}")
+            return False
+    else:
+        print("\n" + "=" * 80)
+        write_report(lines, sys.stdout)
+        print()
+    
+    return True
+
+
+def search_package(
+    package_name: str,
+    query: str,
+    limit: int = 20,
+    max_files: Optional[int] = None,
+    focus_modules: List[str] = None,
+    workers: Optional[int] = None,
+    index_path: Optional[str] = DEFAULT_INDEX_PATH
+) -> List[Dict[str, Any]]:
+    """
+    Search a package's symbols, docstrings and source lines without building a report.
+    
+    Args:
+        package_name: Name of the pip package to search
+        query: Search terms (case insensitive; identifiers match by their parts)
+        limit: Maximum number of matches
+        max_files: Only index this many files (default: the whole package)
+        focus_modules: Optional list of specific modules to index first
+        workers: Processes used to parse changed files (default: one per CPU)
+        index_path: SQLite index reused across runs; None builds a throwaway one in memory
+        
+    Returns:
+        Ranked matches with "location" (relative_path:line) and "text" added
+    """
+    package_path = get_installed_package_location(package_name)
+    if not package_path:
+        return []
+    
+    files = list(itertools.islice(iter_package_files(package_path, focus_modules), max_files))
+    index = PackageIndex(index_path or ':memory:')
+    try:
+        update_index(index, files, workers)
+        if max_files is None:
+            index.prune(package_path, [file_path for file_path, _ in files])
+            matches = index.search(query, package_path, limit)
+        else:
+            # Earlier runs may have indexed more of the package than selected
+            matches = index.search(query, package_path, limit, [file_path for file_path, _ in files])
+    finally:
+        index.close()
+    
+    package_parent = os.path.dirname(package_path)
+    for match in matches:
+        match['location'] = f"{os.path.relpath(match['path'], package_parent)}:{match['lineno']}"
+        match['text'] = linecache.getline(match['path'], match['lineno']).strip()
+    return matches
+
+
+def package_import_graph(
+    package_name: str,
+    max_files: Optional[int] = None,
+    focus_modules: List[str] = None,
+    workers: Optional[int] = None,
+    index_path: Optional[str] = DEFAULT_INDEX_PATH,
+    importtime_log: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Build the import graph of an installed package.
+    
+    Args:
+        package_name: Name of the pip package to analyze
+        max_files: Only include this many files (default: the whole package)
+        focus_modules: Optional list of specific modules to include first
+        workers: Processes used to parse changed files (default: one per CPU)
+        index_path: SQLite index reused across runs; None parses everything
+        importtime_log: Optional stderr of `python -X importtime -c "import <package>"`
+            whose timings are attached to the nodes
+        
+    Returns:
+        The graph from build_import_graph plus "package" and, with timings,
+        "slowest" (the nodes with the highest cumulative import time)
+    """
+    package_path = get_installed_package_location(package_name)
+    if not package_path:
+        return None
+    
+    files = list(itertools.islice(iter_package_files(package_path, focus_modules), max_files))
+    index = PackageIndex(index_path or ':memory:')
+    try:
+        indexed, parsed = update_index(index, files, workers)
+    finally:
+        index.close()
+    results = {**indexed, **parsed}
     
-    return report
+    timings = None
+    if importtime_log:
+        with open(importtime_log, 'r', encoding='utf-8') as f:
+            timings = parse_importtime_log(f.read())
+    
+    graph = build_import_graph(
+        [(rel_path, results[file_path][1]) for file_path, rel_path in files if file_path in results],
+        timings
+    )
+    graph = {'package': package_name, **graph}
+    if timings:
+        timed = [node for node in graph['nodes'] if 'cumulative_us' in node]
+        timed.sort(key=lambda node: node['cumulative_us'], reverse=True)
+        graph['slowest'] = [
+            {'id': node['id'], 'self_us': node['self_us'], 'cumulative_us': node['cumulative_us']}
+            for node in timed[:20]
+        ]
+    return graph
 
 
 def main():
     """Parse command-line arguments and run the package explorer."""
     parser = argparse.ArgumentParser(description="Analyze a pip package and extract its structure and source code.")
     parser.add_argument("--package", "-p", required=True, help="Name of the pip package to analyze")
-    parser.add_argument("--max_files", "-m", type=int, default=20, help="Maximum number of files to analyze")
+    parser.add_argument("--max_files", "-m", type=int, help="Maximum number of files to analyze (default: 20; searches and graphs cover the whole package)")
     parser.add_argument("--output", "-o", help="Output file path (if not specified, prints to stdout)")
     parser.add_argument("--focus", "-f", nargs='+', help="Focus on specific modules (e.g., 'llm' 'utilities/llm_utils')")
-    parser.add_argument("--search", "-s", help="Search term in files (case insensitive)")
+    parser.add_argument("--search", "-s", help="Search symbols, docstrings and source lines instead of writing a report")
+    parser.add_argument("--limit", "-l", type=int, default=20, help="Maximum number of search matches")
+    parser.add_argument("--graph", "-g", choices=["json", "dot"], help="Write the package's import graph instead of a report")
+    parser.add_argument("--importtime", help="Attach timings from a `python -X importtime -c 'import <package>' 2> log` log to the graph")
+    parser.add_argument("--no-source", action="store_true", help="List symbols only, without the full source of each file")
+    parser.add_argument("--workers", "-w", type=int, help="Worker processes for parsing (default: one per CPU)")
+    parser.add_argument("--index", default=DEFAULT_INDEX_PATH, help=f"SQLite index of parsed files (default: {DEFAULT_INDEX_PATH})")
+    parser.add_argument("--no-index", action="store_true", help="Parse every file without reading or updating the index")
     
     args = parser.parse_args()
     
-    # For the specific case of CrewAI + Gemini integration
-    if args.package == "crewai" and not args.focus:
+    # For the specific case of CrewAI + Gemini integration; searches and
+    # graphs cover the whole package, so the order does not matter there
+    if args.package == "crewai" and not args.focus and not (args.search or args.graph):
         print("CrewAI detected - focusing on LLM integration modules by default")
         focus_modules = ["llm", "utilities/llm_utils", "utilities/exceptions/context_window_exceeding_exception", "cli/constants"]
     else:
         focus_modules = args.focus
     
-    report = explore_package(args.package, args.max_files, args.output, focus_modules)
+    index_path = None if args.no_index else args.index
     
-    # If search term provided, add highlighting to the report
     if args.search and args.search.strip():
-        search_term = args.search.lower()
-        lines = report.split('\n')
-        highlighted_lines = []
-        
-        for line in lines:
-            if search_term in line.lower():
-                # Add highlighting for terminal output (not saved to file)
-                highlighted_lines.append(">>> " + line)
-            else:
-                highlighted_lines.append(line)
-        
-        report = '\n'.join(highlighted_lines)
+        matches = search_package(args.package, args.search, args.limit, args.max_files, focus_modules, args.workers, index_path)
+        lines = [f"{match['location']}  [{match['field']}]  {match['text']}" for match in matches]
+        if not matches:
+            lines.append(f"No matches for '{args.search}'")
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(lines) + '\n')
+        else:
+            print('\n'.join(lines))
+        return
     
-    if not args.output:
-        print("\n" + "=" * 80)
-        print(report)
-
+    if args.graph:
+        graph = package_import_graph(args.package, args.max_files, focus_modules, args.workers, index_path, args.importtime)
+        if graph is None:
+            return
+        rendered = json.dumps(graph, indent=2) if args.graph == "json" else format_graph_dot(graph)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                f.write(rendered + '\n')
+            print(f"Import graph saved to: {args.output}")
+        else:
+            print(rendered)
+        return
+    
+    explore_package(args.package, args.max_files or 20, args.output, focus_modules, args.workers, index_path, not args.no_source)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
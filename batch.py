@@ -0,0 +1,317 @@
+"""
+Run crews for a file of topics without going through the API.
+
+Topics come from a JSONL or CSV file, or stdin. Each JSONL line is an
+object with "topic" and optional "id", "llm_name" and "variables"; a CSV
+file needs a "topic" column, may have "id" and "llm_name" columns, and
+every other column becomes a template variable. Crews run on the same
+pooled LLMs and CrewExecutor as the API, and each result is written as one
+JSONL line as soon as its crew finishes.
+
+With --resume, topics that already have an "ok" line in the output file are
+skipped, and the rest (failed, or never reached because the run was
+interrupted) are run again and appended.
+
+Run from the project root:
+    python batch.py topics.jsonl --output data/results.jsonl --concurrency 4
+    python batch.py topics.jsonl --output data/results.jsonl --resume
+    cat topics.csv | python batch.py - --format csv --llm gemini_remote
+"""
+import argparse
+import csv
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Set, TextIO
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+RESERVED_COLUMNS = ("id", "topic", "llm_name")
+
+
+def parse_jsonl(stream: TextIO) -> Iterator[Dict[str, Any]]:
+    for lineno, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            item = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Line {lineno} is not valid JSON: {e}")
+        if not isinstance(item, dict):
+            raise ValueError(f"Line {lineno} must be a JSON object with a 'topic'")
+        yield item
+
+
+def parse_csv(stream: TextIO) -> Iterator[Dict[str, Any]]:
+    reader = csv.DictReader(stream)
+    if reader.fieldnames is None or "topic" not in reader.fieldnames:
+        raise ValueError("CSV input needs a header row with a 'topic' column")
+    for row in reader:
+        item = {key: row[key] for key in RESERVED_COLUMNS if row.get(key)}
+        item["variables"] = {key: value for key, value in row.items() if key not in RESERVED_COLUMNS and key and value}
+        yield item
+
+
+def read_items(stream: TextIO, format: str = "jsonl", default_llm: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily read batch items from a stream
+
+    Args:
+        stream: An open text stream of JSONL or CSV
+        format: "jsonl" or "csv"
+        default_llm: llm_name for items without one; applied before ids
+            are derived, so runs with different defaults do not share ids
+
+    Returns:
+        An iterator of {"id", "topic", "llm_name", "variables"} dicts; "id" is
+        taken from the input or derived from the other fields
+
+    Raises:
+        ValueError: If a line cannot be parsed or has no topic
+    """
+    if format not in ("jsonl", "csv"):
+        raise ValueError(f"Unsupported input format: {format}")
+    parse = parse_csv if format == "csv" else parse_jsonl
+    for position, item in enumerate(parse(stream), 1):
+        topic = item.get("topic")
+        if not isinstance(topic, str) or not topic.strip():
+            raise ValueError(f"Item {position} has no 'topic'")
+        variables = item.get("variables") or {}
+        if not isinstance(variables, dict):
+            raise ValueError(f"Item {position}: 'variables' must be an object")
+        normalized = {
+            "topic": topic,
+            "llm_name": item.get("llm_name") or default_llm or None,
+            "variables": {str(key): str(value) for key, value in variables.items()},
+        }
+        normalized["id"] = str(item.get("id") or item_key(normalized))
+        yield normalized
+
+
+def item_key(item: Dict[str, Any]) -> str:
+    """Stable id for an item without one, so reruns of the same input match up"""
+    identity = json.dumps([item["topic"], item.get("llm_name"), sorted((item.get("variables") or {}).items())])
+    return hashlib.sha256(identity.encode("utf-8")).hexdigest()[:16]
+
+
+def completed_ids(path: str) -> Set[str]:
+    """Ids with an "ok" result in an earlier output file; a torn last line is ignored"""
+    done = set()
+    try:
+        # Read bytes so a line torn inside a multibyte character is
+        # skipped like any other torn line
+        with open(path, "rb") as f:
+            for line in f:
+                try:
+                    record = json.loads(line.decode("utf-8"))
+                except (UnicodeDecodeError, json.JSONDecodeError):
+                    continue
+                if isinstance(record, dict) and record.get("status") == "ok":
+                    done.add(record.get("id"))
+    except FileNotFoundError:
+        pass
+    return done
+
+
+def open_output(path: str) -> TextIO:
+    """Open a results file for appending, starting a new line after a torn last record"""
+    # Checked in binary: the last character may be multibyte or torn
+    torn = False
+    try:
+        with open(path, "rb") as f:
+            if f.seek(0, os.SEEK_END):
+                f.seek(-1, os.SEEK_END)
+                torn = f.read(1) != b"\n"
+    except FileNotFoundError:
+        pass
+    output = open(path, "a", encoding="utf-8")
+    if torn:
+        output.write("\n")
+    return output
+
+
+def run_record(item: Dict[str, Any], run) -> Dict[str, Any]:
+    """Flatten a CrewRun into the same fields as the API's CrewResponse"""
+    usage = run.output.token_usage
+    return {
+        "id": item["id"],
+        "status": "ok",
+        "topic": run.topic,
+        "llm": run.llm_name,
+        "variables": item["variables"],
+        "result": run.output.raw,
+        "tasks": [
+            {
+                "name": task_output.name,
+                "agent": task_output.agent,
+                "llm": run.task_llms.get(task_output.name),
+                "output": task_output.raw,
+                "duration_seconds": run.task_durations.get(task_output.name),
+            }
+            for task_output in run.output.tasks_output
+        ],
+        "duration_seconds": run.duration,
+        "usage": usage.model_dump() if usage else {},
+        "cached": run.cached,
+    }
+
+
+def error_record(item: Dict[str, Any], error: BaseException) -> Dict[str, Any]:
+    return {
+        "id": item["id"],
+        "status": "failed",
+        "topic": item["topic"],
+        "llm": item["llm_name"],
+        "variables": item["variables"],
+        "error": f"{type(error).__name__}: {error}",
+    }
+
+
+def run_batch(
+    items: Iterable[Dict[str, Any]],
+    output: TextIO,
+    concurrency: int = 2,
+    skip: Optional[Set[str]] = None,
+    runner: Optional[Callable[..., Any]] = None,
+    use_cache: bool = True,
+) -> Dict[str, int]:
+    """
+    Run a crew per item and stream one JSONL record per finished crew
+
+    At most `concurrency` crews run at once and input is read only as
+    workers free up, so arbitrarily long inputs run in constant memory.
+    Records are written in completion order and flushed one by one; a
+    failed crew is recorded and the batch carries on.
+
+    Args:
+        items: Items from read_items
+        output: Text stream the JSONL records are written to
+        concurrency: Crews to run at once
+        skip: Ids to leave out, e.g. from completed_ids on a resumed run
+        runner: Called as runner(topic, llm_name, variables, use_cache=...)
+            and returns a CrewRun (default: main.run_crew)
+        use_cache: Whether crews may be answered from the semantic cache
+
+    Returns:
+        {"ok", "failed", "skipped"} counts
+
+    Raises:
+        ValueError: From reading items, once crews already started are recorded
+    """
+    from executor import CrewExecutor
+    from providers import make_llm_calls_thread_safe
+    if runner is None:
+        from main import run_crew as runner
+    # Crews run on executor threads
+    make_llm_calls_thread_safe()
+
+    skip = skip or set()
+    counts = {"ok": 0, "failed": 0, "skipped": 0}
+    # The loop below keeps at most `concurrency` crews in flight; the queue
+    # slack covers workers whose future resolved before they went idle
+    executor = CrewExecutor(max_workers=concurrency, max_queue=concurrency)
+    pending = {}
+    seen = set()
+
+    def collect(done):
+        for future in done:
+            item = pending.pop(future)
+            try:
+                record = run_record(item, future.result())
+                counts["ok"] += 1
+            except Exception as e:
+                logging.error(f"Crew for '{item['topic']}' failed: {str(e)}")
+                record = error_record(item, e)
+                counts["failed"] += 1
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            output.flush()
+
+    def collect_all():
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            collect(done)
+
+    try:
+        try:
+            for item in items:
+                if item["id"] in skip or item["id"] in seen:
+                    counts["skipped"] += 1
+                    continue
+                seen.add(item["id"])
+                while len(pending) >= concurrency:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+                future = executor.submit(runner, item["topic"], item["llm_name"], item["variables"], use_cache=use_cache)
+                pending[future] = item
+        except ValueError:
+            # Invalid input stops the batch, but crews already running
+            # are still recorded so --resume does not repeat them
+            collect_all()
+            raise
+        collect_all()
+    finally:
+        # On interrupt, queued crews are dropped and left for --resume
+        executor.shutdown()
+    return counts
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run crews for a file of topics and write results as JSONL")
+    parser.add_argument("input", help="JSONL or CSV file of topics, or - for stdin")
+    parser.add_argument("--format", "-f", choices=["jsonl", "csv"], help="Input format (default: from the file extension, else jsonl)")
+    parser.add_argument("--output", "-o", help="JSONL file to append results to (default: stdout)")
+    parser.add_argument("--concurrency", "-c", type=int, help="Crews to run at once (default: executor.max_workers in settings.yaml)")
+    parser.add_argument("--llm", help="LLM for items without an llm_name (default: the llms.yaml entry with default: true)")
+    parser.add_argument("--resume", action="store_true", help="Skip topics that already have an ok result in --output")
+    parser.add_argument("--no-cache", action="store_true", help="Always run crews instead of answering from the semantic cache")
+    args = parser.parse_args(argv)
+
+    if args.resume and not args.output:
+        parser.error("--resume needs --output")
+
+    from config_loader import get_config_snapshot
+    from executor import EXECUTOR_DEFAULTS
+    concurrency = args.concurrency
+    if concurrency is None:
+        settings = get_config_snapshot().settings.get("executor") or {}
+        concurrency = settings.get("max_workers", EXECUTOR_DEFAULTS["max_workers"])
+    if concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+
+    format = args.format or ("csv" if args.input.lower().endswith(".csv") else "jsonl")
+    skip = completed_ids(args.output) if args.resume else set()
+
+    source = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8", newline="")
+    output = open_output(args.output) if args.output else sys.stdout
+    started = time.perf_counter()
+    try:
+        counts = run_batch(read_items(source, format, args.llm), output, concurrency, skip, use_cache=not args.no_cache)
+    except ValueError as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        return 2
+    except KeyboardInterrupt:
+        print("Interrupted; rerun with --resume to finish the remaining topics", file=sys.stderr)
+        return 130
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+
+    print(
+        f"{counts['ok']} ok, {counts['failed']} failed, {counts['skipped']} skipped "
+        f"in {time.perf_counter() - started:.1f}s",
+        file=sys.stderr,
+    )
+    return 1 if counts["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""
+Compare per-request Agent/Task/Crew construction: building fresh pydantic
+objects from the YAML config versus cloning cached prototypes.
+
+Run from the project root: python benchmarks/bench_crew_construction.py
+"""
+import argparse
+import os
+import sys
+import time
+
+# Add the project root directory to the Python path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from crewai import Agent, Task, Crew, Process, LLM
+from config_loader import get_config_snapshot, render_fields
+from main import get_crew_prototype, template_variables
+
+
+def build_fresh(snapshot, llm, values):
+    """Construct every object from scratch, as run_crew_task used to"""
+    agents = {}
+    for agent_name, config in snapshot.agents.items():
+        fields = render_fields(snapshot.agent_templates[agent_name], values)
+        agents[agent_name] = Agent(
+            role=fields['role'],
+            goal=fields['goal'],
+            verbose=config.get('verbose', True),
+            backstory=fields['backstory'],
+            allow_delegation=config.get('allow_delegation', False),
+            llm=llm
+        )
+
+    tasks = []
+    for task_name, config in snapshot.tasks.items():
+        fields = render_fields(snapshot.task_templates[task_name], values)
+        tasks.append(Task(
+            description=fields['description'],
+            expected_output=fields['expected_output'],
+            agent=agents[config['agent']]
+        ))
+
+    return Crew(agents=list(agents.values()), tasks=tasks, process=Process.sequential)
+
+
+def build_from_prototype(snapshot, llm, values):
+    """Clone the cached prototypes and only build the Crew per request"""
+    prototype = get_crew_prototype("benchmark", llm)
+    agents = prototype.build_agents(values)
+    tasks = prototype.build_tasks(values, agents)
+    return Crew(agents=list(agents.values()), tasks=tasks, process=Process.sequential)
+
+
+def measure(label, builder, snapshot, llm, iterations):
+    # Warm up once so one-off costs (prototype build, imports) are excluded
+    builder(snapshot, llm, template_variables("warm up"))
+
+    start = time.perf_counter()
+    for i in range(iterations):
+        builder(snapshot, llm, template_variables(f"topic {i}"))
+    elapsed = time.perf_counter() - start
+
+    per_request_ms = elapsed / iterations * 1000
+    print(f"{label:<12} {per_request_ms:8.3f} ms/request  ({iterations} iterations)")
+    return per_request_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark crew construction per request")
+    parser.add_argument("--iterations", "-n", type=int, default=500, help="Requests to simulate")
+    args = parser.parse_args()
+
+    snapshot = get_config_snapshot()
+    # A local model name keeps construction free of network calls
+    llm = LLM(model="ollama/llama3:8b")
+
+    fresh = measure("fresh", build_fresh, snapshot, llm, args.iterations)
+    cloned = measure("prototype", build_from_prototype, snapshot, llm, args.iterations)
+    print(f"speedup      {fresh / cloned:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+"""
+Profile the import cost of the API process: time and memory per module,
+a sorted report, and a diff against a saved baseline.
+
+Every run imports the target in a fresh interpreter, so results reflect a
+cold start. Time is wall clock; memory is resident set size growth (which
+includes native libraries) where /proc is available and Python heap growth
+traced by tracemalloc elsewhere.
+
+Run from the project root:
+    python benchmarks/profile_imports.py --save-baseline data/import_baseline.json
+    python benchmarks/profile_imports.py --baseline data/import_baseline.json --max-regression-ms 250
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Any, Dict, List, Optional
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Runs inside the profiled interpreter: wraps the import system's module
+# loader so every module (including nested imports) is timed and sized
+CHILD = r'''
+import json, os, resource, sys, time
+import _frozen_importlib as bootstrap
+
+target, mode, results_path = sys.argv[1:4]
+page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+if mode == "rss":
+    statm = open("/proc/self/statm", "rb")
+    def memory():
+        statm.seek(0)
+        return int(statm.read().split()[1]) * page_size
+else:
+    import tracemalloc
+    tracemalloc.start()
+    def memory():
+        return tracemalloc.get_traced_memory()[0]
+
+records = {}
+stack = []
+load_unlocked = bootstrap._load_unlocked
+
+def profiled_load(spec):
+    # [name, start time, start memory, time in children, memory in children]
+    frame = [spec.name, time.perf_counter_ns(), memory(), 0, 0]
+    stack.append(frame)
+    try:
+        return load_unlocked(spec)
+    finally:
+        stack.pop()
+        elapsed = time.perf_counter_ns() - frame[1]
+        grown = memory() - frame[2]
+        records.setdefault(spec.name, [elapsed - frame[3], elapsed, grown - frame[4], grown])
+        if stack:
+            stack[-1][3] += elapsed
+            stack[-1][4] += grown
+
+bootstrap._load_unlocked = profiled_load
+start = time.perf_counter_ns()
+start_memory = memory()
+__import__(target)
+total = time.perf_counter_ns() - start
+bootstrap._load_unlocked = load_unlocked
+
+with open(results_path, "w") as f:
+    json.dump({
+        "total_ns": total,
+        "total_bytes": memory() - start_memory,
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "modules": records,
+    }, f)
+'''
+
+
+def default_memory_mode() -> str:
+    return "rss" if os.path.exists("/proc/self/statm") else "tracemalloc"
+
+
+def run_once(target: str, memory_mode: str) -> Dict[str, Any]:
+    """Import the target in a fresh interpreter and return its raw records"""
+    with tempfile.TemporaryDirectory() as directory:
+        results_path = os.path.join(directory, "imports.json")
+        env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+        completed = subprocess.run(
+            [sys.executable, "-c", CHILD, target, memory_mode, results_path],
+            cwd=PROJECT_ROOT,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        if completed.returncode != 0:
+            raise RuntimeError(f"Importing '{target}' failed:\n{completed.stderr.strip()}")
+        with open(results_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+
+def profile(target: str = "api", runs: int = 3, memory_mode: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Profile the import of a module over several cold starts
+
+    Args:
+        target: Module to import, relative to the project root
+        runs: Fresh interpreters to average over; each module reports its median
+        memory_mode: "rss" or "tracemalloc" (default: rss where /proc exists)
+
+    Returns:
+        {"target", "python", "runs", "memory", "total_ms", "total_kb",
+         "peak_rss_kb", "modules": {name: {"self_ms", "cumulative_ms",
+         "self_kb", "cumulative_kb"}}}
+    """
+    memory_mode = memory_mode or default_memory_mode()
+    samples = [run_once(target, memory_mode) for _ in range(max(1, runs))]
+
+    modules = {}
+    names = set().union(*(sample["modules"] for sample in samples))
+    for name in names:
+        values = [sample["modules"][name] for sample in samples if name in sample["modules"]]
+        self_ns, cumulative_ns, self_bytes, cumulative_bytes = (statistics.median(column) for column in zip(*values))
+        modules[name] = {
+            "self_ms": round(self_ns / 1e6, 3),
+            "cumulative_ms": round(cumulative_ns / 1e6, 3),
+            "self_kb": round(self_bytes / 1024, 1),
+            "cumulative_kb": round(cumulative_bytes / 1024, 1),
+        }
+
+    return {
+        "target": target,
+        "python": sys.version.split()[0],
+        "runs": len(samples),
+        "memory": memory_mode,
+        "total_ms": round(statistics.median(sample["total_ns"] for sample in samples) / 1e6, 3),
+        "total_kb": round(statistics.median(sample["total_bytes"] for sample in samples) / 1024, 1),
+        "peak_rss_kb": int(statistics.median(sample["peak_rss_kb"] for sample in samples)),
+        "modules": modules,
+    }
+
+
+def package_totals(modules: Dict[str, Dict[str, float]]) -> Dict[str, Dict[str, float]]:
+    """Sum self time and memory per top-level package"""
+    totals = {}
+    for name, record in modules.items():
+        package = totals.setdefault(name.split(".")[0], {"self_ms": 0.0, "self_kb": 0.0, "modules": 0})
+        package["self_ms"] += record["self_ms"]
+        package["self_kb"] += record["self_kb"]
+        package["modules"] += 1
+    return totals
+
+
+def format_report(result: Dict[str, Any], top: int = 30, sort: str = "cumulative") -> str:
+    """Render the slowest modules and the heaviest packages as text tables"""
+    key = "cumulative_ms" if sort == "cumulative" else "self_ms"
+    lines = [
+        f"Import profile of '{result['target']}' (Python {result['python']}, median of {result['runs']} runs, memory: {result['memory']})",
+        f"Total: {result['total_ms']:.1f} ms, {result['total_kb'] / 1024:.1f} MB; peak RSS {result['peak_rss_kb'] / 1024:.1f} MB",
+        "",
+        f"{'cumulative ms':>14} {'self ms':>9} {'cumulative MB':>14} {'self MB':>8}  module",
+    ]
+    ranked = sorted(result["modules"].items(), key=lambda item: item[1][key], reverse=True)
+    for name, record in ranked[:top]:
+        lines.append(
+            f"{record['cumulative_ms']:14.1f} {record['self_ms']:9.1f} "
+            f"{record['cumulative_kb'] / 1024:14.1f} {record['self_kb'] / 1024:8.1f}  {name}"
+        )
+
+    lines += ["", f"{'self ms':>9} {'self MB':>8} {'modules':>8}  package"]
+    packages = sorted(package_totals(result["modules"]).items(), key=lambda item: item[1]["self_ms"], reverse=True)
+    for name, record in packages[:top]:
+        lines.append(f"{record['self_ms']:9.1f} {record['self_kb'] / 1024:8.1f} {record['modules']:8d}  {name}")
+    return "\n".join(lines)
+
+
+def diff(baseline: Dict[str, Any], current: Dict[str, Any], min_ms: float = 5.0, min_pct: float = 10.0) -> Dict[str, Any]:
+    """
+    Compare two profiles
+
+    Args:
+        baseline: A saved profile
+        current: A profile of the code under test
+        min_ms: Ignore modules whose cumulative time moved less than this
+        min_pct: ...or by less than this percentage of their baseline time,
+            which keeps run-to-run noise on large modules out of the diff
+
+    Returns:
+        {"total_ms": delta, "total_kb": delta, "changed": [...], "added": [...], "removed": [...]}
+        where changed lists modules slower or faster by at least min_ms,
+        added lists modules the baseline did not import, and removed the
+        reverse; each list is sorted by the size of the change
+    """
+    before, after = baseline["modules"], current["modules"]
+    changed = []
+    for name in before.keys() & after.keys():
+        delta = after[name]["cumulative_ms"] - before[name]["cumulative_ms"]
+        if abs(delta) >= max(min_ms, before[name]["cumulative_ms"] * min_pct / 100):
+            changed.append({
+                "module": name,
+                "before_ms": before[name]["cumulative_ms"],
+                "after_ms": after[name]["cumulative_ms"],
+                "delta_ms": round(delta, 3),
+                "delta_kb": round(after[name]["cumulative_kb"] - before[name]["cumulative_kb"], 1),
+            })
+    changed.sort(key=lambda item: abs(item["delta_ms"]), reverse=True)
+
+    def listed(names, source):
+        # Only the outermost new/removed modules; their children are included
+        roots = [name for name in names if name.rpartition(".")[0] not in names]
+        entries = [{"module": name, "cumulative_ms": source[name]["cumulative_ms"], "cumulative_kb": source[name]["cumulative_kb"]} for name in roots]
+        return sorted(entries, key=lambda item: item["cumulative_ms"], reverse=True)
+
+    return {
+        "total_ms": round(current["total_ms"] - baseline["total_ms"], 3),
+        "total_kb": round(current["total_kb"] - baseline["total_kb"], 1),
+        "changed": changed,
+        "added": listed(after.keys() - before.keys(), after),
+        "removed": listed(before.keys() - after.keys(), before),
+    }
+
+
+def format_diff(baseline: Dict[str, Any], result: Dict[str, Any], changes: Dict[str, Any], top: int = 30) -> str:
+    lines = [
+        "",
+        f"Against baseline: {baseline['total_ms']:.1f} ms -> {result['total_ms']:.1f} ms ({changes['total_ms']:+.1f} ms), "
+        f"{changes['total_kb'] / 1024:+.1f} MB",
+    ]
+    if changes["added"]:
+        lines.append("\nNewly imported:")
+        lines += [f"  {item['cumulative_ms']:9.1f} ms  {item['module']}" for item in changes["added"][:top]]
+    if changes["removed"]:
+        lines.append("\nNo longer imported:")
+        lines += [f"  {item['cumulative_ms']:9.1f} ms  {item['module']}" for item in changes["removed"][:top]]
+    if changes["changed"]:
+        lines.append("\nChanged:")
+        lines += [
+            f"  {item['delta_ms']:+9.1f} ms  {item['module']} ({item['before_ms']:.1f} -> {item['after_ms']:.1f})"
+            for item in changes["changed"][:top]
+        ]
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Profile import time and memory of the API process")
+    parser.add_argument("--target", "-t", default="api", help="Module to import (default: api)")
+    parser.add_argument("--runs", "-n", type=int, default=3, help="Cold starts to take the median of")
+    parser.add_argument("--memory", choices=["rss", "tracemalloc"], help="How to measure memory (default: rss where /proc exists)")
+    parser.add_argument("--top", type=int, default=30, help="Rows per table")
+    parser.add_argument("--sort", choices=["cumulative", "self"], default="cumulative", help="Rank modules by cumulative or self time")
+    parser.add_argument("--output", "-o", help="Write the full profile as JSON")
+    parser.add_argument("--save-baseline", help="Write the profile to this path for later comparison")
+    parser.add_argument("--baseline", "-b", help="Compare against a saved profile")
+    parser.add_argument("--max-regression-ms", type=float, help="Exit with status 1 when total import time grew by more than this")
+    args = parser.parse_args(argv)
+
+    result = profile(args.target, args.runs, args.memory)
+    print(format_report(result, args.top, args.sort))
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(result, f, indent=2, sort_keys=True)
+            print(f"\nProfile saved to: {path}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        changes = diff(baseline, result)
+        print(format_diff(baseline, result, changes, args.top))
+        if args.max_regression_ms is not None and changes["total_ms"] > args.max_regression_ms:
+            print(f"\nImport time regressed by {changes['total_ms']:.1f} ms (limit {args.max_regression_ms:.1f} ms)")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,271 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import yaml
+
+CONFIG_DIR = "config"
+
+CONFIG_FILES = {
+    "llms": "llms.yaml",
+    "agents": "agents.yaml",
+    "tasks": "tasks.yaml",
+}
+
+# Runtime settings (caches, stores, thresholds); the file may be absent
+SETTINGS_FILE = "settings.yaml"
+
+# Fields that may contain {variable} placeholders
+AGENT_TEMPLATE_FIELDS = ("role", "goal", "backstory")
+TASK_TEMPLATE_FIELDS = ("description", "expected_output")
+
+# Structured agent blocks compiled into a system-prompt fragment appended
+# to the backstory, mapped to the heading used in the prompt
+STYLE_BLOCKS = {
+    "voice_style": "Voice and style guidelines",
+}
+
+# Matches escaped braces ({{ and }}) or a {identifier} placeholder. Anything
+# else (JSON snippets, lone braces, format specs) is kept as literal text.
+_PLACEHOLDER_PATTERN = re.compile(r"\{\{|\}\}|\{([A-Za-z_][A-Za-z0-9_]*)\}")
+
+
+class CompiledTemplate:
+    """A config string parsed once into literal text and variable slots"""
+
+    __slots__ = ("source", "variables", "_segments")
+
+    def __init__(self, source: str):
+        self.source = source
+        segments: List[Tuple[bool, str]] = []
+        variables = []
+        literal = []
+        position = 0
+
+        for match in _PLACEHOLDER_PATTERN.finditer(source):
+            literal.append(source[position:match.start()])
+            position = match.end()
+            name = match.group(1)
+            if name is None:
+                literal.append(match.group(0)[0])
+                continue
+            if literal:
+                segments.append((False, "".join(literal)))
+                literal = []
+            segments.append((True, name))
+            if name not in variables:
+                variables.append(name)
+
+        literal.append(source[position:])
+        tail = "".join(literal)
+        if tail:
+            segments.append((False, tail))
+
+        self._segments = tuple(segments)
+        self.variables = frozenset(variables)
+
+    @property
+    def is_static(self) -> bool:
+        """True when the template has no variables to substitute"""
+        return not self.variables
+
+    def render(self, variables: Dict[str, Any]) -> str:
+        """
+        Substitute variables into the template
+
+        Args:
+            variables: Values for the template's placeholders
+
+        Returns:
+            The rendered string
+        """
+        try:
+            return "".join(
+                str(variables[value]) if is_variable else value
+                for is_variable, value in self._segments
+            )
+        except KeyError as e:
+            raise ValueError(f"Missing value for template variable {e}") from None
+
+    def __repr__(self):
+        return f"CompiledTemplate({self.source!r})"
+
+
+def compile_fields(config: Dict[str, Any], fields: Iterable[str]) -> Dict[str, CompiledTemplate]:
+    """Compile the templated string fields of a single agent or task config"""
+    return {
+        field: CompiledTemplate(config.get(field) or "")
+        for field in fields
+    }
+
+
+def _format_style_value(value: Any) -> str:
+    if isinstance(value, dict):
+        return "; ".join(f"{key}: {_format_style_value(item)}" for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return ", ".join(_format_style_value(item) for item in value)
+    return str(value).strip()
+
+
+def compile_style_block(style: Dict[str, Any], heading: str) -> str:
+    """
+    Compile a structured style block into a compact prompt fragment
+
+    Args:
+        style: Mapping of aspect (tone, avoid, ...) to a value or list of values
+        heading: First line of the fragment
+
+    Returns:
+        The fragment, or an empty string for an empty block
+    """
+    if not style:
+        return ""
+    if not isinstance(style, dict):
+        raise ValueError(f"{heading} must be a mapping, got {type(style).__name__}")
+
+    lines = [f"{heading}:"]
+    for aspect, value in style.items():
+        label = str(aspect).replace("_", " ").capitalize()
+        lines.append(f"- {label}: {_format_style_value(value)}")
+    return "\n".join(lines)
+
+
+def compile_agent_style(config: Dict[str, Any]) -> str:
+    """Compile every style block of an agent config into one fragment"""
+    fragments = [
+        compile_style_block(config[key], heading)
+        for key, heading in STYLE_BLOCKS.items()
+        if config.get(key)
+    ]
+    return "\n\n".join(fragment for fragment in fragments if fragment)
+
+
+def _escape_braces(text: str) -> str:
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+def compile_agent_fields(config: Dict[str, Any]) -> Dict[str, CompiledTemplate]:
+    """Compile an agent's templated fields, folding style blocks into the backstory"""
+    templates = compile_fields(config, AGENT_TEMPLATE_FIELDS)
+    style = compile_agent_style(config)
+    if style:
+        # Style text is literal, so braces in it must not become placeholders
+        backstory = templates["backstory"].source
+        templates["backstory"] = CompiledTemplate(f"{backstory}\n\n{_escape_braces(style)}")
+    return templates
+
+
+def render_fields(templates: Dict[str, CompiledTemplate], variables: Dict[str, Any]) -> Dict[str, str]:
+    """Render every compiled field of an agent or task in a single pass"""
+    missing = set()
+    for template in templates.values():
+        missing.update(template.variables.difference(variables))
+    if missing:
+        raise ValueError(f"Missing values for template variables: {', '.join(sorted(missing))}")
+
+    return {field: template.render(variables) for field, template in templates.items()}
+
+
+class ConfigSnapshot:
+    """Parsed YAML configuration plus everything precompiled from it"""
+
+    def __init__(
+        self,
+        llms: Dict[str, Any],
+        agents: Dict[str, Any],
+        tasks: Dict[str, Any],
+        version: Tuple,
+        settings: Optional[Dict[str, Any]] = None,
+    ):
+        self.llms = llms or {}
+        self.agents = agents or {}
+        self.tasks = tasks or {}
+        self.settings = settings or {}
+        self.version = version
+
+        # Content hash of what shapes crew output, stable across restarts
+        # and file touches, unlike version which tracks mtimes
+        content = json.dumps([self.agents, self.tasks], sort_keys=True, default=str)
+        self.fingerprint = hashlib.sha256(content.encode("utf-8")).hexdigest()[:16]
+
+        self.agent_templates = {
+            name: compile_agent_fields(config)
+            for name, config in self.agents.items()
+        }
+        self.task_templates = {
+            name: compile_fields(config, TASK_TEMPLATE_FIELDS)
+            for name, config in self.tasks.items()
+        }
+
+        variables = set()
+        for templates in list(self.agent_templates.values()) + list(self.task_templates.values()):
+            for template in templates.values():
+                variables.update(template.variables)
+        self.variables = frozenset(variables)
+
+
+_snapshot: Optional[ConfigSnapshot] = None
+_snapshot_lock = threading.Lock()
+
+
+def _config_path(name: str, config_dir: str) -> str:
+    return os.path.join(config_dir, CONFIG_FILES[name])
+
+
+def _read_yaml(path: str) -> Dict[str, Any]:
+    with open(path, "r") as file:
+        return yaml.safe_load(file) or {}
+
+
+def _read_settings(config_dir: str) -> Dict[str, Any]:
+    settings_path = os.path.join(config_dir, SETTINGS_FILE)
+    if not os.path.exists(settings_path):
+        return {}
+    return _read_yaml(settings_path)
+
+
+def _config_version(config_dir: str) -> Tuple:
+    version = []
+    for name in CONFIG_FILES:
+        stat = os.stat(_config_path(name, config_dir))
+        version.append((name, stat.st_mtime_ns, stat.st_size))
+    settings_path = os.path.join(config_dir, SETTINGS_FILE)
+    if os.path.exists(settings_path):
+        stat = os.stat(settings_path)
+        version.append(("settings", stat.st_mtime_ns, stat.st_size))
+    return tuple(version)
+
+
+def get_config_snapshot(config_dir: Union[str, None] = None) -> ConfigSnapshot:
+    """
+    Return the current configuration snapshot, reloading it only when a
+    YAML file under the config directory has changed on disk
+
+    Args:
+        config_dir: Directory holding llms.yaml, agents.yaml, tasks.yaml
+            and optionally settings.yaml
+
+    Returns:
+        ConfigSnapshot: The parsed and precompiled configuration
+    """
+    global _snapshot
+    config_dir = config_dir or CONFIG_DIR
+    version = (config_dir,) + _config_version(config_dir)
+
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+
+    with _snapshot_lock:
+        if _snapshot is None or _snapshot.version != version:
+            _snapshot = ConfigSnapshot(
+                llms=_read_yaml(_config_path("llms", config_dir)),
+                agents=_read_yaml(_config_path("agents", config_dir)),
+                tasks=_read_yaml(_config_path("tasks", config_dir)),
+                version=version,
+                settings=_read_settings(config_dir),
+            )
+        return _snapshot
@@ -0,0 +1,110 @@
+import math
+import re
+from typing import Callable, Dict, List
+
+# Rough average for English text with BPE tokenizers; cheap enough to run on
+# every hand-off and close enough to keep prompts under a model's window
+CHARS_PER_TOKEN = 4
+
+TRUNCATION_MARKER = "\n[... context truncated ...]\n"
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of a string without running a tokenizer"""
+    if not text:
+        return 0
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _char_budget(max_tokens: int) -> int:
+    return max(0, max_tokens * CHARS_PER_TOKEN)
+
+
+def _cut(text: str, limit: int, from_end: bool = False) -> str:
+    """Cut text to at most limit characters, preferring a whitespace boundary"""
+    if len(text) <= limit:
+        return text
+    if from_end:
+        piece = text[len(text) - limit:]
+        boundary = piece.find(" ")
+        return piece[boundary + 1:] if 0 <= boundary < limit // 4 else piece
+    piece = text[:limit]
+    boundary = piece.rfind(" ")
+    return piece[:boundary] if boundary > limit * 3 // 4 else piece
+
+
+def truncate(text: str, max_tokens: int) -> str:
+    """Keep the beginning of the text"""
+    limit = _char_budget(max_tokens) - len(TRUNCATION_MARKER)
+    if limit <= 0:
+        return ""
+    return _cut(text, limit).rstrip() + TRUNCATION_MARKER
+
+
+def head_tail(text: str, max_tokens: int) -> str:
+    """Keep the beginning and the end, where conclusions usually are"""
+    limit = _char_budget(max_tokens) - len(TRUNCATION_MARKER)
+    if limit <= 0:
+        return ""
+    head_limit = limit * 2 // 3
+    head = _cut(text, head_limit).rstrip()
+    tail = _cut(text, limit - head_limit, from_end=True).lstrip()
+    return head + TRUNCATION_MARKER + tail
+
+
+def extractive(text: str, max_tokens: int) -> str:
+    """
+    Summarize without an LLM call by keeping the first sentence of every
+    paragraph or list item, then adding following sentences while the
+    budget allows
+    """
+    limit = _char_budget(max_tokens)
+    blocks = [block.strip() for block in re.split(r"\n\s*\n|\n(?=\s*(?:[-*#]|\d+[.)])\s)", text) if block.strip()]
+    sentences: List[List[str]] = [_SENTENCE_END.split(block) for block in blocks]
+
+    kept = [[parts[0]] for parts in sentences]
+    used = sum(len(parts[0]) + 2 for parts in sentences)
+    if used > limit:
+        return truncate("\n\n".join(parts[0] for parts in sentences), max_tokens)
+
+    # Fill remaining budget round-robin so every block keeps similar depth
+    depth = 1
+    added = True
+    while added:
+        added = False
+        for index, parts in enumerate(sentences):
+            if depth < len(parts) and used + len(parts[depth]) + 1 <= limit:
+                kept[index].append(parts[depth])
+                used += len(parts[depth]) + 1
+                added = True
+        depth += 1
+
+    return "\n\n".join(" ".join(parts) for parts in kept)
+
+
+STRATEGIES: Dict[str, Callable[[str, int], str]] = {
+    "truncate": truncate,
+    "head_tail": head_tail,
+    "extractive": extractive,
+}
+
+
+def fit_to_budget(text: str, max_tokens: int, strategy: str = "truncate") -> str:
+    """
+    Shrink text so its estimated size stays within max_tokens
+
+    Args:
+        text: The context handed from earlier tasks
+        max_tokens: Token budget for the context
+        strategy: One of the names in STRATEGIES
+
+    Returns:
+        The text unchanged if it already fits, otherwise the reduced text
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown context strategy '{strategy}'. Expected one of: {', '.join(STRATEGIES)}")
+    if not text or max_tokens is None or estimate_tokens(text) <= max_tokens:
+        return text
+    return STRATEGIES[strategy](text, max_tokens)
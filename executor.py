@@ -0,0 +1,257 @@
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, InvalidStateError
+from typing import Any, Callable, Dict, List, Optional
+
+EXECUTOR_DEFAULTS = {
+    "max_workers": 4,   # crews running at once
+    "max_queue": 16,    # crews waiting for a worker before requests are rejected
+}
+
+
+class ExecutorSaturatedError(RuntimeError):
+    """Raised when a crew cannot be queued because the queue is full"""
+
+
+class ExecutorDrainingError(ExecutorSaturatedError):
+    """Raised for work refused or handed over while the executor drains"""
+
+
+class CrewJob:
+    """A queued call plus the JSON payload needed to redo it in another process"""
+
+    def __init__(self, fn: Callable[..., Any], args: tuple, kwargs: dict, payload: Optional[Dict[str, Any]] = None):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.payload = payload
+        self.future: Future = Future()
+
+    def fail(self, error: BaseException) -> None:
+        try:
+            self.future.set_exception(error)
+        except InvalidStateError:
+            # Finished in the meantime
+            pass
+
+
+class CrewExecutor:
+    """
+    Bounded worker pool for crew runs.
+
+    Crews block on LLM calls, so they run on worker threads instead of the
+    event loop. Queued work is capped so an overloaded instance rejects
+    requests quickly rather than accumulating unbounded latency, and the
+    counters feed the readiness check. Workers are daemon threads so a
+    drained process can exit without waiting for crews past the deadline.
+    """
+
+    def __init__(self, max_workers: int = 4, max_queue: int = 16):
+        if max_workers < 1:
+            raise ValueError("executor.max_workers must be at least 1")
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._queue: "deque[CrewJob]" = deque()
+        self._running: List[CrewJob] = []
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._drained = threading.Event()
+        self.draining = False
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._workers = [
+            threading.Thread(target=self._work, name=f"crew-{index}", daemon=True)
+            for index in range(max_workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    @property
+    def active(self) -> int:
+        return len(self._running)
+
+    @property
+    def queued(self) -> int:
+        return len(self._queue)
+
+    def submit(self, fn: Callable[..., Any], *args, payload: Optional[Dict[str, Any]] = None, **kwargs) -> Future:
+        """
+        Queue a call on a worker thread
+
+        Args:
+            fn: The call to run
+            payload: JSON-serializable description of the call, persisted
+                if the executor drains before the call finishes
+
+        Raises:
+            ExecutorDrainingError: While the executor drains for shutdown
+            ExecutorSaturatedError: When max_queue calls are already waiting
+        """
+        job = CrewJob(fn, args, kwargs, payload)
+        with self._condition:
+            if self.draining or self._stopped:
+                self.rejected += 1
+                raise ExecutorDrainingError("Shutting down; not accepting new crews")
+            if len(self._running) + len(self._queue) >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise ExecutorSaturatedError(
+                    f"All {self.max_workers} workers are busy and {len(self._queue)} requests are queued"
+                )
+            self._queue.append(job)
+            self._condition.notify()
+        return job.future
+
+    def _work(self) -> None:
+        while True:
+            with self._condition:
+                while not self._queue and not self._stopped:
+                    self._condition.wait()
+                if self._stopped:
+                    return
+                job = self._queue.popleft()
+                if not job.future.set_running_or_notify_cancel():
+                    continue
+                self._running.append(job)
+
+            try:
+                result = job.fn(*job.args, **job.kwargs)
+            except BaseException as e:
+                with self._condition:
+                    self.failed += 1
+                job.fail(e)
+            else:
+                with self._condition:
+                    self.completed += 1
+                try:
+                    job.future.set_result(result)
+                except InvalidStateError:
+                    # Handed over during a drain that hit its deadline
+                    pass
+            finally:
+                with self._condition:
+                    self._running.remove(job)
+                    self._condition.notify_all()
+
+    @property
+    def saturation(self) -> float:
+        """Share of workers currently running a crew"""
+        return len(self._running) / self.max_workers
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "active": len(self._running),
+                "queued": len(self._queue),
+                "saturation": len(self._running) / self.max_workers,
+                "draining": self.draining,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+            }
+
+    def drain(
+        self,
+        deadline_seconds: float,
+        persist: Optional[Callable[[Dict[str, Any]], None]] = None,
+        report_every: float = 5.0,
+    ) -> Dict[str, int]:
+        """
+        Stop accepting work and let running crews finish
+
+        Queued jobs are handed to persist right away. Running jobs get up
+        to deadline_seconds; any still running then are persisted too, and
+        every waiting caller receives ExecutorDrainingError.
+
+        Args:
+            deadline_seconds: How long running crews may take to finish
+            persist: Stores a job payload for the next process
+            report_every: Seconds between progress log lines
+
+        Returns:
+            Counts of requeued, finished and abandoned jobs
+        """
+        with self._condition:
+            self.draining = True
+            queued = list(self._queue)
+            self._queue.clear()
+            running = len(self._running)
+
+        for job in queued:
+            self._hand_over(job, persist)
+        logging.warning(f"Draining: {running} crews running, {len(queued)} queued crews requeued")
+
+        deadline = time.monotonic() + deadline_seconds
+        next_report = time.monotonic() + report_every
+        with self._condition:
+            while self._running:
+                now = time.monotonic()
+                if now >= deadline:
+                    break
+                if now >= next_report:
+                    logging.warning(f"Draining: {len(self._running)} crews still running, {deadline - now:.0f}s left")
+                    next_report = now + report_every
+                self._condition.wait(min(deadline, next_report) - now)
+            abandoned = list(self._running)
+
+        for job in abandoned:
+            self._hand_over(job, persist)
+        summary = {
+            "requeued": len(queued),
+            "finished": running - len(abandoned),
+            "abandoned": len(abandoned),
+        }
+        logging.warning(
+            f"Drained: {summary['finished']} crews finished, "
+            f"{summary['requeued'] + summary['abandoned']} handed over to the next process"
+        )
+        self._drained.set()
+        return summary
+
+    def wait_drained(self, timeout: Optional[float] = None) -> bool:
+        """Block until a drain started elsewhere has finished"""
+        return self._drained.wait(timeout)
+
+    def _hand_over(self, job: CrewJob, persist: Optional[Callable[[Dict[str, Any]], None]]) -> None:
+        if job.future.cancelled():
+            # The caller went away before the crew started
+            return
+        if persist is not None and job.payload is not None:
+            try:
+                persist(job.payload)
+            except Exception as e:
+                logging.error(f"Could not persist job {job.payload}: {str(e)}")
+        job.fail(ExecutorDrainingError("Shutting down; the crew was requeued for the next instance"))
+
+    def shutdown(self) -> None:
+        """Stop idle workers; running crews are not waited for"""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+
+
+_executor: Optional[CrewExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_crew_executor(settings: Optional[Dict[str, Any]] = None) -> CrewExecutor:
+    """
+    Return the process-wide crew executor, creating it on first use
+
+    Args:
+        settings: The executor section of settings.yaml; only the first
+            call's settings apply since the pool cannot be resized
+
+    Returns:
+        The shared CrewExecutor
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None or _executor._stopped:
+            config = {**EXECUTOR_DEFAULTS, **(settings or {})}
+            _executor = CrewExecutor(config["max_workers"], config["max_queue"])
+    return _executor
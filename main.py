@@ -1,8 +1,23 @@
+import json
+import logging
 import os
-import yaml
-from pydantic import BaseModel
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional
+from pydantic import BaseModel, PrivateAttr, field_validator
 from crewai import Agent, Task, Crew, Process, LLM
-from providers import create_llm_from_config
+from crewai.crews.crew_output import CrewOutput
+from crewai.tasks.task_output import TaskOutput
+from crewai.agents.agent_builder.utilities.base_token_process import TokenProcess
+from crewai.agents.tools_handler import ToolsHandler
+from providers import create_llm_from_config, get_secret_resolver, llm_health, LLMUnavailableError
+from config_loader import get_config_snapshot, render_fields
+from context_budget import STRATEGIES, fit_to_budget
+from storage.memory import crew_memory_kwargs
+from storage.semantic_cache import get_semantic_cache
+from storage.checkpoints import get_checkpoint_store, request_fingerprint
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -10,15 +25,32 @@ load_dotenv()
 class ResearchRequest(BaseModel):
     topic: str
     llm_name: str = None
+    variables: Dict[str, str] = {}
 
 def load_llms():
-    with open("config/llms.yaml", "r") as file:
-        llm_configs = yaml.safe_load(file)
-    
-    return llm_configs
+    return get_config_snapshot().llms
 
-def get_llm(llm_name=None):
+def template_variables(topic, variables=None):
+    """Merge request-supplied template variables with the topic"""
+    merged = dict(variables or {})
+    merged["topic"] = topic
+    return merged
+
+_llm_pool: Dict[str, LLM] = {}
+# Resolved configuration per pooled LLM and when its secrets are looked up again
+_llm_pool_configs: Dict[str, tuple] = {}
+_llm_pool_version = None
+_llm_pool_lock = threading.RLock()
+
+def resolve_llm_name(llm_name=None):
+    """
+    Return the configured LLM name to use, falling back to the default.
+    
+    Unhealthy LLMs are skipped in favour of their configured fallbacks; when
+    no name is given, any healthy LLM may stand in for the default.
+    """
     llm_configs = load_llms()
+    requested = llm_name
     
     if not llm_name:
         for name, config in llm_configs.items():
@@ -31,75 +63,436 @@ def get_llm(llm_name=None):
     if llm_name not in llm_configs:
         raise ValueError(f"LLM '{llm_name}' not found in configuration")
     
-    config = llm_configs[llm_name]
+    if llm_health.is_available(llm_name):
+        return llm_name
+    
+    candidates = list(llm_configs[llm_name].get("fallbacks", []))
+    if not requested:
+        candidates += [name for name in llm_configs if name != llm_name]
+    for candidate in candidates:
+        if candidate in llm_configs and llm_health.is_available(candidate):
+            return candidate
     
-    try:
-        return create_llm_from_config(config)
-    except ValueError as e:
-        raise ValueError(f"Error creating LLM '{llm_name}': {str(e)}")
+    raise LLMUnavailableError(f"LLM '{llm_name}' is unhealthy and no healthy fallback is configured")
 
-def load_agents(topic, llm_name=None, custom_llm=None):
-    with open("config/agents.yaml", "r") as file:
-        agent_configs = yaml.safe_load(file)
+def resolve_pinned_llms(snapshot):
+    """
+    Route the llm settings of agents and tasks through the health registry
     
-    llm_to_use = custom_llm or get_llm(llm_name)
+    Pins get the same fallbacks as request-level names, so a pinned
+    backend that is down does not fail every crew while /ready says ready.
     
-    agents = {}
-    for agent_name, config in agent_configs.items():
-        role = config['role'].format(topic=topic) if '{topic}' in config.get('role', '') else config['role']
-        goal = config['goal'].format(topic=topic) if '{topic}' in config.get('goal', '') else config['goal']
-        backstory = config['backstory'].format(topic=topic) if '{topic}' in config.get('backstory', '') else config['backstory']
+    Returns:
+        {("Agent" or "Task", name): LLM name to use}
+    """
+    resolved = {}
+    for kind, configs in (("Agent", snapshot.agents), ("Task", snapshot.tasks)):
+        for name, config in configs.items():
+            if config.get("llm"):
+                try:
+                    resolved[(kind, name)] = resolve_llm_name(config["llm"])
+                except ValueError as e:
+                    raise ValueError(f"{kind} '{name}': {str(e)}")
+    return resolved
+
+def task_llm_names(snapshot, llm_name, pins):
+    """The LLM each task runs on: its own pin, its agent's pin or the request's"""
+    return {
+        task_name: pins.get(("Task", task_name)) or pins.get(("Agent", config["agent"])) or llm_name
+        for task_name, config in snapshot.tasks.items()
+    }
+
+def get_member_llm(llm_configs, member_name):
+    """Load an LLM referenced by a group such as a race"""
+    if member_name not in llm_configs:
+        raise ValueError(f"Member LLM '{member_name}' not found in configuration")
+    if llm_configs[member_name].get("members"):
+        raise ValueError(f"Member LLM '{member_name}' is itself a group")
+    return get_pooled_llm(member_name)
+
+def get_pooled_llm(llm_name):
+    """Return the pooled LLM for a configured name, ignoring its health"""
+    snapshot = get_config_snapshot()
+    llm_configs = snapshot.llms
+    if llm_name not in llm_configs:
+        raise ValueError(f"LLM '{llm_name}' not found in configuration")
+    
+    global _llm_pool_version
+    with _llm_pool_lock:
+        # LLM instances are reused until the configuration changes on disk
+        if _llm_pool_version != snapshot.version:
+            _llm_pool.clear()
+            _llm_pool_configs.clear()
+            _llm_pool_version = snapshot.version
         
-        agents[agent_name] = Agent(
-            role=role,
-            goal=goal,
-            verbose=config.get('verbose', True),
-            memory=config.get('memory', False),
-            backstory=backstory,
-            allow_delegation=config.get('allow_delegation', False),
-            llm=llm_to_use
-        )
+        # ${VAR} references are resolved once per snapshot and refreshed
+        # after the secrets TTL; a rotated secret rebuilds the LLM
+        entry = _llm_pool_configs.get(llm_name)
+        now = time.monotonic()
+        if entry is None or now >= entry[1]:
+            resolver = get_secret_resolver(snapshot.settings.get("secrets"))
+            try:
+                config = resolver.resolve(llm_configs[llm_name])
+            except ValueError as e:
+                raise ValueError(f"Error creating LLM '{llm_name}': {str(e)}")
+            if entry is not None and entry[0] != config:
+                _llm_pool.pop(llm_name, None)
+            refresh_at = now + resolver.ttl_seconds if resolver.ttl_seconds else float("inf")
+            entry = _llm_pool_configs[llm_name] = (config, refresh_at)
+        
+        llm = _llm_pool.get(llm_name)
+        if llm is None:
+            config = entry[0]
+            try:
+                if config.get("members"):
+                    config = dict(config, members=[get_member_llm(llm_configs, member) for member in config["members"]])
+                llm = create_llm_from_config(config, resolved=True)
+            except ValueError as e:
+                raise ValueError(f"Error creating LLM '{llm_name}': {str(e)}")
+            _llm_pool[llm_name] = llm
+    
+    return llm
+
+def get_llm(llm_name=None):
+    return get_pooled_llm(resolve_llm_name(llm_name))
+
+class BudgetedTask(Task):
+    """
+    Task that bounds the context handed over from earlier tasks.
+    
+    It can also be resumed: a task given a checkpointed output returns it
+    instead of running, and a completed task reports its output so it can
+    be checkpointed.
+    """
+    
+    context_max_tokens: Optional[int] = None
+    context_strategy: str = "truncate"
     
-    return agents
+    _restored_output: Optional[TaskOutput] = PrivateAttr(default=None)
+    _on_complete: Optional[Callable[[TaskOutput], None]] = PrivateAttr(default=None)
+    
+    @field_validator("context_strategy")
+    @classmethod
+    def validate_context_strategy(cls, value):
+        if value not in STRATEGIES:
+            raise ValueError(f"Unknown context strategy '{value}'. Expected one of: {', '.join(STRATEGIES)}")
+        return value
+    
+    def resume(self, restored_output=None, on_complete=None):
+        """Set the checkpointed output to reuse and the hook for new outputs"""
+        self._restored_output = restored_output
+        self._on_complete = on_complete
+    
+    def _fit_context(self, context):
+        if not self.context_max_tokens:
+            return context
+        return fit_to_budget(context, self.context_max_tokens, self.context_strategy)
+    
+    def execute_sync(self, agent=None, context=None, tools=None):
+        if self._restored_output is not None:
+            self.output = self._restored_output
+            return self.output
+        output = super().execute_sync(agent, self._fit_context(context), tools)
+        if self._on_complete is not None:
+            self._on_complete(output)
+        return output
+    
+    def execute_async(self, agent=None, context=None, tools=None):
+        if self._restored_output is not None:
+            self.output = self._restored_output
+            future = Future()
+            future.set_result(self.output)
+            return future
+        future = super().execute_async(agent, self._fit_context(context), tools)
+        if self._on_complete is None:
+            return future
+        # Waiters wake before done callbacks run, so the output is reported
+        # before the future handed back resolves
+        reported = Future()
+        def report(done):
+            if done.exception() is not None:
+                reported.set_exception(done.exception())
+                return
+            try:
+                self._on_complete(done.result())
+            except Exception as e:
+                logging.error(f"Failed to checkpoint task '{self.name}': {str(e)}")
+            reported.set_result(done.result())
+        future.add_done_callback(report)
+        return reported
 
-def load_tasks(topic, agents, llm_name=None, custom_llm=None):
-    with open("config/tasks.yaml", "r") as file:
-        task_configs = yaml.safe_load(file)
+class CrewPrototype:
+    """
+    Agents and tasks built once per config snapshot and LLM.
+    
+    Pydantic validation and agent setup run only here; each request gets
+    shallow clones with the templated fields substituted.
+    """
     
+    def __init__(self, snapshot, llm):
+        self.snapshot = snapshot
+        self.llm = llm
+        
+        self.agents = {}
+        for agent_name, config in snapshot.agents.items():
+            templates = snapshot.agent_templates[agent_name]
+            self.agents[agent_name] = Agent(
+                role=templates['role'].source,
+                goal=templates['goal'].source,
+                verbose=config.get('verbose', True),
+                backstory=templates['backstory'].source,
+                allow_delegation=config.get('allow_delegation', False),
+                llm=llm
+            )
+        
+        self.tasks = {}
+        for task_name, config in snapshot.tasks.items():
+            agent_name = config['agent']
+            if agent_name not in self.agents:
+                raise ValueError(f"Agent '{agent_name}' specified in task '{task_name}' not found in available agents")
+            
+            templates = snapshot.task_templates[task_name]
+            budget = config.get('context_budget') or {}
+            self.tasks[task_name] = BudgetedTask(
+                name=task_name,
+                description=templates['description'].source,
+                expected_output=templates['expected_output'].source,
+                agent=self.agents[agent_name],
+                context_max_tokens=budget.get('max_tokens'),
+                context_strategy=budget.get('strategy', 'truncate')
+            )
+    
+    @staticmethod
+    def _clone_agent(prototype, update):
+        agent = prototype.model_copy(update={
+            **update,
+            'id': uuid.uuid4(),
+            'tools': list(prototype.tools or []),
+            'tools_results': [],
+            'tools_handler': ToolsHandler(cache=prototype.cache_handler),
+        })
+        # Private attributes are copied by reference, so usage counters
+        # must not be shared with the prototype
+        agent._token_process = TokenProcess()
+        return agent
+    
+    def build_agents(self, values, pins=None):
+        """
+        Clone every agent prototype with its fields rendered from values
+        
+        Args:
+            values: Template variables
+            pins: From resolve_pinned_llms; resolved now when omitted.
+                Pinned agents get the pinned LLM instead of the request's
+        """
+        if pins is None:
+            pins = resolve_pinned_llms(self.snapshot)
+        agents = {}
+        for agent_name, prototype in self.agents.items():
+            fields = render_fields(self.snapshot.agent_templates[agent_name], values)
+            pinned = pins.get(("Agent", agent_name))
+            if pinned is not None:
+                fields['llm'] = get_pooled_llm(pinned)
+            agents[agent_name] = self._clone_agent(prototype, fields)
+        return agents
+    
+    def build_tasks(self, values, agents, pins=None):
+        """Clone every task prototype and bind it to the per-request agents"""
+        if pins is None:
+            pins = resolve_pinned_llms(self.snapshot)
+        tasks = []
+        for task_name, prototype in self.tasks.items():
+            agent_name = self.snapshot.tasks[task_name]['agent']
+            if agent_name not in agents:
+                raise ValueError(f"Agent '{agent_name}' specified in task '{task_name}' not found in available agents")
+            
+            # Tasks pinned to a model run on a copy of their agent bound to it
+            agent = agents[agent_name]
+            pinned = pins.get(("Task", task_name))
+            if pinned is not None:
+                task_llm = get_pooled_llm(pinned)
+                if task_llm is not agent.llm:
+                    agent = self._clone_agent(agent, {'llm': task_llm})
+            
+            fields = render_fields(self.snapshot.task_templates[task_name], values)
+            tasks.append(prototype.model_copy(update={
+                **fields,
+                'id': uuid.uuid4(),
+                'agent': agent,
+                'tools': list(prototype.tools or []),
+                'processed_by_agents': set(),
+            }))
+        return tasks
+
+# Keyed by (config version, LLM name) and cleared when the snapshot
+# changes, so prototypes of an older configuration go with it
+_prototypes = {}
+_prototypes_version = None
+_prototypes_lock = threading.Lock()
+
+def get_crew_prototype(llm_name, llm):
+    """
+    Return the prototype for the current config snapshot and LLM
+    
+    Args:
+        llm_name: The name llm is pooled under
+        llm: The LLM agents are built with; when the pool rebuilds it,
+            the prototype is rebuilt too
+    """
+    global _prototypes_version
+    snapshot = get_config_snapshot()
+    key = (snapshot.version, llm_name)
+    prototype = _prototypes.get(key)
+    if prototype is not None and prototype.llm is llm:
+        return prototype
+    
+    with _prototypes_lock:
+        if _prototypes_version != snapshot.version:
+            _prototypes.clear()
+            _prototypes_version = snapshot.version
+        prototype = _prototypes.get(key)
+        if prototype is None or prototype.llm is not llm:
+            prototype = CrewPrototype(snapshot, llm)
+            _prototypes[key] = prototype
+    return prototype
+
+def load_agents(topic, llm_name=None, custom_llm=None, variables=None, pins=None):
     llm_to_use = custom_llm or get_llm(llm_name)
+    prototype = get_crew_prototype(llm_name, llm_to_use)
     
-    tasks = []
-    for task_name, config in task_configs.items():
-        agent_name = config['agent']
-        if agent_name not in agents:
-            raise ValueError(f"Agent '{agent_name}' specified in task '{task_name}' not found in available agents")
+    return prototype.build_agents(template_variables(topic, variables), pins)
+
+def load_tasks(topic, agents, llm_name=None, custom_llm=None, variables=None, pins=None):
+    llm_to_use = custom_llm or get_llm(llm_name)
+    prototype = get_crew_prototype(llm_name, llm_to_use)
+    
+    return prototype.build_tasks(template_variables(topic, variables), agents, pins)
+
+class CrewRun:
+    """A finished crew run: the crewai output plus what produced it"""
+    
+    def __init__(self, topic, llm_name, output, task_durations, duration, cached=False, config_version=None, task_llms=None):
+        self.topic = topic
+        # The requested LLM; pinned agents and tasks are in task_llms
+        self.llm_name = llm_name
+        self.task_llms = task_llms or {}
+        self.output = output
+        self.task_durations = task_durations
+        self.duration = duration
+        self.cached = cached
+        # Fingerprint of the agents/tasks configuration that produced it
+        self.config_version = config_version
+    
+    def to_dict(self):
+        return {
+            "topic": self.topic,
+            "llm_name": self.llm_name,
+            "output": self.output.model_dump(mode="json"),
+            "task_durations": self.task_durations,
+            "task_llms": self.task_llms,
+            "duration": self.duration,
+        }
+    
+    @classmethod
+    def from_dict(cls, data, cached=False, config_version=None):
+        return cls(
+            data["topic"],
+            data["llm_name"],
+            CrewOutput.model_validate(data["output"]),
+            data.get("task_durations", {}),
+            data["duration"],
+            cached=cached,
+            config_version=config_version,
+            task_llms=data.get("task_llms"),
+        )
+
+def semantic_cache_scope(llm_name, variables, snapshot, task_llms=None):
+    """Everything besides the topic that must match for a cached result to apply"""
+    return json.dumps([llm_name, sorted((variables or {}).items()), snapshot.fingerprint, sorted((task_llms or {}).items())])
+
+def resume_tasks(tasks, checkpoints, fingerprint):
+    """
+    Reuse checkpointed outputs of a failed earlier attempt and checkpoint
+    every task that completes in this one
+    """
+    restored = {checkpoint["position"]: checkpoint for checkpoint in checkpoints.load(fingerprint)}
+    resuming = True
+    for position, task in enumerate(tasks):
+        checkpoint = restored.get(position)
+        # Only a contiguous prefix is reused; later outputs depended on it
+        resuming = resuming and checkpoint is not None and checkpoint["task_name"] == task.name
+        restored_output = TaskOutput.model_validate(checkpoint["output"]) if resuming else None
         
-        description = config['description'].format(topic=topic) if '{topic}' in config.get('description', '') else config['description']
-        expected_output = config.get('expected_output', '').format(topic=topic) if '{topic}' in config.get('expected_output', '') else config.get('expected_output', '')
+        def save(output, position=position, task_name=task.name):
+            checkpoints.save(fingerprint, position, task_name, output.model_dump(mode="json"))
         
-        tasks.append(Task(
-            description=description,
-            expected_output=expected_output,
-            agent=agents[agent_name]
-        ))
+        task.resume(restored_output, save)
     
-    return tasks
+    completed = sum(1 for task in tasks if task._restored_output is not None)
+    if completed:
+        logging.warning(f"Resuming crew after {completed} of {len(tasks)} checkpointed tasks")
 
-def run_crew_task(topic, llm_name=None):
-    llm = get_llm(llm_name)
+def run_crew(topic, llm_name=None, variables=None, use_cache=True):
+    llm_name = resolve_llm_name(llm_name)
+    snapshot = get_config_snapshot()
+    pins = resolve_pinned_llms(snapshot)
+    task_llms = task_llm_names(snapshot, llm_name, pins)
+    
+    cache = get_semantic_cache(snapshot.settings.get("semantic_cache")) if use_cache else None
+    if cache is not None:
+        scope = semantic_cache_scope(llm_name, variables, snapshot, task_llms)
+        hit = cache.lookup(topic, scope)
+        if hit is not None:
+            payload, _ = hit
+            # The cached run may be for a merely similar topic; report the request's
+            payload = dict(payload, topic=topic, llm_name=llm_name)
+            return CrewRun.from_dict(payload, cached=True, config_version=snapshot.fingerprint)
     
-    agents = load_agents(topic, llm_name, llm)
+    llm = get_pooled_llm(llm_name)
     
-    tasks = load_tasks(topic, agents, llm_name, llm)
+    agents = load_agents(topic, llm_name, llm, variables, pins)
     
+    tasks = load_tasks(topic, agents, llm_name, llm, variables, pins)
+    
+    checkpoints = get_checkpoint_store(snapshot.settings.get("checkpoints"))
+    if checkpoints is not None:
+        fingerprint = request_fingerprint(topic, llm_name, variables, snapshot.fingerprint)
+        resume_tasks(tasks, checkpoints, fingerprint)
+    
+    # Agents copied for a task-level llm must be crew members too, so they
+    # get the crew's memory and their token usage is counted
+    crew_agents = list(agents.values())
+    known = {agent.id for agent in crew_agents}
+    for task in tasks:
+        if task.agent.id not in known:
+            crew_agents.append(task.agent)
+            known.add(task.agent.id)
+    
+    # Memory is configured per agent in agents.yaml but owned by the crew
     crew = Crew(
-        agents=list(agents.values()),
+        agents=crew_agents,
         tasks=tasks,
-        process=Process.sequential
+        process=Process.sequential,
+        **crew_memory_kwargs(snapshot.agents)
     )
     
-    result = crew.kickoff(inputs={"topic": topic})
-    return result
+    started = time.perf_counter()
+    # Fields are already rendered above, so kickoff must not interpolate again
+    output = crew.kickoff()
+    task_durations = {task.name: task.execution_duration for task in tasks}
+    run = CrewRun(
+        topic, llm_name, output, task_durations, time.perf_counter() - started,
+        config_version=snapshot.fingerprint, task_llms=task_llms
+    )
+    if checkpoints is not None:
+        checkpoints.clear(fingerprint)
+    
+    if cache is not None:
+        cache.store(topic, scope, run.to_dict())
+    return run
+
+def run_crew_task(topic, llm_name=None, variables=None):
+    return run_crew(topic, llm_name, variables).output
 
 if __name__ == "__main__":
     test_topic = "artificial intelligence"
@@ -2,11 +2,25 @@
 from .registry import ProviderRegistry
 from .base import BaseProvider
 # Import all providers to ensure they're registered
-from . import ollama, gemini, msty  # Make sure msty is imported!
+from . import ollama, gemini, msty, race  # Make sure msty is imported!
+from .resilience import wrap_with_policies
+from .health import HealthMonitor, LLMHealthRegistry, LLMUnavailableError, llm_health
+from .secrets import SecretResolver, SecretSource, SecretSourceRegistry, get_secret_resolver
+from .wrappers import make_llm_calls_thread_safe
 
 
+def create_llm_from_config(config, resolved=False):
+    """
+    Build the LLM for an llms.yaml entry
 
-def create_llm_from_config(config):
+    Args:
+        config: The entry's configuration
+        resolved: Whether ${VAR} references were already substituted, as
+            the LLM pool does once per snapshot; resolving twice would
+            break "$${" escapes and secrets that contain "${"
+    """
+    if not resolved:
+        config = get_secret_resolver().resolve(config)
 
     provider_type = config.get("type", "").lower()
     provider_class = ProviderRegistry.get_provider(provider_type)
@@ -14,6 +28,20 @@ def create_llm_from_config(config):
     if not provider_class:
         raise ValueError(f"Unsupported LLM provider type: {provider_type}")
     
-    return provider_class.create_llm(config)
+    # Retry and hedging are configured per LLM, independent of the provider
+    return wrap_with_policies(provider_class.create_llm(config), config)
 
-__all__ = ["ProviderRegistry", "BaseProvider", "create_llm_from_config"]
\ No newline at end of file
+__all__ = [
+    "ProviderRegistry",
+    "BaseProvider",
+    "create_llm_from_config",
+    "HealthMonitor",
+    "LLMHealthRegistry",
+    "LLMUnavailableError",
+    "llm_health",
+    "SecretResolver",
+    "SecretSource",
+    "SecretSourceRegistry",
+    "get_secret_resolver",
+    "make_llm_calls_thread_safe",
+]
\ No newline at end of file
@@ -25,21 +25,15 @@ class BaseProvider(ABC):
         """
         Resolves environment variables in configuration values
         
+        References may be embedded, nested in dicts and lists, and carry
+        defaults; see SecretResolver. create_llm_from_config resolves
+        before calling create_llm, so providers receive resolved configs.
+        
         Args:
             config: The provider configuration with potential env vars
             
         Returns:
             Dict with resolved environment variables
         """
-        import os
-        resolved_config = config.copy()
-        
-        for key, value in resolved_config.items():
-            if isinstance(value, str) and value.startswith("${") and value.endswith("}"):
-                env_var = value[2:-1]
-                env_value = os.environ.get(env_var)
-                if not env_value:
-                    raise ValueError(f"Environment variable '{env_var}' not found")
-                resolved_config[key] = env_value
-                
-        return resolved_config
\ No newline at end of file
+        from .secrets import get_secret_resolver
+        return get_secret_resolver().resolve(config)
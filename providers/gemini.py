@@ -11,20 +11,21 @@ class GeminiProvider(BaseProvider):
     @classmethod
     def create_llm(cls, config: Dict[str, Any]) -> LLM:
         """Create an LLM instance for Gemini"""
-        # Resolve any environment variables
-        config = cls.resolve_env_vars(config)
-        
         # Get the configuration parameters with defaults
         model_name = config.get("model")
         api_key = config.get("api_key")
         temperature = config.get("temperature", 0.7)
+        # Optional gateway or proxy in front of the Gemini API
+        api_base = config.get("api_base")
         
         # Format the model name for liteLLM
         formatted_model = f"gemini/{model_name}"
         
         # Create and return the LLM
+        kwargs = {"api_base": api_base} if api_base else {}
         return LLM(
             model=formatted_model,
             api_key=api_key,
-            temperature=temperature
+            temperature=temperature,
+            **kwargs
         )
\ No newline at end of file
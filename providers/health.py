@@ -0,0 +1,276 @@
+# providers/health.py
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+from crewai import LLM
+import litellm
+
+HEALTH_DEFAULTS = {
+    "enabled": False,
+    "interval_seconds": 300,
+    "timeout_seconds": 30,
+    "unhealthy_after": 2,     # consecutive failed probes before an LLM is avoided
+    "probe_prompt": "Count from 1 to 10.",
+    "max_tokens": 32,
+    "llms": None,             # names to probe; None probes every entry
+}
+
+HEALTHY = "healthy"
+UNHEALTHY = "unhealthy"
+UNKNOWN = "unknown"
+
+
+class LLMUnavailableError(RuntimeError):
+    """Raised when the requested LLM is unhealthy and no fallback is healthy"""
+
+
+class HealthRecord:
+    """Health and capabilities of one llms.yaml entry"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.status = UNKNOWN
+        self.consecutive_failures = 0
+        self.last_checked: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.latency_seconds: Optional[float] = None
+        self.time_to_first_token: Optional[float] = None
+        self.tokens_per_second: Optional[float] = None
+        self.context_window: Optional[int] = None
+        self.supports_streaming: Optional[bool] = None
+        self.supports_function_calling: Optional[bool] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.__dict__)
+
+
+def probe_llm(llm: LLM, prompt: str, max_tokens: int = 32, timeout: float = 30) -> Dict[str, Any]:
+    """
+    Send a short streamed completion to an LLM and measure it
+
+    Args:
+        llm: The LLM to probe
+        prompt: Prompt for the probe completion
+        max_tokens: Upper bound for the probe's output
+        timeout: Seconds before the probe counts as failed
+
+    Returns:
+        Measurements: latency, time to first token, tokens per second and
+        whether streaming worked. Raises if the backend does not answer.
+    """
+    params = {
+        "model": llm.model,
+        "messages": [{"role": "user", "content": prompt}],
+        "max_tokens": max_tokens,
+        "timeout": timeout,
+        "api_key": llm.api_key,
+        "api_base": llm.api_base,
+        "base_url": llm.base_url,
+        "api_version": llm.api_version,
+        "max_retries": 0,
+    }
+
+    started = time.perf_counter()
+    first_token = None
+    try:
+        parts = []
+        for chunk in litellm.completion(stream=True, **params):
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                if first_token is None:
+                    first_token = time.perf_counter()
+                parts.append(delta)
+        text = "".join(parts)
+        streaming = True
+    except Exception as stream_error:
+        # Tell "cannot stream" apart from "down" with a plain completion
+        try:
+            response = litellm.completion(**params)
+        except Exception:
+            raise stream_error
+        text = response.choices[0].message.content or ""
+        streaming = False
+    finished = time.perf_counter()
+
+    try:
+        tokens = litellm.token_counter(model=llm.model, text=text)
+    except Exception:
+        tokens = len(text) // 4
+    generation_started = first_token or started
+    generation_time = finished - generation_started
+
+    return {
+        "latency_seconds": finished - started,
+        "time_to_first_token": (first_token - started) if first_token else None,
+        "tokens_per_second": tokens / generation_time if tokens and generation_time > 0 else None,
+        "supports_streaming": streaming,
+    }
+
+
+class LLMHealthRegistry:
+    """
+    Health and capability records for configured LLMs.
+
+    Records are refreshed by probes; LLMs never probed count as available.
+    Groups with members (e.g. races) are available while any member is.
+    """
+
+    def __init__(self, unhealthy_after: int = 2):
+        self.unhealthy_after = unhealthy_after
+        self._records: Dict[str, HealthRecord] = {}
+        self._groups: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+
+    def _record(self, name: str) -> HealthRecord:
+        record = self._records.get(name)
+        if record is None:
+            record = self._records[name] = HealthRecord(name)
+        return record
+
+    def set_group(self, name: str, members: List[str]) -> None:
+        with self._lock:
+            self._groups[name] = list(members)
+
+    def update_capabilities(self, name: str, llm: LLM) -> None:
+        """Record what the LLM object reports about itself"""
+        try:
+            context_window = llm.get_context_window_size()
+            function_calling = llm.supports_function_calling()
+        except Exception as e:
+            logging.warning(f"Could not read capabilities of LLM '{name}': {str(e)}")
+            return
+        with self._lock:
+            record = self._record(name)
+            record.context_window = context_window
+            record.supports_function_calling = function_calling
+
+    def record_success(self, name: str, measurements: Dict[str, Any]) -> None:
+        with self._lock:
+            record = self._record(name)
+            for key, value in measurements.items():
+                setattr(record, key, value)
+            record.status = HEALTHY
+            record.consecutive_failures = 0
+            record.last_error = None
+            record.last_checked = time.time()
+
+    def record_failure(self, name: str, error: str) -> None:
+        with self._lock:
+            record = self._record(name)
+            record.consecutive_failures += 1
+            record.last_error = error
+            record.last_checked = time.time()
+            if record.consecutive_failures >= self.unhealthy_after:
+                record.status = UNHEALTHY
+
+    def is_available(self, name: str) -> bool:
+        """Whether work may be sent to an LLM"""
+        with self._lock:
+            members = self._groups.get(name)
+            if members is not None:
+                return any(self._status(member) != UNHEALTHY for member in members)
+            return self._status(name) != UNHEALTHY
+
+    def _status(self, name: str) -> str:
+        record = self._records.get(name)
+        return record.status if record else UNKNOWN
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """All records as plain data, including derived group status"""
+        with self._lock:
+            records = {name: record.to_dict() for name, record in self._records.items()}
+            for name, members in self._groups.items():
+                statuses = [self._status(member) for member in members]
+                if HEALTHY in statuses:
+                    status = HEALTHY
+                elif all(status == UNHEALTHY for status in statuses):
+                    status = UNHEALTHY
+                else:
+                    status = UNKNOWN
+                records[name] = {"name": name, "status": status, "members": list(members)}
+        return records
+
+    def reset(self) -> None:
+        with self._lock:
+            self._records.clear()
+            self._groups.clear()
+
+
+class HealthMonitor:
+    """
+    Background thread that probes the configured LLMs at an interval.
+
+    Probes are real completions, billed like any other call. LLMs left
+    out of settings["llms"] are not probed and always count as available.
+
+    Args:
+        registry: Where probe results are recorded
+        load_configs: Returns the current llms.yaml entries
+        load_llm: Creates (or fetches from the pool) the LLM for an entry name
+        settings: Overrides for HEALTH_DEFAULTS
+    """
+
+    def __init__(
+        self,
+        registry: LLMHealthRegistry,
+        load_configs: Callable[[], Dict[str, Dict[str, Any]]],
+        load_llm: Callable[[str], LLM],
+        settings: Optional[Dict[str, Any]] = None,
+    ):
+        self.registry = registry
+        self.load_configs = load_configs
+        self.load_llm = load_llm
+        self.settings = {**HEALTH_DEFAULTS, **(settings or {})}
+        self.registry.unhealthy_after = self.settings["unhealthy_after"]
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def probe_all(self) -> None:
+        """Probe every selected entry once"""
+        settings = self.settings
+        selected = settings["llms"]
+        for name, config in self.load_configs().items():
+            if config.get("members"):
+                self.registry.set_group(name, config["members"])
+                continue
+            if selected is not None and name not in selected:
+                continue
+            try:
+                llm = self.load_llm(name)
+            except Exception as e:
+                self.registry.record_failure(name, f"configuration: {str(e)}")
+                continue
+
+            self.registry.update_capabilities(name, llm)
+            try:
+                measurements = probe_llm(llm, settings["probe_prompt"], settings["max_tokens"], settings["timeout_seconds"])
+            except Exception as e:
+                logging.warning(f"Health probe for LLM '{name}' failed: {str(e)}")
+                self.registry.record_failure(name, str(e))
+                continue
+            self.registry.record_success(name, measurements)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.probe_all()
+            except Exception as e:
+                logging.error(f"Health probing failed: {str(e)}")
+            self._stop.wait(self.settings["interval_seconds"])
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="llm-health", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.settings["timeout_seconds"])
+
+
+# Process-wide records consulted by get_llm
+llm_health = LLMHealthRegistry()
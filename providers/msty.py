@@ -10,9 +10,6 @@ class OpenAIProvider(BaseProvider):
     @classmethod
     def create_llm(cls, config: Dict[str, Any]) -> LLM:
         """Create an LLM instance for OpenAI or OpenAI-compatible endpoints"""
-        # Resolve any environment variables
-        config = cls.resolve_env_vars(config)
-        
         # Get the configuration parameters with defaults
         model = config.get("model")
         api_base = config.get("api_base")
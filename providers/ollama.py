@@ -11,9 +11,6 @@ class OllamaProvider(BaseProvider):
     @classmethod
     def create_llm(cls, config: Dict[str, Any]) -> LLM:
         """Create an LLM instance for Ollama"""
-        # Resolve any environment variables
-        config = cls.resolve_env_vars(config)
-        
         # Get the configuration parameters with defaults
         model = config.get("model")
         base_url = config.get("base_url")
@@ -0,0 +1,110 @@
+# providers/race.py
+import copy
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Union
+from crewai import LLM
+from .base import BaseProvider
+from .registry import ProviderRegistry
+from .wrappers import DelegatingLLM, make_llm_calls_thread_safe
+
+
+class RaceLLM(DelegatingLLM):
+    """
+    Sends every call to all member LLMs at once and returns the first
+    valid (non-empty) completion.
+
+    Calls still queued when a winner arrives are cancelled. Calls already
+    in flight cannot be interrupted by litellm, so they finish in the
+    background and their results are discarded; their tokens are still
+    billed and counted in the crew's usage.
+    """
+
+    def __init__(self, members: List[LLM], max_concurrent: int = 4, timeout: Optional[float] = None):
+        # Copies, so stop words set by one agent never leak into the pooled LLMs
+        self.members = [copy.copy(member) for member in members]
+        super().__init__(self.members[0])
+        self.race_timeout = timeout
+        make_llm_calls_thread_safe()
+        self._executor = ThreadPoolExecutor(
+            max_workers=len(members) * max_concurrent,
+            thread_name_prefix="llm-race",
+        )
+        self._wins = {member.model: 0 for member in self.members}
+        self._lock = threading.Lock()
+
+    def get_context_window_size(self) -> int:
+        # The prompt must fit whichever member wins
+        return min(member.get_context_window_size() for member in self.members)
+
+    def supports_function_calling(self) -> bool:
+        return all(member.supports_function_calling() for member in self.members)
+
+    def supports_stop_words(self) -> bool:
+        return all(member.supports_stop_words() for member in self.members)
+
+    def call(
+        self,
+        messages: Union[str, List[Dict[str, str]]],
+        tools: Optional[List[dict]] = None,
+        callbacks: Optional[List[Any]] = None,
+        available_functions: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        pending = {}
+        for member in self.members:
+            member.stop = self.stop
+            future = self._executor.submit(member.call, messages, tools, callbacks, available_functions)
+            pending[future] = member
+
+        errors = []
+        # One deadline for the whole race, however many members fail early
+        deadline = time.monotonic() + self.race_timeout if self.race_timeout is not None else None
+        try:
+            while pending:
+                timeout = max(0.0, deadline - time.monotonic()) if deadline is not None else None
+                done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                if not done:
+                    raise TimeoutError(f"No LLM answered within {self.race_timeout} seconds")
+                for future in done:
+                    member = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        errors.append(f"{member.model}: {str(e)}")
+                        continue
+                    if result and str(result).strip():
+                        with self._lock:
+                            self._wins[member.model] += 1
+                        return result
+                    errors.append(f"{member.model}: empty response")
+        finally:
+            for future in pending:
+                future.cancel()
+
+        raise RuntimeError(f"All raced LLMs failed: {'; '.join(errors)}")
+
+    def stats(self) -> Dict[str, int]:
+        """Number of races won by each member model"""
+        with self._lock:
+            return dict(self._wins)
+
+
+@ProviderRegistry.register("race")
+class RaceProvider(BaseProvider):
+    """Provider that races other configured LLMs against each other"""
+
+    @classmethod
+    def create_llm(cls, config: Dict[str, Any]) -> LLM:
+        """Create a RaceLLM from already created member LLMs"""
+        members = config.get("members") or []
+        if len(members) < 2:
+            raise ValueError("A race needs at least two members")
+        if not all(isinstance(member, LLM) for member in members):
+            raise ValueError("Race members must be LLM instances; list LLM names in llms.yaml and load them with get_llm")
+
+        return RaceLLM(
+            members,
+            max_concurrent=config.get("max_concurrent", 4),
+            timeout=config.get("timeout"),
+        )
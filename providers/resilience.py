@@ -0,0 +1,257 @@
+# providers/resilience.py
+import logging
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Union
+from crewai import LLM
+from litellm import exceptions as litellm_exceptions
+from .wrappers import DelegatingLLM, make_llm_calls_thread_safe
+
+# Errors worth another attempt; bad requests, auth failures and context
+# overflows (which crewai handles by summarizing) are raised immediately
+RETRYABLE_ERRORS = (
+    ConnectionError,
+    TimeoutError,
+    litellm_exceptions.APIConnectionError,
+    litellm_exceptions.Timeout,
+    litellm_exceptions.RateLimitError,
+    litellm_exceptions.ServiceUnavailableError,
+    litellm_exceptions.InternalServerError,
+)
+
+RETRY_DEFAULTS = {
+    "max_attempts": 3,
+    "base_delay": 0.5,     # seconds before the first retry
+    "max_delay": 10.0,     # cap for a single backoff
+    "budget_ratio": 0.2,   # retries earned per successful call
+    "budget_min": 5,       # retries always available, even after a failure streak
+}
+
+HEDGE_DEFAULTS = {
+    "enabled": False,
+    "percentile": 95,      # hedge once a call is slower than this latency percentile
+    "min_samples": 20,     # latencies observed before hedging starts
+    "window": 200,         # recent latencies the percentile is computed over
+    "max_concurrent": 4,   # simultaneous hedged calls before hedges are skipped
+}
+
+
+class RetryBudget:
+    """
+    Token bucket that caps retries to a share of successful traffic.
+
+    Each success deposits ratio tokens and each retry withdraws one, so a
+    failing backend sees at most about ratio extra calls per request
+    instead of max_attempts times the load.
+    """
+
+    def __init__(self, ratio: float = 0.2, minimum: int = 5):
+        self.ratio = ratio
+        self.minimum = minimum
+        self.capacity = max(minimum, 1) * 10
+        self.tokens = float(minimum)
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class LatencyTracker:
+    """Rolling window of call latencies"""
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        with self._lock:
+            ordered = sorted(self._samples)
+        if not ordered:
+            return None
+        index = min(len(ordered) - 1, int(len(ordered) * percentile / 100))
+        return ordered[index]
+
+
+def _run_in_thread(fn, *args) -> Future:
+    """Run fn on a new daemon thread and return a future of its result"""
+    future = Future()
+
+    def run():
+        try:
+            future.set_result(fn(*args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name="llm-call", daemon=True).start()
+    return future
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """Exponential backoff with full jitter for the given retry (1-based)"""
+    return random.uniform(0, min(max_delay, base_delay * 2 ** (attempt - 1)))
+
+
+class ResilientLLM(DelegatingLLM):
+    """
+    Wraps a provider-created LLM with an explicit retry policy and
+    optional hedged requests.
+
+    Transient errors are retried with jittered exponential backoff while
+    the retry budget allows it. With hedging enabled, a call that is
+    still running after the recent p95 latency gets a duplicate request
+    and whichever answers first is used.
+    """
+
+    def __init__(self, llm: LLM, retry: Optional[Dict[str, Any]] = None, hedge: Optional[Dict[str, Any]] = None):
+        super().__init__(llm)
+        self.retry_policy = {**RETRY_DEFAULTS, **(retry or {})}
+        self.hedge_policy = {**HEDGE_DEFAULTS, **(hedge or {})}
+        if self.retry_policy["max_attempts"] < 1:
+            raise ValueError("retry.max_attempts must be at least 1")
+
+        # The policy here is the only one; litellm and the OpenAI client
+        # would otherwise retry on their own with their own delays
+        self.inner.additional_params = {**self.inner.additional_params, "max_retries": 0, "num_retries": 0}
+
+        self.budget = RetryBudget(self.retry_policy["budget_ratio"], self.retry_policy["budget_min"])
+        self.latencies = LatencyTracker(self.hedge_policy["window"])
+        self._executor = None
+        self._hedge_slots = None
+        if self.hedge_policy["enabled"]:
+            make_llm_calls_thread_safe()
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.hedge_policy["max_concurrent"],
+                thread_name_prefix="llm-hedge",
+            )
+            self._hedge_slots = threading.BoundedSemaphore(self.hedge_policy["max_concurrent"])
+        self._counters = {"calls": 0, "retries": 0, "budget_exhausted": 0, "hedges": 0, "hedge_wins": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def call(
+        self,
+        messages: Union[str, List[Dict[str, str]]],
+        tools: Optional[List[dict]] = None,
+        callbacks: Optional[List[Any]] = None,
+        available_functions: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        self.inner.stop = self.stop
+        self._count("calls")
+        policy = self.retry_policy
+
+        attempt = 1
+        while True:
+            try:
+                result = self._attempt(messages, tools, callbacks, available_functions)
+            except RETRYABLE_ERRORS as e:
+                if attempt >= policy["max_attempts"]:
+                    raise
+                if not self.budget.withdraw():
+                    self._count("budget_exhausted")
+                    logging.warning(f"Retry budget exhausted for {self.model}: {str(e)}")
+                    raise
+                delay = backoff_delay(attempt, policy["base_delay"], policy["max_delay"])
+                logging.warning(f"{self.model} call failed ({str(e)}), retrying in {delay:.2f}s")
+                self._count("retries")
+                time.sleep(delay)
+                attempt += 1
+                continue
+            self.budget.deposit()
+            return result
+
+    def _timed_call(self, messages, tools, callbacks, available_functions):
+        started = time.perf_counter()
+        result = self.inner.call(messages, tools, callbacks, available_functions)
+        self.latencies.record(time.perf_counter() - started)
+        return result
+
+    def _hedge_delay(self) -> Optional[float]:
+        if not self.hedge_policy["enabled"] or len(self.latencies) < self.hedge_policy["min_samples"]:
+            return None
+        return self.latencies.percentile(self.hedge_policy["percentile"])
+
+    def _attempt(self, messages, tools, callbacks, available_functions):
+        delay = self._hedge_delay()
+        if delay is None:
+            return self._timed_call(messages, tools, callbacks, available_functions)
+
+        # The primary gets its own thread, so the hedge pool bounds
+        # duplicate requests only and never queues ordinary calls
+        primary = _run_in_thread(self._timed_call, messages, tools, callbacks, available_functions)
+        done, _ = wait([primary], timeout=delay)
+        if done or not self._hedge_slots.acquire(blocking=False):
+            return primary.result()
+
+        self._count("hedges")
+        hedge = self._executor.submit(self._timed_call, messages, tools, callbacks, available_functions)
+        # The slot is held until the hedge itself finishes, even when it loses
+        hedge.add_done_callback(lambda _: self._hedge_slots.release())
+        pending = {primary, hedge}
+        errors = {}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            # On a tie the primary's answer is used
+            for future in sorted(done, key=lambda future: future is hedge):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    errors[future] = e
+                    continue
+                if future is hedge:
+                    self._count("hedge_wins")
+                return result
+        raise errors.get(primary) or errors[hedge]
+
+    def stats(self) -> Dict[str, Any]:
+        """Retry and hedging counters plus the current hedge threshold"""
+        with self._lock:
+            stats = dict(self._counters)
+        stats["retry_tokens"] = round(self.budget.tokens, 2)
+        stats["hedge_after_seconds"] = self._hedge_delay()
+        return stats
+
+
+def wrap_with_policies(llm: LLM, config: Dict[str, Any]) -> LLM:
+    """
+    Apply the retry and hedge settings of an llms.yaml entry
+
+    Args:
+        llm: The provider-created LLM
+        config: The LLM's configuration
+
+    Returns:
+        The LLM wrapped in ResilientLLM, or unchanged when neither is set
+    """
+    retry = config.get("retry")
+    hedge = config.get("hedge")
+    if not retry and not hedge:
+        return llm
+
+    if retry is False:
+        retry = {"max_attempts": 1}
+    elif not isinstance(retry, dict):
+        retry = None
+    # A hedge mapping turns hedging on unless it says otherwise
+    hedge = {"enabled": True, **hedge} if isinstance(hedge, dict) else {"enabled": bool(hedge)}
+    return ResilientLLM(llm, retry=retry, hedge=hedge)
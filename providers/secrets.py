@@ -0,0 +1,241 @@
+# providers/secrets.py
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+import yaml
+
+SECRET_DEFAULTS = {
+    "ttl_seconds": 300,            # how long a looked-up secret is reused; 0 keeps it until restart
+    "sources": [{"type": "env"}],  # tried in order; the first non-empty value wins
+}
+
+
+class SecretSource:
+    """A place secrets are looked up by name"""
+
+    def get(self, name: str) -> Optional[str]:
+        """Return the secret, or None if this source does not have it"""
+        raise NotImplementedError
+
+
+class SecretSourceRegistry:
+    """Registry of secret source types usable in the secrets settings"""
+
+    _sources: Dict[str, Type[SecretSource]] = {}
+
+    @classmethod
+    def register(cls, source_type: str):
+        """
+        Decorator to register a secret source class
+
+        Args:
+            source_type: The type name used in settings.yaml
+
+        Returns:
+            Decorator function
+        """
+        def decorator(source_class):
+            cls._sources[source_type.lower()] = source_class
+            return source_class
+        return decorator
+
+    @classmethod
+    def get_source(cls, source_type: str) -> Optional[Type[SecretSource]]:
+        return cls._sources.get(source_type.lower())
+
+    @classmethod
+    def create(cls, config: Dict[str, Any]) -> SecretSource:
+        """Build a source from its settings entry, e.g. {"type": "file", "directory": "/run/secrets"}"""
+        config = dict(config)
+        source_type = str(config.pop("type", ""))
+        source_class = cls.get_source(source_type)
+        if source_class is None:
+            raise ValueError(f"Unsupported secret source type: {source_type}")
+        return source_class(**config)
+
+
+@SecretSourceRegistry.register("env")
+class EnvSource(SecretSource):
+    """Process environment, including values loaded from .env"""
+
+    def get(self, name: str) -> Optional[str]:
+        return os.environ.get(name)
+
+
+@SecretSourceRegistry.register("file")
+class FileSource(SecretSource):
+    """One file per secret, as mounted by Docker and Kubernetes secrets"""
+
+    def __init__(self, directory: str = "/run/secrets"):
+        self.directory = directory
+
+    def get(self, name: str) -> Optional[str]:
+        try:
+            with open(os.path.join(self.directory, name), "r", encoding="utf-8") as f:
+                return f.read().strip()
+        except (FileNotFoundError, IsADirectoryError):
+            return None
+
+
+@SecretSourceRegistry.register("vault")
+class VaultSource(SecretSource):
+    """
+    Local stand-in for a secret manager: a JSON or YAML file mapping names
+    to values. The file is re-read when it changes, so rotating a secret is
+    a matter of rewriting it.
+    """
+
+    def __init__(self, path: str = "data/vault.json"):
+        self.path = path
+        self._values: Dict[str, Any] = {}
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> Optional[str]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            if self._stamp != (stat.st_mtime_ns, stat.st_size):
+                with open(self.path, "r", encoding="utf-8") as f:
+                    values = json.load(f) if self.path.endswith(".json") else yaml.safe_load(f)
+                self._values = values or {}
+                self._stamp = (stat.st_mtime_ns, stat.st_size)
+            value = self._values.get(name)
+        return None if value is None else str(value)
+
+
+class SecretResolver:
+    """
+    Substitutes ${VAR} references in configuration values.
+
+    References may be embedded in longer strings ("Bearer ${TOKEN}"), carry
+    a default ("${HOST:-localhost}", which may itself contain references)
+    and appear anywhere in nested dicts and lists; "$${" is a literal "${".
+    Secrets are looked up in each source in turn and reused for ttl_seconds,
+    after which the next lookup fetches them again; missing ones are looked
+    up again every time.
+    """
+
+    def __init__(self, sources: Optional[List[SecretSource]] = None, ttl_seconds: float = 300):
+        self.sources = sources if sources is not None else [EnvSource()]
+        self.ttl_seconds = ttl_seconds
+        self._cache: Dict[str, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, name: str) -> Optional[str]:
+        """The secret from the first source that has a non-empty value, or None"""
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(name)
+        if cached is not None and (not self.ttl_seconds or now < cached[1]):
+            return cached[0]
+
+        value = None
+        for source in self.sources:
+            value = source.get(name)
+            if value:
+                break
+        if not value:
+            # Misses are not cached, so a secret provided later is found
+            return None
+        with self._lock:
+            self._cache[name] = (value, now + (self.ttl_seconds or 0))
+        return value
+
+    def resolve(self, value: Any) -> Any:
+        """
+        Resolve every reference in a configuration value
+
+        Args:
+            value: A string, or a dict or list containing strings; other
+                values are returned unchanged
+
+        Returns:
+            A copy with references replaced; the input is not modified
+
+        Raises:
+            ValueError: If a reference without default cannot be resolved
+        """
+        if isinstance(value, str):
+            return self._parse(value, 0, nested=False)[0] if "$" in value else value
+        if isinstance(value, dict):
+            return {key: self.resolve(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self.resolve(item) for item in value]
+        return value
+
+    def _parse(self, text: str, position: int, nested: bool, evaluate: bool = True) -> Tuple[str, int]:
+        # Returns the resolved text and the position after it; nested
+        # parses of defaults stop at their closing brace, and defaults that
+        # are not needed are only skipped over, never looked up
+        parts = []
+        while position < len(text):
+            if text.startswith("$${", position):
+                parts.append("${")
+                position += 3
+            elif text.startswith("${", position):
+                value, position = self._reference(text, position + 2, evaluate)
+                parts.append(value)
+            elif nested and text[position] == "}":
+                return "".join(parts), position
+            else:
+                parts.append(text[position])
+                position += 1
+        if nested:
+            raise ValueError(f"Unterminated variable reference in '{text}'")
+        return "".join(parts), position
+
+    def _reference(self, text: str, position: int, evaluate: bool) -> Tuple[str, int]:
+        end = position
+        while end < len(text) and (text[end].isalnum() or text[end] == "_"):
+            end += 1
+        name = text[position:end]
+        if not name:
+            raise ValueError(f"Invalid variable reference in '{text}'")
+
+        value = self.lookup(name) if evaluate else ""
+        if text.startswith(":-", end):
+            default, end = self._parse(text, end + 2, nested=True, evaluate=evaluate and value is None)
+            if value is None:
+                value = default
+        elif not text.startswith("}", end):
+            raise ValueError(f"Invalid variable reference in '{text}'")
+        elif value is None:
+            raise ValueError(f"Environment variable '{name}' not found")
+        # Skip the closing brace
+        return value, end + 1
+
+
+_resolver: Optional[SecretResolver] = None
+_resolver_key: Optional[str] = None
+_resolver_lock = threading.Lock()
+
+
+def get_secret_resolver(settings: Optional[Dict[str, Any]] = None) -> SecretResolver:
+    """
+    Return the process-wide secret resolver
+
+    Args:
+        settings: The secrets section of settings.yaml; the resolver is
+            rebuilt (and its cache dropped) when they change. Without
+            settings the current resolver is returned, or an env-only one
+
+    Returns:
+        The shared SecretResolver
+    """
+    global _resolver, _resolver_key
+    with _resolver_lock:
+        if settings is None and _resolver is not None:
+            return _resolver
+        config = {**SECRET_DEFAULTS, **(settings or {})}
+        key = json.dumps(config, sort_keys=True, default=str)
+        if _resolver is None or key != _resolver_key:
+            sources = [SecretSourceRegistry.create(source) for source in config["sources"]]
+            _resolver = SecretResolver(sources, config["ttl_seconds"])
+            _resolver_key = key
+        return _resolver
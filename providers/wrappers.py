@@ -0,0 +1,79 @@
+# providers/wrappers.py
+import threading
+import warnings
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Union
+
+import crewai.llm
+import litellm
+from crewai import LLM
+
+
+class DelegatingLLM(LLM):
+    """
+    Base class for LLMs that wrap a provider-created LLM.
+
+    crewai only accepts LLM instances, so wrappers subclass LLM and start
+    from a copy of the wrapped instance's attributes. The checks crewai
+    makes before calling (stop words, context window, function calling)
+    therefore see the wrapped model, while call() can add behaviour.
+    """
+
+    def __init__(self, llm: LLM):
+        self.__dict__.update(llm.__dict__)
+        self.inner = llm
+
+    def call(
+        self,
+        messages: Union[str, List[Dict[str, str]]],
+        tools: Optional[List[dict]] = None,
+        callbacks: Optional[List[Any]] = None,
+        available_functions: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        # Agents append their stop words to the LLM they were given
+        self.inner.stop = self.stop
+        return self.inner.call(messages, tools, callbacks, available_functions)
+
+
+_suppressing = 0
+_suppressing_lock = threading.Lock()
+_suppressed_warnings = None
+
+
+@contextmanager
+def _suppress_warnings():
+    # crewai's own version swaps sys.stdout and sys.stderr for a filtering
+    # stream on every LLM call. With crews on several threads, one call
+    # restores the streams while another thread is still printing to the
+    # one it replaced; print() only holds a borrowed reference on Python
+    # 3.11, so the stream is freed mid-write and the interpreter crashes.
+    # Here the streams are left alone, and warnings are ignored from the
+    # first call in flight until the last one returns
+    global _suppressing, _suppressed_warnings
+    with _suppressing_lock:
+        if not _suppressing:
+            _suppressed_warnings = warnings.catch_warnings()
+            _suppressed_warnings.__enter__()
+            warnings.filterwarnings("ignore")
+        _suppressing += 1
+    try:
+        yield
+    finally:
+        with _suppressing_lock:
+            _suppressing -= 1
+            if not _suppressing:
+                _suppressed_warnings.__exit__(None, None, None)
+
+
+def make_llm_calls_thread_safe() -> None:
+    """
+    Replace crewai's per-call stream redirection with a thread-safe equivalent
+
+    Needed wherever LLM calls run on more than one thread: crew workers,
+    raced and hedged calls. It changes process-wide crewai state, so those
+    entry points install it rather than importing providers. Repeated
+    calls are harmless. The redirection only filtered litellm's debug
+    hints, which litellm can turn off itself.
+    """
+    litellm.suppress_debug_info = True
+    crewai.llm.suppress_warnings = _suppress_warnings
@@ -0,0 +1,13 @@
+# storage/__init__.py
+from .vector_index import VectorIndex
+from .embeddings import CachedEmbedder, create_embedder, get_cached_embedder
+from .semantic_cache import SemanticCache, get_semantic_cache
+
+__all__ = [
+    "VectorIndex",
+    "CachedEmbedder",
+    "create_embedder",
+    "get_cached_embedder",
+    "SemanticCache",
+    "get_semantic_cache",
+]
@@ -0,0 +1,107 @@
+# storage/checkpoints.py
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+CHECKPOINT_DEFAULTS = {
+    "enabled": False,
+    "path": "data/checkpoints.db",
+    "ttl_seconds": 86400,
+}
+
+
+def request_fingerprint(topic: str, llm_name: str, variables: Optional[Dict[str, str]], config_fingerprint: str) -> str:
+    """Identify a crew request so a retry finds the same checkpoints"""
+    key = json.dumps([topic, llm_name, sorted((variables or {}).items()), config_fingerprint])
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+
+
+class CheckpointStore:
+    """
+    SQLite store of completed task outputs per request fingerprint.
+
+    A crew saves each task's output as it finishes; a retry of the same
+    request (in this or a later process) loads them and skips those tasks.
+    Checkpoints are cleared once the whole crew succeeds and expire after
+    ttl_seconds otherwise.
+    """
+
+    def __init__(self, path: str, ttl_seconds: Optional[float] = 86400):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS checkpoints (
+                    fingerprint TEXT,
+                    position INTEGER,
+                    task_name TEXT,
+                    output TEXT,
+                    created REAL,
+                    PRIMARY KEY (fingerprint, position)
+                )
+                """
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def save(self, fingerprint: str, position: int, task_name: str, output: Dict[str, Any]) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (fingerprint, position, task_name, output, created) VALUES (?, ?, ?, ?, ?)",
+                (fingerprint, position, task_name, json.dumps(output), time.time()),
+            )
+
+    def load(self, fingerprint: str) -> List[Dict[str, Any]]:
+        """
+        Completed task outputs for a request, in task order
+
+        Returns:
+            [{"position": ..., "task_name": ..., "output": {...}}, ...]
+        """
+        with self._connect() as conn:
+            if self.ttl_seconds:
+                conn.execute("DELETE FROM checkpoints WHERE created < ?", (time.time() - self.ttl_seconds,))
+            rows = conn.execute(
+                "SELECT position, task_name, output FROM checkpoints WHERE fingerprint = ? ORDER BY position",
+                (fingerprint,),
+            ).fetchall()
+        return [{"position": position, "task_name": task_name, "output": json.loads(output)} for position, task_name, output in rows]
+
+    def clear(self, fingerprint: str) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM checkpoints WHERE fingerprint = ?", (fingerprint,))
+
+
+_checkpoint_stores: Dict[str, CheckpointStore] = {}
+_checkpoint_stores_lock = threading.Lock()
+
+
+def get_checkpoint_store(settings: Optional[Dict[str, Any]]) -> Optional[CheckpointStore]:
+    """
+    Return the process-wide checkpoint store for the checkpoints settings
+
+    Args:
+        settings: The checkpoints section of settings.yaml
+
+    Returns:
+        The store, or None when checkpointing is disabled
+    """
+    config = {**CHECKPOINT_DEFAULTS, **(settings or {})}
+    if not config["enabled"]:
+        return None
+
+    key = json.dumps(config, sort_keys=True, default=str)
+    with _checkpoint_stores_lock:
+        store = _checkpoint_stores.get(key)
+        if store is None:
+            store = _checkpoint_stores[key] = CheckpointStore(config["path"], config["ttl_seconds"])
+    return store
@@ -0,0 +1,180 @@
+# storage/embeddings.py
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+Embedder = Callable[[List[str]], List[List[float]]]
+
+DEFAULT_EMBEDDER = {
+    "provider": "ollama",
+    "config": {"model": "nomic-embed-text"},
+}
+
+
+def create_embedder(embedder_config: Optional[Dict[str, Any]] = None) -> Embedder:
+    """
+    Create an embedding function from a crewai embedder configuration
+
+    Args:
+        embedder_config: {"provider": ..., "config": {...}} as accepted by crewai
+
+    Returns:
+        A callable mapping a list of texts to a list of vectors
+    """
+    from crewai.utilities import EmbeddingConfigurator
+
+    return EmbeddingConfigurator().configure_embedder(embedder_config or DEFAULT_EMBEDDER)
+
+
+def embedder_namespace(embedder_config: Optional[Dict[str, Any]] = None) -> str:
+    """Identify the embedding model so cached vectors are never mixed across models"""
+    config = embedder_config or DEFAULT_EMBEDDER
+    model = (config.get("config") or {}).get("model")
+    return f"{config.get('provider')}:{model}"
+
+
+class CachedEmbedder:
+    """
+    Embedding function wrapper with a content-hashed, two-tier cache.
+
+    Vectors are keyed by a SHA-256 of the model namespace and the text.
+    Recent vectors stay in an in-memory LRU; with a path they are also
+    written to a SQLite file so they survive restarts and are shared by
+    every worker on the host.
+    """
+
+    def __init__(self, embedder: Embedder, max_entries: int = 10000, path: Optional[str] = None, namespace: str = ""):
+        self.embedder = embedder
+        self.max_entries = max_entries
+        self.namespace = namespace
+        self.path = path
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._cache: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with self._connect() as conn:
+                conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path)
+
+    def key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.namespace}\0{text}".encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, vector: List[float]) -> None:
+        self._cache[key] = vector
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    def _load_from_disk(self, keys: List[str]) -> Dict[str, List[float]]:
+        found = {}
+        with self._connect() as conn:
+            # Stay below SQLite's host parameter limit
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = conn.execute(f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch)
+                for key, vector in rows:
+                    found[key] = np.frombuffer(vector, dtype=np.float32).tolist()
+        return found
+
+    def _store_on_disk(self, items: Dict[str, List[float]]) -> None:
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in items.items()],
+            )
+
+    def __call__(self, input: List[str]) -> List[List[float]]:
+        keys = [self.key(text) for text in input]
+        results: List[Optional[List[float]]] = [None] * len(input)
+        missing: Dict[str, List[int]] = {}
+
+        with self._lock:
+            for position, key in enumerate(keys):
+                vector = self._cache.get(key)
+                if vector is None:
+                    missing.setdefault(key, []).append(position)
+                else:
+                    self._cache.move_to_end(key)
+                    results[position] = vector
+                    self.hits += 1
+
+        if missing and self.path:
+            found = self._load_from_disk(list(missing))
+            with self._lock:
+                for key, vector in found.items():
+                    self._remember(key, vector)
+                    for position in missing.pop(key):
+                        results[position] = vector
+                    self.disk_hits += 1
+
+        if missing:
+            # Embed each distinct text once, even if repeated in the batch
+            texts = [input[positions[0]] for positions in missing.values()]
+            vectors = self.embedder(texts)
+            computed = dict(zip(missing, vectors))
+            with self._lock:
+                for key, vector in computed.items():
+                    self._remember(key, vector)
+                    for position in missing[key]:
+                        results[position] = vector
+                self.misses += len(computed)
+            if self.path:
+                self._store_on_disk(computed)
+
+        return results
+
+    def stats(self) -> Dict[str, int]:
+        """Cache counters for metrics endpoints"""
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "entries": len(self._cache),
+        }
+
+
+_cached_embedders: Dict[str, CachedEmbedder] = {}
+_cached_embedders_lock = threading.Lock()
+
+
+def get_cached_embedder(embedder_config: Optional[Dict[str, Any]] = None, cache_config: Optional[Dict[str, Any]] = None) -> Embedder:
+    """
+    Return a process-wide embedder for a configuration, cached if requested
+
+    Args:
+        embedder_config: crewai embedder configuration
+        cache_config: {"max_entries": ..., "path": ...}, or None to disable caching
+
+    Returns:
+        The embedding function; identical configurations share one cache
+    """
+    if not cache_config:
+        return create_embedder(embedder_config)
+
+    key = json.dumps([embedder_config, cache_config], sort_keys=True, default=str)
+    with _cached_embedders_lock:
+        embedder = _cached_embedders.get(key)
+        if embedder is None:
+            embedder = CachedEmbedder(
+                create_embedder(embedder_config),
+                max_entries=cache_config.get("max_entries", 10000),
+                path=cache_config.get("path"),
+                namespace=embedder_namespace(embedder_config),
+            )
+            _cached_embedders[key] = embedder
+    return embedder
@@ -0,0 +1,62 @@
+# storage/jobs.py
+import json
+import os
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional
+
+
+class JobStore:
+    """
+    SQLite queue of crew requests handed over between processes.
+
+    A draining process adds the requests it could not finish; the next
+    process claims them on startup. Claiming deletes the rows in the same
+    transaction, so workers sharing the file never run a job twice.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    payload TEXT,
+                    created REAL
+                )
+                """
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def add(self, payload: Dict[str, Any]) -> None:
+        with self._connect() as conn:
+            conn.execute("INSERT INTO jobs (payload, created) VALUES (?, ?)", (json.dumps(payload), time.time()))
+
+    def claim(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Remove and return up to limit stored jobs (all without one), oldest first"""
+        if limit is not None and limit <= 0:
+            return []
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute("SELECT id, payload FROM jobs ORDER BY id LIMIT ?", (-1 if limit is None else limit,)).fetchall()
+            if rows:
+                conn.execute("DELETE FROM jobs WHERE id <= ?", (rows[-1][0],))
+            conn.commit()
+        finally:
+            conn.close()
+        return [json.loads(payload) for _, payload in rows]
+
+    def claim_all(self) -> List[Dict[str, Any]]:
+        """Remove and return every stored job, oldest first"""
+        return self.claim()
+
+    def __len__(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
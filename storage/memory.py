@@ -0,0 +1,241 @@
+# storage/memory.py
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from crewai.memory import EntityMemory, LongTermMemory, ShortTermMemory
+from crewai.memory.storage.interface import Storage
+from crewai.memory.storage.ltm_sqlite_storage import LTMSQLiteStorage
+
+from .embeddings import DEFAULT_EMBEDDER, Embedder, get_cached_embedder
+from .vector_index import VectorIndex
+
+MEMORY_DEFAULTS = {
+    "backend": "bounded",
+    "index": "flat",
+    "path": None,
+    "max_entries": 1000,
+    "eviction": "lru",
+    "embedder": DEFAULT_EMBEDDER,
+    "embedding_cache": {"max_entries": 10000},
+}
+
+MEMORY_BACKENDS = ("bounded", "crewai")
+
+
+class BoundedMemoryStorage(Storage):
+    """
+    crewai memory storage backed by a bounded VectorIndex.
+
+    Entries beyond max_entries are evicted instead of accumulating for the
+    lifetime of the worker. With a path, entries are also written to a
+    SQLite file and reloaded into the index on startup.
+    """
+
+    def __init__(
+        self,
+        type: str,
+        embedder: Embedder,
+        max_entries: int = 1000,
+        eviction: str = "lru",
+        index: str = "flat",
+        path: Optional[str] = None,
+    ):
+        self.type = type
+        self.embedder = embedder
+        self.index = VectorIndex(max_entries=max_entries, eviction=eviction, index=index)
+        self.db_path = os.path.join(path, f"{type}.db") if path else None
+        self._lock = threading.Lock()
+
+        if self.db_path:
+            os.makedirs(path, exist_ok=True)
+            self._initialize_db()
+            self._load()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path)
+
+    def _initialize_db(self) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS memories (
+                    id TEXT PRIMARY KEY,
+                    context TEXT,
+                    metadata TEXT,
+                    vector BLOB,
+                    created REAL
+                )
+                """
+            )
+
+    def _load(self) -> None:
+        import numpy as np
+
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, context, metadata, vector FROM memories ORDER BY created DESC LIMIT ?",
+                (self.index.max_entries,),
+            ).fetchall()
+            # Drop rows that no longer fit, e.g. after max_entries was lowered
+            conn.execute(
+                "DELETE FROM memories WHERE id NOT IN (SELECT id FROM memories ORDER BY created DESC LIMIT ?)",
+                (self.index.max_entries,),
+            )
+
+        for key, context, metadata, vector in reversed(rows):
+            self.index.add(key, np.frombuffer(vector, dtype=np.float32), (context, json.loads(metadata)))
+
+    def save(self, value: Any, metadata: Dict[str, Any]) -> None:
+        import numpy as np
+
+        context = str(value)
+        metadata = metadata or {}
+        vector = np.asarray(self.embedder([context])[0], dtype=np.float32)
+        key = uuid.uuid4().hex
+
+        with self._lock:
+            evicted = self.index.add(key, vector, (context, metadata))
+            if self.db_path:
+                with self._connect() as conn:
+                    conn.execute(
+                        "INSERT INTO memories (id, context, metadata, vector, created) VALUES (?, ?, ?, ?, ?)",
+                        (key, context, json.dumps(metadata, default=str), vector.tobytes(), time.time()),
+                    )
+                    if evicted:
+                        conn.executemany("DELETE FROM memories WHERE id = ?", [(k,) for k in evicted])
+
+    def search(
+        self,
+        query: str,
+        limit: int = 3,
+        score_threshold: float = 0.35,
+        filter: Optional[dict] = None,
+    ) -> List[Any]:
+        # Like crewai's RAGStorage, a failing embedder must not fail the task
+        try:
+            vector = self.embedder([query])[0]
+            hits = self.index.search(vector, limit, score_threshold)
+        except Exception as e:
+            logging.error(f"Error during {self.type} search: {str(e)}")
+            return []
+        return [
+            {"id": key, "metadata": metadata, "context": context, "score": score}
+            for key, score, (context, metadata) in hits
+        ]
+
+    def reset(self) -> None:
+        with self._lock:
+            self.index.clear()
+            if self.db_path:
+                with self._connect() as conn:
+                    conn.execute("DELETE FROM memories")
+
+
+class BoundedLTMStorage(LTMSQLiteStorage):
+    """Long-term memory SQLite storage that keeps only the newest max_entries rows"""
+
+    def __init__(self, db_path: Optional[str] = None, max_entries: int = 1000):
+        self.max_entries = max_entries
+        super().__init__(db_path=db_path)
+
+    def save(self, task_description, metadata, datetime, score) -> None:
+        super().save(task_description, metadata, datetime, score)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(
+                "DELETE FROM long_term_memories WHERE id NOT IN "
+                "(SELECT id FROM long_term_memories ORDER BY id DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+
+
+def normalize_memory_config(value: Any) -> Optional[Dict[str, Any]]:
+    """
+    Turn an agent's memory setting into a full backend configuration
+
+    Args:
+        value: false/None, true, or a mapping overriding MEMORY_DEFAULTS
+
+    Returns:
+        The merged configuration, or None when memory is disabled
+    """
+    if not value:
+        return None
+    config = dict(MEMORY_DEFAULTS)
+    if isinstance(value, dict):
+        if not value.get("enabled", True):
+            return None
+        config.update({key: item for key, item in value.items() if key != "enabled"})
+    if config["backend"] not in MEMORY_BACKENDS:
+        raise ValueError(f"Unknown memory backend '{config['backend']}'. Expected one of: {', '.join(MEMORY_BACKENDS)}")
+    return config
+
+
+_crew_memory: Dict[str, Dict[str, Any]] = {}
+_crew_memory_lock = threading.Lock()
+
+
+def _build_crew_memory(config: Dict[str, Any]) -> Dict[str, Any]:
+    if config["backend"] == "crewai":
+        # crewai's own chroma-backed memory, unbounded
+        return {"memory": True, "embedder": config["embedder"]}
+
+    embedder = get_cached_embedder(config["embedder"], config.get("embedding_cache"))
+
+    def storage(type):
+        return BoundedMemoryStorage(
+            type,
+            embedder,
+            max_entries=config["max_entries"],
+            eviction=config["eviction"],
+            index=config["index"],
+            path=config["path"],
+        )
+
+    path = config["path"]
+    ltm_storage = BoundedLTMStorage(
+        db_path=os.path.join(path, "long_term.db") if path else None,
+        max_entries=config["max_entries"],
+    )
+    return {
+        "memory": True,
+        "embedder": config["embedder"],
+        "short_term_memory": ShortTermMemory(storage=storage("short_term")),
+        "entity_memory": EntityMemory(storage=storage("entities")),
+        "long_term_memory": LongTermMemory(storage=ltm_storage),
+    }
+
+
+def crew_memory_kwargs(agent_configs: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Crew keyword arguments for the memory configured on agents.
+
+    crewai keeps memory per crew, so the first memory-enabled agent's
+    backend is used for the whole crew. Backends are built once per
+    distinct configuration and shared by every request in the process.
+
+    Args:
+        agent_configs: Agent definitions from agents.yaml
+
+    Returns:
+        Keyword arguments for Crew, empty when no agent enables memory
+    """
+    for agent_config in agent_configs.values():
+        config = normalize_memory_config(agent_config.get("memory"))
+        if config:
+            break
+    else:
+        return {}
+
+    key = json.dumps(config, sort_keys=True, default=str)
+    with _crew_memory_lock:
+        kwargs = _crew_memory.get(key)
+        if kwargs is None:
+            kwargs = _build_crew_memory(config)
+            _crew_memory[key] = kwargs
+    return kwargs
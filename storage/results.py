@@ -0,0 +1,219 @@
+# storage/results.py
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+RESULT_DEFAULTS = {
+    "enabled": False,
+    "path": "data/results.db",
+    "ttl_seconds": 0,
+}
+
+# Columns besides the stored response itself
+RESULT_COLUMNS = ("id", "topic", "llm_name", "config_version", "variables", "created")
+
+
+class ResultStore:
+    """
+    SQLite store of completed crew results.
+
+    Rows are indexed by topic, LLM and configuration version together with
+    their creation time, and listed newest first. Pages are keyset based:
+    each page returns a cursor holding the sort key to continue after, so
+    deep pages cost the same as the first, rows added meanwhile do not
+    shift them, and a cursor stays valid after its row expires.
+    """
+
+    def __init__(self, path: str, ttl_seconds: Optional[float] = 0):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS results (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    topic TEXT COLLATE NOCASE,
+                    llm_name TEXT,
+                    config_version TEXT,
+                    variables TEXT,
+                    created REAL,
+                    response TEXT
+                )
+                """
+            )
+            # Every index ends in created (and implicitly id), so filtered
+            # listings come out of the index already in page order
+            conn.execute("CREATE INDEX IF NOT EXISTS results_topic ON results (topic, created)")
+            conn.execute("CREATE INDEX IF NOT EXISTS results_llm ON results (llm_name, created)")
+            conn.execute("CREATE INDEX IF NOT EXISTS results_config ON results (config_version, created)")
+            conn.execute("CREATE INDEX IF NOT EXISTS results_created ON results (created)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def add(
+        self,
+        topic: str,
+        llm_name: str,
+        config_version: str,
+        variables: Optional[Dict[str, str]],
+        response: Dict[str, Any],
+    ) -> int:
+        """Store a result and return its id"""
+        with self._connect() as conn:
+            if self.ttl_seconds:
+                conn.execute("DELETE FROM results WHERE created < ?", (time.time() - self.ttl_seconds,))
+            cursor = conn.execute(
+                "INSERT INTO results (topic, llm_name, config_version, variables, created, response) VALUES (?, ?, ?, ?, ?, ?)",
+                (topic, llm_name, config_version, json.dumps(variables or {}, sort_keys=True), time.time(), json.dumps(response)),
+            )
+            return cursor.lastrowid
+
+    def get(self, result_id: int) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT {', '.join(RESULT_COLUMNS)}, response FROM results WHERE id = ?", (result_id,)
+            ).fetchone()
+        return self._record(row) if row else None
+
+    def query(
+        self,
+        topic: Optional[str] = None,
+        llm_name: Optional[str] = None,
+        config_version: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        limit: int = 50,
+        after: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        One page of results, newest first
+
+        Args:
+            topic: Only results for this topic (case-insensitive)
+            llm_name: Only results from this LLM
+            config_version: Only results produced by this configuration
+            since: Only results created at or after this Unix time
+            until: Only results created before this Unix time
+            limit: Page size
+            after: The cursor returned with the previous page
+
+        Returns:
+            The page's records and the cursor of the next page, or None
+            when this was the last one
+
+        Raises:
+            ValueError: If after is not a cursor returned by query
+        """
+        clauses, params = [], []
+        for column, value in (("topic", topic), ("llm_name", llm_name), ("config_version", config_version)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("created >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("created < ?")
+            params.append(until)
+        if after is not None:
+            clauses.append("(created, id) < (?, ?)")
+            params.extend(decode_cursor(after))
+        if self.ttl_seconds:
+            clauses.append("created >= ?")
+            params.append(time.time() - self.ttl_seconds)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        # One extra row tells whether another page follows
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT {', '.join(RESULT_COLUMNS)}, response FROM results {where} "
+                "ORDER BY created DESC, id DESC LIMIT ?",
+                params + [limit + 1],
+            ).fetchall()
+        records = [self._record(row) for row in rows[:limit]]
+        next_cursor = encode_cursor(records[-1]["created"], records[-1]["id"]) if len(rows) > limit else None
+        return records, next_cursor
+
+    def export(self, batch_size: int = 500, **filters) -> Iterator[Dict[str, Any]]:
+        """
+        Every matching result, newest first
+
+        Reads page by page instead of holding one read transaction open,
+        so an export of any size neither buffers nor blocks writers.
+
+        Args:
+            batch_size: Rows read per query
+            filters: The filters of query
+        """
+        after = None
+        while True:
+            records, after = self.query(limit=batch_size, after=after, **filters)
+            yield from records
+            if after is None:
+                return
+
+    def __len__(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    @staticmethod
+    def _record(row: tuple) -> Dict[str, Any]:
+        record = dict(zip(RESULT_COLUMNS, row[:-1]))
+        record["variables"] = json.loads(record["variables"])
+        record["response"] = json.loads(row[-1])
+        return record
+
+
+def encode_cursor(created: float, result_id: int) -> str:
+    """Page cursor for continuing after the row with this sort key"""
+    # repr round-trips the float exactly
+    return f"{created!r}:{result_id}"
+
+
+def decode_cursor(cursor: str) -> Tuple[float, int]:
+    """
+    The sort key held by a page cursor
+
+    Raises:
+        ValueError: If the cursor was not made by encode_cursor
+    """
+    created, separator, result_id = cursor.partition(":")
+    if not separator:
+        raise ValueError(f"Invalid results cursor '{cursor}'")
+    try:
+        return float(created), int(result_id)
+    except ValueError:
+        raise ValueError(f"Invalid results cursor '{cursor}'") from None
+
+
+_result_stores: Dict[str, ResultStore] = {}
+_result_stores_lock = threading.Lock()
+
+
+def get_result_store(settings: Optional[Dict[str, Any]]) -> Optional[ResultStore]:
+    """
+    Return the process-wide result store for the results settings
+
+    Args:
+        settings: The results section of settings.yaml
+
+    Returns:
+        The store, or None when storing results is disabled
+    """
+    config = {**RESULT_DEFAULTS, **(settings or {})}
+    if not config["enabled"]:
+        return None
+
+    key = json.dumps(config, sort_keys=True, default=str)
+    with _result_stores_lock:
+        store = _result_stores.get(key)
+        if store is None:
+            store = _result_stores[key] = ResultStore(config["path"], config["ttl_seconds"])
+    return store
@@ -0,0 +1,253 @@
+# storage/semantic_cache.py
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from .embeddings import DEFAULT_EMBEDDER, Embedder, get_cached_embedder
+from .vector_index import VectorIndex
+
+SEMANTIC_CACHE_DEFAULTS = {
+    "enabled": False,
+    "similarity_threshold": 0.92,
+    "max_entries": 5000,
+    "ttl_seconds": 86400,
+    "path": None,
+    "embedder": DEFAULT_EMBEDDER,
+    "embedding_cache": {"max_entries": 10000},
+}
+
+# Candidates inspected per lookup; hits from other scopes are skipped
+_SEARCH_WIDTH = 8
+
+
+def normalize_topic(topic: str) -> str:
+    """Lowercase, strip punctuation and collapse whitespace"""
+    topic = re.sub(r"[^\w\s]", " ", topic.lower())
+    return " ".join(topic.split())
+
+
+class SemanticCache:
+    """
+    Cache of crew results keyed by topic meaning rather than exact text.
+
+    Lookups first try the normalized topic exactly, then embed it and
+    search a bounded VectorIndex of earlier topics. A hit requires the same
+    scope (LLM, extra variables and config fingerprint) and a cosine
+    similarity of at least similarity_threshold.
+    """
+
+    def __init__(
+        self,
+        embedder: Embedder,
+        similarity_threshold: float = 0.92,
+        max_entries: int = 5000,
+        ttl_seconds: Optional[float] = 86400,
+        path: Optional[str] = None,
+    ):
+        self.embedder = embedder
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.path = path
+        self.index = VectorIndex(max_entries=max_entries, eviction="lru")
+        self._exact: Dict[Tuple[str, str], str] = {}
+        self._exact_keys: Dict[str, Tuple[str, str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.exact_hits = 0
+        self.misses = 0
+        self.errors = 0
+
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._initialize_db()
+            self._load()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path)
+
+    def _initialize_db(self) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS semantic_cache (
+                    key TEXT PRIMARY KEY,
+                    scope TEXT,
+                    topic TEXT,
+                    vector BLOB,
+                    payload TEXT,
+                    created REAL
+                )
+                """
+            )
+
+    def _load(self) -> None:
+        with self._connect() as conn:
+            if self.ttl_seconds:
+                conn.execute("DELETE FROM semantic_cache WHERE created < ?", (time.time() - self.ttl_seconds,))
+            rows = conn.execute(
+                "SELECT key, scope, topic, vector, payload, created FROM semantic_cache ORDER BY created DESC LIMIT ?",
+                (self.index.max_entries,),
+            ).fetchall()
+
+        for key, scope, topic, vector, payload, created in reversed(rows):
+            self._add(key, scope, topic, np.frombuffer(vector, dtype=np.float32), json.loads(payload), created)
+
+    def _add(self, key, scope, topic, vector, payload, created) -> None:
+        evicted = self.index.add(key, vector, (scope, topic, payload, created))
+        self._exact[(scope, topic)] = key
+        self._exact_keys[key] = (scope, topic)
+        for old_key in evicted:
+            self._forget(old_key)
+        if evicted and self.path:
+            with self._connect() as conn:
+                conn.executemany("DELETE FROM semantic_cache WHERE key = ?", [(k,) for k in evicted])
+
+    def _forget(self, key: str) -> None:
+        exact_key = self._exact_keys.pop(key, None)
+        if exact_key is not None and self._exact.get(exact_key) == key:
+            del self._exact[exact_key]
+
+    def _discard(self, key: str) -> None:
+        self.index.remove(key)
+        self._forget(key)
+
+    def _expired(self, created: float) -> bool:
+        return bool(self.ttl_seconds) and time.time() - created > self.ttl_seconds
+
+    def lookup(self, topic: str, scope: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        """
+        Find a cached result for a topic
+
+        Args:
+            topic: Topic as sent by the client
+            scope: Everything besides the topic that must match exactly
+
+        Returns:
+            (payload, similarity) for a hit, or None for a miss
+        """
+        normalized = normalize_topic(topic)
+
+        with self._lock:
+            key = self._exact.get((scope, normalized))
+            if key is not None:
+                hit = self._exact_hit(key)
+                if hit is not None:
+                    return hit
+
+        try:
+            vector = self.embedder([normalized])[0]
+        except Exception as e:
+            logging.error(f"Semantic cache lookup failed: {str(e)}")
+            with self._lock:
+                self.errors += 1
+                self.misses += 1
+            return None
+
+        with self._lock:
+            for key, score, (hit_scope, _, payload, created) in self.index.search(
+                vector, _SEARCH_WIDTH, self.similarity_threshold
+            ):
+                if hit_scope != scope:
+                    continue
+                if self._expired(created):
+                    self._discard(key)
+                    continue
+                self.hits += 1
+                return payload, score
+            self.misses += 1
+        return None
+
+    def _exact_hit(self, key: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        entry = self.index.get(key)
+        if entry is None:
+            return None
+        _, _, payload, created = entry
+        if self._expired(created):
+            self._discard(key)
+            return None
+        self.hits += 1
+        self.exact_hits += 1
+        return payload, 1.0
+
+    def store(self, topic: str, scope: str, payload: Dict[str, Any]) -> None:
+        """Remember the result for a topic; failures only cost the cache entry"""
+        normalized = normalize_topic(topic)
+        try:
+            vector = np.asarray(self.embedder([normalized])[0], dtype=np.float32)
+        except Exception as e:
+            logging.error(f"Semantic cache store failed: {str(e)}")
+            with self._lock:
+                self.errors += 1
+            return
+
+        key = uuid.uuid4().hex
+        created = time.time()
+        with self._lock:
+            previous = self._exact.get((scope, normalized))
+            if previous is not None:
+                self._discard(previous)
+            self._add(key, scope, normalized, vector, payload, created)
+            if self.path:
+                with self._connect() as conn:
+                    if previous is not None:
+                        conn.execute("DELETE FROM semantic_cache WHERE key = ?", (previous,))
+                    conn.execute(
+                        "INSERT INTO semantic_cache (key, scope, topic, vector, payload, created) VALUES (?, ?, ?, ?, ?, ?)",
+                        (key, scope, normalized, vector.tobytes(), json.dumps(payload), created),
+                    )
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for metrics endpoints"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.index),
+            "hits": self.hits,
+            "exact_hits": self.exact_hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+_semantic_caches: Dict[str, SemanticCache] = {}
+_semantic_caches_lock = threading.Lock()
+
+
+def get_semantic_cache(settings: Optional[Dict[str, Any]]) -> Optional[SemanticCache]:
+    """
+    Return the process-wide semantic cache for the semantic_cache settings
+
+    Args:
+        settings: The semantic_cache section of settings.yaml
+
+    Returns:
+        The cache, or None when it is disabled
+    """
+    config = dict(SEMANTIC_CACHE_DEFAULTS)
+    config.update(settings or {})
+    if not config["enabled"]:
+        return None
+
+    key = json.dumps(config, sort_keys=True, default=str)
+    with _semantic_caches_lock:
+        cache = _semantic_caches.get(key)
+        if cache is None:
+            cache = SemanticCache(
+                get_cached_embedder(config["embedder"], config.get("embedding_cache")),
+                similarity_threshold=config["similarity_threshold"],
+                max_entries=config["max_entries"],
+                ttl_seconds=config["ttl_seconds"],
+                path=config["path"],
+            )
+            _semantic_caches[key] = cache
+    return cache
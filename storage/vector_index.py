@@ -0,0 +1,214 @@
+# storage/vector_index.py
+import itertools
+import threading
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+EVICTION_POLICIES = ("lru", "fifo")
+INDEX_TYPES = ("flat", "hnsw")
+
+
+class VectorIndex:
+    """
+    Bounded in-process vector index with cosine similarity search.
+
+    Vectors live in a preallocated float32 matrix of max_entries rows, so
+    memory use is fixed up front. When the index is full the least recently
+    used (lru) or oldest (fifo) entry is evicted to make room. The "flat"
+    index scans every row with one matrix product, which is exact and fast
+    for a few tens of thousands of entries; "hnsw" uses hnswlib for
+    approximate search on larger indexes.
+    """
+
+    def __init__(self, max_entries: int = 1000, eviction: str = "lru", index: str = "flat"):
+        if max_entries <= 0:
+            raise ValueError("max_entries must be a positive integer")
+        if eviction not in EVICTION_POLICIES:
+            raise ValueError(f"Unknown eviction policy '{eviction}'. Expected one of: {', '.join(EVICTION_POLICIES)}")
+        if index not in INDEX_TYPES:
+            raise ValueError(f"Unknown index type '{index}'. Expected one of: {', '.join(INDEX_TYPES)}")
+        if index == "hnsw":
+            try:
+                import hnswlib  # noqa: F401
+            except ImportError:
+                raise ImportError("hnswlib is not installed. Please install it with `pip install chroma-hnswlib`.")
+
+        self.max_entries = max_entries
+        self.eviction = eviction
+        self.index_type = index
+        self.dimensions: Optional[int] = None
+
+        self._vectors: Optional[np.ndarray] = None
+        self._hnsw = None
+        # hnswlib labels are never reused: a label that is re-added while
+        # marked deleted can end up on two elements, so each add gets a
+        # fresh one and the label -> slot mapping is kept here
+        self._hnsw_labels = itertools.count()
+        self._label_slots: Dict[int, int] = {}
+        self._slot_labels: List[Optional[int]] = [None] * max_entries
+        self._keys: List[Optional[Hashable]] = [None] * max_entries
+        self._payloads: List[Any] = [None] * max_entries
+        self._slots: Dict[Hashable, int] = {}
+        self._free = list(range(max_entries - 1, -1, -1))
+        # Logical clocks: insertion order for fifo, last access for lru
+        self._inserted = np.zeros(max_entries, dtype=np.int64)
+        self._accessed = np.zeros(max_entries, dtype=np.int64)
+        self._clock = itertools.count(1)
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._slots
+
+    def _allocate(self, dimensions: int) -> None:
+        self.dimensions = dimensions
+        self._vectors = np.zeros((self.max_entries, dimensions), dtype=np.float32)
+        if self.index_type == "hnsw":
+            import hnswlib
+            self._hnsw = hnswlib.Index(space="ip", dim=dimensions)
+            self._hnsw.init_index(max_elements=self.max_entries, allow_replace_deleted=True)
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        array = np.asarray(vector, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(array)
+        return array / norm if norm else array
+
+    def _evict_one(self) -> Hashable:
+        occupied = np.fromiter(self._slots.values(), dtype=np.int64)
+        clock = self._accessed if self.eviction == "lru" else self._inserted
+        slot = int(occupied[np.argmin(clock[occupied])])
+        key = self._keys[slot]
+        self._release(slot)
+        return key
+
+    def _release(self, slot: int) -> None:
+        del self._slots[self._keys[slot]]
+        self._keys[slot] = None
+        self._payloads[slot] = None
+        if self._hnsw is not None:
+            label = self._slot_labels[slot]
+            self._hnsw.mark_deleted(label)
+            del self._label_slots[label]
+            self._slot_labels[slot] = None
+        self._free.append(slot)
+
+    def add(self, key: Hashable, vector, payload: Any = None) -> List[Hashable]:
+        """
+        Add or replace an entry
+
+        Args:
+            key: Unique identifier of the entry
+            vector: Embedding of the entry
+            payload: Data returned alongside search hits
+
+        Returns:
+            Keys evicted to make room for the new entry
+        """
+        normalized = self._normalize(vector)
+        evicted = []
+
+        with self._lock:
+            if self._vectors is None:
+                self._allocate(normalized.shape[0])
+            elif normalized.shape[0] != self.dimensions:
+                raise ValueError(f"Expected vectors with {self.dimensions} dimensions, got {normalized.shape[0]}")
+
+            if key in self._slots:
+                self._release(self._slots[key])
+            if not self._free:
+                evicted.append(self._evict_one())
+
+            slot = self._free.pop()
+            tick = next(self._clock)
+            self._vectors[slot] = normalized
+            self._keys[slot] = key
+            self._payloads[slot] = payload
+            self._slots[key] = slot
+            self._inserted[slot] = tick
+            self._accessed[slot] = tick
+            if self._hnsw is not None:
+                label = next(self._hnsw_labels)
+                self._hnsw.add_items(normalized.reshape(1, -1), np.array([label]), replace_deleted=True)
+                self._label_slots[label] = slot
+                self._slot_labels[slot] = label
+
+        return evicted
+
+    def remove(self, key: Hashable) -> bool:
+        """Remove an entry, returning whether it existed"""
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                return False
+            self._release(slot)
+            return True
+
+    def touch(self, key: Hashable) -> None:
+        """Mark an entry as recently used"""
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is not None:
+                self._accessed[slot] = next(self._clock)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return an entry's payload by key, marking it as recently used"""
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                return default
+            self._accessed[slot] = next(self._clock)
+            return self._payloads[slot]
+
+    def search(self, vector, limit: int = 3, min_score: float = 0.0) -> List[Tuple[Hashable, float, Any]]:
+        """
+        Find the entries most similar to a vector
+
+        Args:
+            vector: Query embedding
+            limit: Maximum number of hits
+            min_score: Minimum cosine similarity of a hit
+
+        Returns:
+            List of (key, score, payload) tuples, best match first
+        """
+        with self._lock:
+            if not self._slots or limit <= 0:
+                return []
+
+            query = self._normalize(vector)
+            if query.shape[0] != self.dimensions:
+                raise ValueError(f"Expected vectors with {self.dimensions} dimensions, got {query.shape[0]}")
+
+            count = min(limit, len(self._slots))
+            if self._hnsw is not None:
+                labels, distances = self._hnsw.knn_query(query.reshape(1, -1), k=count)
+                candidates = [
+                    (self._label_slots[label], 1.0 - distance)
+                    for label, distance in zip(labels[0].tolist(), distances[0].tolist())
+                    if label in self._label_slots
+                ]
+            else:
+                occupied = np.fromiter(self._slots.values(), dtype=np.int64)
+                scores = self._vectors[occupied] @ query
+                top = np.argpartition(-scores, count - 1)[:count] if count < len(occupied) else np.arange(len(occupied))
+                top = top[np.argsort(-scores[top])]
+                candidates = zip(occupied[top].tolist(), scores[top].tolist())
+
+            hits = []
+            tick = next(self._clock)
+            for slot, score in candidates:
+                if score < min_score or self._keys[slot] is None:
+                    continue
+                self._accessed[slot] = tick
+                hits.append((self._keys[slot], float(score), self._payloads[slot]))
+            return hits
+
+    def clear(self) -> None:
+        """Remove every entry"""
+        with self._lock:
+            for slot in list(self._slots.values()):
+                self._release(slot)
@@ -0,0 +1,207 @@
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+# crewai agents finish on a "Final Answer:" line
+DEFAULT_ANSWER = "Thought: I now can give a great answer\nFinal Answer: Mock answer from the local backend."
+EMBEDDING_DIMENSIONS = 16
+
+
+def mock_embedding(text: str) -> List[float]:
+    """Deterministic embedding: equal texts map to equal vectors"""
+    digest = hashlib.sha256(text.encode("utf-8")).digest()
+    return [byte / 255.0 for byte in digest[:EMBEDDING_DIMENSIONS]]
+
+
+class MockLLMBackend:
+    """
+    Local HTTP server standing in for every LLM backend in llms.yaml.
+
+    Speaks enough of each wire format for litellm and the embedders:
+    OpenAI-compatible chat completions, Ollama generate/chat/embed and
+    Gemini generateContent. Every completion waits `latency` seconds, so
+    tests can tell parallel from serial execution. Requests are recorded
+    for assertions. Binds an ephemeral port, so parallel test processes
+    each get their own server.
+    """
+
+    def __init__(self, latency: float = 0.0, answer: str = DEFAULT_ANSWER):
+        self.latency = latency
+        self.answer = answer
+        self.requests: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockLLMBackend":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-llm-backend", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "MockLLMBackend":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def record(self, route: str, model: Optional[str], started: float) -> None:
+        with self._lock:
+            self.requests.append({"route": route, "model": model, "started": started, "finished": time.monotonic()})
+
+    def routes(self) -> Dict[str, int]:
+        """Number of requests per route"""
+        with self._lock:
+            counts = {}
+            for request in self.requests:
+                counts[request["route"]] = counts.get(request["route"], 0) + 1
+            return counts
+
+    def max_concurrency(self) -> int:
+        """Largest number of completions that were in flight at once"""
+        with self._lock:
+            events = sorted(
+                [(request["started"], 1) for request in self.requests if request["route"] != "embed"] +
+                [(request["finished"], -1) for request in self.requests if request["route"] != "embed"]
+            )
+        current = peak = 0
+        for _, change in events:
+            current += change
+            peak = max(peak, current)
+        return peak
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests.clear()
+
+    # Response bodies per wire format
+
+    def openai_completion(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "id": "chatcmpl-mock",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "mock"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": self.answer}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 10, "total_tokens": 20},
+        }
+
+    def ollama_generate(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "model": body.get("model", "mock"),
+            "created_at": "2024-01-01T00:00:00Z",
+            "response": self.answer,
+            "done": True,
+            "prompt_eval_count": 10,
+            "eval_count": 10,
+        }
+
+    def ollama_chat(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "model": body.get("model", "mock"),
+            "created_at": "2024-01-01T00:00:00Z",
+            "message": {"role": "assistant", "content": self.answer},
+            "done": True,
+            "prompt_eval_count": 10,
+            "eval_count": 10,
+        }
+
+    def gemini_completion(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "candidates": [{
+                "content": {"parts": [{"text": self.answer}], "role": "model"},
+                "finishReason": "STOP",
+                "index": 0,
+            }],
+            "usageMetadata": {"promptTokenCount": 10, "candidatesTokenCount": 10, "totalTokenCount": 20},
+        }
+
+    def _handler(self):
+        backend = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _reply(self, payload: Dict[str, Any], status: int = 200) -> None:
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                # Ollama and OpenAI model listings
+                self._reply({"models": [], "data": []})
+
+            def do_POST(self):
+                started = time.monotonic()
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                path = self.path.split("?")[0]
+
+                if path in ("/api/embed", "/api/embeddings"):
+                    inputs = body.get("input", body.get("prompt", ""))
+                    texts = inputs if isinstance(inputs, list) else [inputs]
+                    embeddings = [mock_embedding(text) for text in texts]
+                    backend.record("embed", body.get("model"), started)
+                    return self._reply({"embeddings": embeddings, "embedding": embeddings[0]})
+                if path == "/api/show":
+                    return self._reply({"modelfile": "", "parameters": "", "template": "", "details": {}, "model_info": {}})
+
+                routes = {
+                    "/api/generate": ("ollama", backend.ollama_generate),
+                    "/api/chat": ("ollama_chat", backend.ollama_chat),
+                }
+                if path in routes:
+                    route, respond = routes[path]
+                elif path.endswith("/chat/completions"):
+                    route, respond = "openai", backend.openai_completion
+                elif path.endswith(":generateContent"):
+                    route, respond = "gemini", backend.gemini_completion
+                else:
+                    return self._reply({"error": f"Unknown route {path}"}, status=404)
+
+                time.sleep(backend.latency)
+                payload = respond(body)
+                backend.record(route, body.get("model"), started)
+                self._reply(payload)
+
+        return Handler
+
+
+def mock_llm_configs(llm_configs: Dict[str, Dict[str, Any]], url: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Point every configuration in llms.yaml at the mock backend
+
+    Endpoints are replaced, API keys become dummies and retry/hedge
+    policies are kept, so construction goes through the real providers.
+    """
+    mocked = {}
+    for name, config in llm_configs.items():
+        config = dict(config)
+        provider = config.get("type", "").lower()
+        if provider == "ollama":
+            config["base_url"] = url
+        elif provider == "openai":
+            config["api_base"] = f"{url}/v1"
+            config["api_key"] = "mock-key"
+        elif provider == "gemini":
+            # litellm posts to "{api_base}:generateContent"
+            config["api_base"] = f"{url}/gemini/models/{config.get('model')}"
+            config["api_key"] = "mock-key"
+        mocked[name] = config
+    return mocked
@@ -0,0 +1,195 @@
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+from types import SimpleNamespace
+
+# Add the project root directory to the Python path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import batch
+
+
+class FakeRunner:
+    """Stands in for main.run_crew and records how many crews overlapped"""
+
+    def __init__(self, delay=0.05, fail_topics=()):
+        self.delay = delay
+        self.fail_topics = set(fail_topics)
+        self.calls = []
+        self.running = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, topic, llm_name=None, variables=None, use_cache=True):
+        with self._lock:
+            self.calls.append((topic, llm_name, variables, use_cache))
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        try:
+            time.sleep(self.delay)
+            if topic in self.fail_topics:
+                raise RuntimeError(f"backend down for {topic}")
+            task = SimpleNamespace(name='research_task', agent='Researcher', raw=f'notes on {topic}')
+            output = SimpleNamespace(raw=f'report on {topic}', tasks_output=[task], token_usage=None)
+            return SimpleNamespace(
+                topic=topic, llm_name=llm_name or 'default', output=output,
+                task_durations={'research_task': self.delay}, duration=self.delay, cached=False,
+                task_llms={'research_task': llm_name or 'default'},
+            )
+        finally:
+            with self._lock:
+                self.running -= 1
+
+
+def jsonl(*items):
+    return io.StringIO(''.join(json.dumps(item) + '\n' for item in items))
+
+
+def records(output):
+    return [json.loads(line) for line in output.getvalue().splitlines()]
+
+
+class TestReadItems(unittest.TestCase):
+    def test_jsonl(self):
+        items = list(batch.read_items(jsonl(
+            {'topic': 'quantum computing', 'llm_name': 'openai_gpt4', 'variables': {'depth': 3}},
+            {'topic': 'solar power', 'id': 'nightly-2'},
+        )))
+        self.assertEqual(items[0]['llm_name'], 'openai_gpt4')
+        self.assertEqual(items[0]['variables'], {'depth': '3'})
+        self.assertEqual(items[1]['id'], 'nightly-2')
+        self.assertIsNone(items[1]['llm_name'])
+
+    def test_csv_extra_columns_become_variables(self):
+        stream = io.StringIO('topic,llm_name,audience\nquantum computing,,students\n')
+        item, = batch.read_items(stream, 'csv')
+        self.assertEqual(item['topic'], 'quantum computing')
+        self.assertIsNone(item['llm_name'])
+        self.assertEqual(item['variables'], {'audience': 'students'})
+
+    def test_ids_are_stable(self):
+        first, = batch.read_items(jsonl({'topic': 'solar power', 'variables': {'a': '1', 'b': '2'}}))
+        second, = batch.read_items(jsonl({'topic': 'solar power', 'variables': {'b': '2', 'a': '1'}}))
+        other, = batch.read_items(jsonl({'topic': 'solar power', 'llm_name': 'ollama_llm'}))
+        self.assertEqual(first['id'], second['id'])
+        self.assertNotEqual(first['id'], other['id'])
+
+    def test_default_llm_is_part_of_the_id(self):
+        plain, = batch.read_items(jsonl({'topic': 'solar power'}))
+        defaulted, = batch.read_items(jsonl({'topic': 'solar power'}), default_llm='ollama_llm')
+        explicit, = batch.read_items(jsonl({'topic': 'solar power', 'llm_name': 'ollama_llm'}))
+        self.assertEqual(defaulted['llm_name'], 'ollama_llm')
+        self.assertNotEqual(defaulted['id'], plain['id'])
+        self.assertEqual(defaulted['id'], explicit['id'])
+
+    def test_invalid_input(self):
+        with self.assertRaises(ValueError):
+            list(batch.read_items(jsonl({'llm_name': 'ollama_llm'})))
+        with self.assertRaises(ValueError):
+            list(batch.read_items(io.StringIO('not json\n')))
+        with self.assertRaises(ValueError):
+            list(batch.read_items(io.StringIO('subject\nsolar power\n'), 'csv'))
+
+
+class TestRunBatch(unittest.TestCase):
+    def test_runs_concurrently_and_streams_records(self):
+        runner = FakeRunner()
+        items = batch.read_items(jsonl(*({'topic': f'topic {i}'} for i in range(6))))
+        output = io.StringIO()
+
+        counts = batch.run_batch(items, output, concurrency=3, runner=runner)
+
+        self.assertEqual(counts, {'ok': 6, 'failed': 0, 'skipped': 0})
+        self.assertEqual(runner.peak, 3)
+        results = records(output)
+        self.assertEqual(sorted(record['topic'] for record in results), [f'topic {i}' for i in range(6)])
+        self.assertEqual(results[0]['status'], 'ok')
+        self.assertEqual(results[0]['tasks'][0]['name'], 'research_task')
+
+    def test_failures_are_recorded_and_the_batch_continues(self):
+        runner = FakeRunner(fail_topics={'topic 1'})
+        items = batch.read_items(jsonl(*({'topic': f'topic {i}'} for i in range(3))))
+        output = io.StringIO()
+
+        counts = batch.run_batch(items, output, concurrency=2, runner=runner)
+
+        self.assertEqual(counts, {'ok': 2, 'failed': 1, 'skipped': 0})
+        failed, = [record for record in records(output) if record['status'] == 'failed']
+        self.assertEqual(failed['topic'], 'topic 1')
+        self.assertIn('backend down', failed['error'])
+
+    def test_invalid_input_records_running_crews(self):
+        runner = FakeRunner(delay=0.2)
+        stream = io.StringIO(''.join(json.dumps({'topic': f'topic {i}'}) + '\n' for i in range(2)) + 'not json\n')
+        output = io.StringIO()
+
+        with self.assertRaises(ValueError):
+            batch.run_batch(batch.read_items(stream), output, concurrency=4, runner=runner)
+
+        self.assertEqual(sorted(record['topic'] for record in records(output)), ['topic 0', 'topic 1'])
+
+    def test_resume_reruns_only_unfinished_topics(self):
+        with tempfile.TemporaryDirectory() as directory:
+            topics = os.path.join(directory, 'topics.csv')
+            results = os.path.join(directory, 'results.jsonl')
+            with open(topics, 'w', encoding='utf-8') as f:
+                f.write('topic\n' + ''.join(f'topic {i}\n' for i in range(4)))
+            argv = [topics, '--output', results, '--concurrency', '2']
+
+            with mock.patch('main.run_crew', FakeRunner(fail_topics={'topic 2'})):
+                self.assertEqual(batch.main(argv), 1)
+            # An interrupted run can leave a torn last line behind
+            with open(results, 'a', encoding='utf-8') as f:
+                f.write('{"id": "')
+
+            runner = FakeRunner()
+            with mock.patch('main.run_crew', runner):
+                self.assertEqual(batch.main(argv + ['--resume']), 0)
+
+            self.assertEqual([call[0] for call in runner.calls], ['topic 2'])
+            self.assertEqual(len(batch.completed_ids(results)), 4)
+
+            # Another default LLM makes different items, so they all run
+            runner = FakeRunner()
+            with mock.patch('main.run_crew', runner):
+                self.assertEqual(batch.main(argv + ['--resume', '--llm', 'ollama_llm']), 0)
+            self.assertEqual(len(runner.calls), 4)
+            self.assertEqual({call[1] for call in runner.calls}, {'ollama_llm'})
+
+    def test_resume_survives_a_line_torn_inside_a_multibyte_character(self):
+        with tempfile.TemporaryDirectory() as directory:
+            results = os.path.join(directory, 'results.jsonl')
+            with open(results, 'w', encoding='utf-8') as f:
+                f.write(json.dumps({'id': 'done', 'topic': 'café', 'status': 'ok'}, ensure_ascii=False) + '\n')
+            with open(results, 'ab') as f:
+                f.write('{"id": "torn", "topic": "caf'.encode('utf-8') + 'é'.encode('utf-8')[:1])
+
+            self.assertEqual(batch.completed_ids(results), {'done'})
+
+            with batch.open_output(results) as output:
+                output.write(json.dumps({'id': 'next', 'status': 'ok'}) + '\n')
+            with open(results, 'rb') as f:
+                lines = f.read().split(b'\n')
+            self.assertEqual(json.loads(lines[-2]), {'id': 'next', 'status': 'ok'})
+            self.assertEqual(batch.completed_ids(results), {'done', 'next'})
+
+    def test_output_ending_in_non_ascii_starts_a_new_line(self):
+        with tempfile.TemporaryDirectory() as directory:
+            results = os.path.join(directory, 'results.jsonl')
+            with open(results, 'w', encoding='utf-8') as f:
+                f.write('{"id": "torn", "topic": "café')
+
+            with batch.open_output(results) as output:
+                output.write('{"id": "next", "status": "ok"}\n')
+            with open(results, encoding='utf-8') as f:
+                self.assertEqual(f.read().splitlines()[1], '{"id": "next", "status": "ok"}')
+
+
+if __name__ == '__main__':
+    unittest.main()
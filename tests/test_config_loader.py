@@ -0,0 +1,121 @@
+import os
+import sys
+import tempfile
+import unittest
+
+# Add the project root directory to the Python path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config_loader import (
+    CompiledTemplate, compile_fields, render_fields, get_config_snapshot,
+    compile_agent_fields, compile_style_block
+)
+
+
+class TestCompiledTemplate(unittest.TestCase):
+    """Test template compilation and rendering"""
+
+    def test_render_topic(self):
+        """Test that placeholders are substituted"""
+        template = CompiledTemplate("Research {topic} and summarize {topic}")
+        self.assertEqual(template.variables, frozenset({'topic'}))
+        self.assertEqual(template.render({'topic': 'AI'}), "Research AI and summarize AI")
+
+    def test_arbitrary_variables(self):
+        """Test that variables other than topic are supported"""
+        template = CompiledTemplate("Write for {audience} about {topic}")
+        rendered = template.render({'topic': 'AI', 'audience': 'developers'})
+        self.assertEqual(rendered, "Write for developers about AI")
+
+    def test_literal_braces_are_preserved(self):
+        """Test that non-placeholder braces do not break rendering"""
+        template = CompiledTemplate('Return JSON like {"key": 1} for {topic}, escaped {{topic}}')
+        self.assertEqual(template.variables, frozenset({'topic'}))
+        self.assertEqual(
+            template.render({'topic': 'AI'}),
+            'Return JSON like {"key": 1} for AI, escaped {topic}'
+        )
+
+    def test_static_template(self):
+        """Test that templates without placeholders render unchanged"""
+        template = CompiledTemplate("No variables here")
+        self.assertTrue(template.is_static)
+        self.assertEqual(template.render({}), "No variables here")
+
+    def test_missing_variable(self):
+        """Test that a missing variable raises a ValueError"""
+        templates = compile_fields({'goal': "Explain {topic} to {audience}"}, ['goal'])
+        with self.assertRaises(ValueError) as context:
+            render_fields(templates, {'topic': 'AI'})
+        self.assertIn('audience', str(context.exception))
+
+    def test_render_fields(self):
+        """Test rendering all fields of a config at once"""
+        config = {'role': "Expert in {topic}", 'goal': "Explain {topic}"}
+        templates = compile_fields(config, ['role', 'goal', 'backstory'])
+        fields = render_fields(templates, {'topic': 'AI'})
+        self.assertEqual(fields, {'role': "Expert in AI", 'goal': "Explain AI", 'backstory': ""})
+
+
+class TestStyleCompiler(unittest.TestCase):
+    """Test compilation of structured style blocks"""
+
+    def test_compile_style_block(self):
+        """Test that lists and nested values become one line per aspect"""
+        fragment = compile_style_block({
+            'tone': ['casual', 'fun'],
+            'sentence_structure': ['uses rhetorical questions'],
+        }, "Voice and style guidelines")
+        self.assertEqual(fragment, (
+            "Voice and style guidelines:\n"
+            "- Tone: casual, fun\n"
+            "- Sentence structure: uses rhetorical questions"
+        ))
+
+    def test_style_appended_to_backstory(self):
+        """Test that voice_style is folded into the backstory template"""
+        config = {
+            'role': "Writer", 'goal': "Write", 'backstory': "Writes about {topic}.",
+            'voice_style': {'avoid': ['jargon {like this}']},
+        }
+        fields = render_fields(compile_agent_fields(config), {'topic': 'AI'})
+        self.assertTrue(fields['backstory'].startswith("Writes about AI.\n\nVoice and style guidelines:"))
+        self.assertIn("- Avoid: jargon {like this}", fields['backstory'])
+
+    def test_agent_without_style(self):
+        config = {'role': "Writer", 'goal': "Write", 'backstory': "Writes."}
+        fields = render_fields(compile_agent_fields(config), {})
+        self.assertEqual(fields['backstory'], "Writes.")
+
+
+class TestConfigSnapshot(unittest.TestCase):
+    """Test loading and caching of the YAML configuration"""
+
+    def setUp(self):
+        self.config_dir = tempfile.mkdtemp()
+        self._write('llms.yaml', "local:\n  type: ollama\n  model: llama3\n")
+        self._write('agents.yaml', "researcher:\n  role: 'Researcher of {topic}'\n  goal: g\n  backstory: b\n")
+        self._write('tasks.yaml', "research:\n  description: 'Research {topic}'\n  expected_output: o\n  agent: researcher\n")
+
+    def _write(self, name, content):
+        with open(os.path.join(self.config_dir, name), 'w') as file:
+            file.write(content)
+
+    def test_snapshot_is_cached(self):
+        """Test that an unchanged config directory returns the same snapshot"""
+        first = get_config_snapshot(self.config_dir)
+        second = get_config_snapshot(self.config_dir)
+        self.assertIs(first, second)
+        self.assertEqual(first.variables, frozenset({'topic'}))
+
+    def test_snapshot_reloads_on_change(self):
+        """Test that editing a YAML file produces a new snapshot"""
+        first = get_config_snapshot(self.config_dir)
+        self._write('tasks.yaml', "research:\n  description: 'Research {topic} for {audience}'\n  expected_output: o\n  agent: researcher\n")
+        second = get_config_snapshot(self.config_dir)
+        self.assertIsNot(first, second)
+        self.assertIn('audience', second.variables)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import sys
+import unittest
+
+# Add the project root directory to the Python path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from context_budget import estimate_tokens, fit_to_budget, STRATEGIES, TRUNCATION_MARKER
+
+
+RESEARCH_OUTPUT = "\n\n".join(
+    f"Trend {i} is about topic number {i}. It has a long explanation that goes on. "
+    f"There are more details here for trend {i}. And a closing remark."
+    for i in range(1, 40)
+)
+
+
+class TestEstimateTokens(unittest.TestCase):
+    """Test the token estimator"""
+
+    def test_empty(self):
+        self.assertEqual(estimate_tokens(""), 0)
+
+    def test_scales_with_length(self):
+        self.assertEqual(estimate_tokens("abcd" * 100), 100)
+
+
+class TestFitToBudget(unittest.TestCase):
+    """Test context reduction strategies"""
+
+    def test_short_text_unchanged(self):
+        """Test that text within budget is returned as is"""
+        text = "Short research output."
+        for strategy in STRATEGIES:
+            self.assertEqual(fit_to_budget(text, 100, strategy), text)
+
+    def test_strategies_respect_budget(self):
+        """Test that every strategy keeps the estimate within the budget"""
+        for strategy in STRATEGIES:
+            reduced = fit_to_budget(RESEARCH_OUTPUT, 200, strategy)
+            self.assertLessEqual(estimate_tokens(reduced), 200, strategy)
+            self.assertTrue(reduced, strategy)
+
+    def test_truncate_keeps_beginning(self):
+        reduced = fit_to_budget(RESEARCH_OUTPUT, 100, "truncate")
+        self.assertTrue(reduced.startswith("Trend 1 is about"))
+        self.assertTrue(reduced.endswith(TRUNCATION_MARKER))
+
+    def test_head_tail_keeps_end(self):
+        reduced = fit_to_budget(RESEARCH_OUTPUT, 100, "head_tail")
+        self.assertTrue(reduced.startswith("Trend 1 is about"))
+        self.assertTrue(reduced.endswith("And a closing remark."))
+
+    def test_extractive_keeps_every_paragraph_lead(self):
+        """Test that extractive summaries keep the first sentence of each paragraph"""
+        reduced = fit_to_budget(RESEARCH_OUTPUT, 600, "extractive")
+        for i in range(1, 40):
+            self.assertIn(f"Trend {i} is about topic number {i}.", reduced)
+        self.assertNotIn(TRUNCATION_MARKER, reduced)
+
+    def test_unknown_strategy(self):
+        with self.assertRaises(ValueError):
+            fit_to_budget(RESEARCH_OUTPUT, 100, "unknown")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,167 @@
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+# Add the project root directory to the Python path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from executor import CrewExecutor, ExecutorDrainingError, ExecutorSaturatedError
+
+
+class TestCrewExecutor(unittest.TestCase):
+    """Test the bounded crew executor"""
+    
+    def setUp(self):
+        self.release = threading.Event()
+        self.started = threading.Semaphore(0)
+    
+    def blocking_job(self, value):
+        self.started.release()
+        self.release.wait(5)
+        return value
+    
+    def test_results_and_counters(self):
+        executor = CrewExecutor(max_workers=2, max_queue=2)
+        self.release.set()
+        futures = [executor.submit(self.blocking_job, i) for i in range(3)]
+        self.assertEqual([future.result(5) for future in futures], [0, 1, 2])
+        executor.shutdown()
+        self.assertEqual(executor.stats()['completed'], 3)
+        self.assertEqual(executor.stats()['active'], 0)
+    
+    def test_rejects_when_queue_is_full(self):
+        executor = CrewExecutor(max_workers=1, max_queue=1)
+        running = executor.submit(self.blocking_job, 'running')
+        self.started.acquire(timeout=5)
+        queued = executor.submit(self.blocking_job, 'queued')
+        
+        stats = executor.stats()
+        self.assertEqual((stats['active'], stats['queued'], stats['saturation']), (1, 1, 1.0))
+        with self.assertRaises(ExecutorSaturatedError):
+            executor.submit(self.blocking_job, 'rejected')
+        self.assertEqual(executor.stats()['rejected'], 1)
+        
+        self.release.set()
+        self.assertEqual(running.result(5), 'running')
+        self.assertEqual(queued.result(5), 'queued')
+        executor.shutdown()
+    
+    def test_failures_are_counted(self):
+        def failing_job():
+            raise ValueError("crew failed")
+        
+        executor = CrewExecutor(max_workers=1)
+        with self.assertRaises(ValueError):
+            executor.submit(failing_job).result(5)
+        executor.shutdown()
+        self.assertEqual(executor.stats()['failed'], 1)
+    
+    def test_drain_requeues_waiting_and_finishes_running(self):
+        """Test that queued jobs are persisted and running ones may finish"""
+        executor = CrewExecutor(max_workers=1, max_queue=2)
+        running = executor.submit(self.blocking_job, 'running', payload={'topic': 'running'})
+        self.started.acquire(timeout=5)
+        queued = executor.submit(self.blocking_job, 'queued', payload={'topic': 'queued'})
+        
+        persisted = []
+        threading.Timer(0.1, self.release.set).start()
+        summary = executor.drain(5, persisted.append)
+        
+        self.assertEqual(summary, {'requeued': 1, 'finished': 1, 'abandoned': 0})
+        self.assertEqual(persisted, [{'topic': 'queued'}])
+        self.assertEqual(running.result(5), 'running')
+        with self.assertRaises(ExecutorDrainingError):
+            queued.result(5)
+        with self.assertRaises(ExecutorDrainingError):
+            executor.submit(self.blocking_job, 'late')
+        self.assertTrue(executor.wait_drained(0))
+    
+    def test_drain_deadline_hands_over_running_jobs(self):
+        executor = CrewExecutor(max_workers=1)
+        running = executor.submit(self.blocking_job, 'slow', payload={'topic': 'slow'})
+        self.started.acquire(timeout=5)
+        
+        persisted = []
+        summary = executor.drain(0.05, persisted.append)
+        self.assertEqual(summary['abandoned'], 1)
+        self.assertEqual(persisted, [{'topic': 'slow'}])
+        with self.assertRaises(ExecutorDrainingError):
+            running.result(5)
+        self.release.set()
+    
+    def test_invalid_settings(self):
+        with self.assertRaises(ValueError):
+            CrewExecutor(max_workers=0)
+
+
+
+class TestResumeJobs(unittest.TestCase):
+    """Test resuming crews handed over by a previous process"""
+    
+    def test_backlog_larger_than_the_executor(self):
+        import api
+        from storage.jobs import JobStore
+        
+        store = JobStore(os.path.join(tempfile.mkdtemp(), 'jobs.db'))
+        for i in range(25):
+            store.add({'topic': f'topic {i}'})
+        executor = CrewExecutor(max_workers=2, max_queue=0)
+        self.addCleanup(executor.shutdown)
+        
+        ran = []
+        def run_crew_job(payload):
+            time.sleep(0.01)
+            ran.append(payload['topic'])
+        
+        with mock.patch.object(api, 'run_crew_job', run_crew_job):
+            thread = api.resume_jobs(executor, store, poll_seconds=0.01)
+            thread.join(10)
+        
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(sorted(ran), sorted(f'topic {i}' for i in range(25)))
+        self.assertEqual(executor.stats()['rejected'], 0)
+        self.assertEqual(len(store), 0)
+        self.assertIsNone(api.resume_jobs(executor, store))
+    
+    def test_unsubmitted_jobs_stay_stored_while_draining(self):
+        import api
+        from storage.jobs import JobStore
+        
+        store = JobStore(os.path.join(tempfile.mkdtemp(), 'jobs.db'))
+        for i in range(3):
+            store.add({'topic': f'topic {i}'})
+        executor = CrewExecutor(max_workers=2, max_queue=0)
+        executor.drain(0)
+        self.addCleanup(executor.shutdown)
+        
+        thread = api.resume_jobs(executor, store, poll_seconds=0.01)
+        thread.join(5)
+        self.assertEqual(len(store), 3)
+
+
+class TestReadiness(unittest.TestCase):
+    """Test the readiness check"""
+    
+    def test_llm_configuration_errors_are_not_ready(self):
+        import api
+        
+        executor = CrewExecutor(max_workers=2, max_queue=2)
+        self.addCleanup(executor.shutdown)
+        error = ValueError("Agent 'writer' pins unknown LLM 'missing'")
+        
+        with mock.patch.object(api, 'get_crew_executor', return_value=executor), \
+                mock.patch.object(api, 'resolve_pinned_llms', side_effect=error):
+            response = asyncio.run(api.readiness_check())
+        
+        self.assertEqual(response.status_code, 503)
+        self.assertIn(str(error), json.loads(response.body)['reasons'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,202 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from crewai import Agent
+from crewai.crews.crew_output import CrewOutput
+from crewai.tasks.task_output import TaskOutput
+
+import yaml
+
+# Keep crewai's telemetry off the network
+os.environ.setdefault('OTEL_SDK_DISABLED', 'true')
+
+# Add the project root directory to the Python path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import config_loader
+import main
+from providers import LLMUnavailableError, llm_health
+from storage.checkpoints import CheckpointStore
+from storage.semantic_cache import SemanticCache
+
+LLMS = {
+    'local': {'type': 'ollama', 'model': 'ollama/llama3', 'base_url': 'http://localhost:11434', 'default': True},
+    'backup': {'type': 'ollama', 'model': 'ollama/mistral', 'base_url': 'http://localhost:11434'},
+    'remote': {'type': 'ollama', 'model': 'ollama/qwen', 'base_url': 'http://remote:11434', 'fallbacks': ['backup']},
+}
+AGENTS = {
+    'researcher': {'role': 'Researcher of {topic}', 'goal': 'Research {topic}', 'backstory': 'Curious.', 'llm': 'remote'},
+    'writer': {'role': 'Writer on {topic}', 'goal': 'Write about {topic}', 'backstory': 'Clear.'},
+}
+TASKS = {
+    'research_task': {'description': 'Research {topic}.', 'expected_output': 'Notes.', 'agent': 'researcher'},
+    'write_task': {'description': 'Write about {topic}.', 'expected_output': 'An article.', 'agent': 'writer'},
+    'edit_task': {'description': 'Edit the article.', 'expected_output': 'An article.', 'agent': 'writer', 'llm': 'backup'},
+}
+
+
+class ConfigTestCase(unittest.TestCase):
+    """Runs main against a temporary config directory"""
+
+    def setUp(self):
+        self.config_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.config_dir, ignore_errors=True)
+        for name, data in (('llms.yaml', LLMS), ('agents.yaml', AGENTS), ('tasks.yaml', TASKS)):
+            with open(os.path.join(self.config_dir, name), 'w') as f:
+                yaml.safe_dump(data, f, sort_keys=False)
+        with open(os.path.join(self.config_dir, 'settings.yaml'), 'w') as f:
+            yaml.safe_dump({'llm_health': {'enabled': False}}, f)
+
+        patcher = patch.object(config_loader, 'CONFIG_DIR', self.config_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(llm_health.reset)
+        self.snapshot = config_loader.get_config_snapshot()
+
+
+class TestPinnedLLMs(ConfigTestCase):
+    """Agent and task llm settings go through health routing"""
+
+    def test_pins_and_task_llms(self):
+        pins = main.resolve_pinned_llms(self.snapshot)
+        self.assertEqual(pins, {('Agent', 'researcher'): 'remote', ('Task', 'edit_task'): 'backup'})
+        self.assertEqual(
+            main.task_llm_names(self.snapshot, 'local', pins),
+            {'research_task': 'remote', 'write_task': 'local', 'edit_task': 'backup'},
+        )
+
+        agents = main.load_agents('robots', 'local', pins=pins)
+        self.assertIs(agents['researcher'].llm, main.get_pooled_llm('remote'))
+        self.assertIs(agents['writer'].llm, main.get_pooled_llm('local'))
+        tasks = main.load_tasks('robots', agents, 'local', pins=pins)
+        self.assertIs(tasks[2].agent.llm, main.get_pooled_llm('backup'))
+
+    def test_unhealthy_pin_uses_its_fallback(self):
+        for _ in range(llm_health.unhealthy_after):
+            llm_health.record_failure('remote', 'connection refused')
+
+        pins = main.resolve_pinned_llms(self.snapshot)
+        self.assertEqual(pins[('Agent', 'researcher')], 'backup')
+        agents = main.load_agents('robots', 'local', pins=pins)
+        self.assertIs(agents['researcher'].llm, main.get_pooled_llm('backup'))
+
+        for _ in range(llm_health.unhealthy_after):
+            llm_health.record_failure('backup', 'connection refused')
+        with self.assertRaises(LLMUnavailableError):
+            main.resolve_pinned_llms(self.snapshot)
+
+
+class TestCrewPrototypes(ConfigTestCase):
+    """Prototypes are cached per configuration version and LLM name"""
+
+    def test_cached_until_the_configuration_changes(self):
+        llm = main.get_pooled_llm('local')
+        prototype = main.get_crew_prototype('local', llm)
+        self.assertIs(main.get_crew_prototype('local', llm), prototype)
+        self.assertIsNot(main.get_crew_prototype('backup', main.get_pooled_llm('backup')), prototype)
+
+        agents = dict(AGENTS, writer=dict(AGENTS['writer'], backstory='Concise.'))
+        with open(os.path.join(self.config_dir, 'agents.yaml'), 'w') as f:
+            yaml.safe_dump(agents, f, sort_keys=False)
+        llm = main.get_pooled_llm('local')
+        rebuilt = main.get_crew_prototype('local', llm)
+
+        self.assertIsNot(rebuilt, prototype)
+        self.assertEqual(rebuilt.agents['writer'].backstory, 'Concise.')
+        # Prototypes of the old configuration are not kept alive
+        self.assertEqual(list(main._prototypes), [(config_loader.get_config_snapshot().version, 'local')])
+
+    def test_clones_have_their_own_tool_results(self):
+        first = main.load_agents('robots', 'local')
+        second = main.load_agents('robots', 'local')
+        first['writer'].tools_results.append({'result': 'done', 'result_as_answer': True})
+        self.assertEqual(second['writer'].tools_results, [])
+        prototype = main.get_crew_prototype('local', main.get_pooled_llm('local'))
+        self.assertEqual(prototype.agents['writer'].tools_results, [])
+
+
+class TestResumeTasks(ConfigTestCase):
+    """Checkpointed task outputs are reused by a retry of the same request"""
+
+    def setUp(self):
+        super().setUp()
+        self.checkpoints = CheckpointStore(os.path.join(self.config_dir, 'checkpoints.db'))
+        self.fingerprint = 'request'
+
+    def build_tasks(self):
+        agents = main.load_agents('robots', 'local')
+        tasks = main.load_tasks('robots', agents, 'local')
+        main.resume_tasks(tasks, self.checkpoints, self.fingerprint)
+        return tasks
+
+    def checkpoint(self, position, task_name, raw):
+        output = TaskOutput(description='Earlier attempt', raw=raw, agent='Researcher')
+        self.checkpoints.save(self.fingerprint, position, task_name, output.model_dump(mode='json'))
+
+    def test_restored_task_skips_its_agent(self):
+        self.checkpoint(0, 'research_task', 'saved notes')
+        tasks = self.build_tasks()
+
+        with patch.object(Agent, 'execute_task') as execute_task:
+            self.assertEqual(tasks[0].execute_sync().raw, 'saved notes')
+            self.assertEqual(tasks[0].execute_async().result(timeout=5).raw, 'saved notes')
+        execute_task.assert_not_called()
+
+    def test_only_a_contiguous_prefix_is_reused(self):
+        self.checkpoint(0, 'research_task', 'saved notes')
+        self.checkpoint(2, 'edit_task', 'saved edit')
+        tasks = self.build_tasks()
+        self.assertEqual([task._restored_output is not None for task in tasks], [True, False, False])
+
+        # A checkpoint saved under another task name is not reused either
+        self.checkpoint(0, 'write_task', 'saved article')
+        tasks = self.build_tasks()
+        self.assertIsNone(tasks[0]._restored_output)
+
+    def test_finished_tasks_are_restored_on_the_next_run(self):
+        self.checkpoint(0, 'research_task', 'saved notes')
+        tasks = self.build_tasks()
+
+        with patch.object(Agent, 'execute_task', return_value='new article') as execute_task:
+            self.assertEqual(tasks[1].execute_sync().raw, 'new article')
+        execute_task.assert_called_once()
+        with patch.object(Agent, 'execute_task', return_value='new edit'):
+            self.assertEqual(tasks[2].execute_async().result(timeout=30).raw, 'new edit')
+
+        tasks = self.build_tasks()
+        self.assertEqual(
+            [task._restored_output.raw for task in tasks],
+            ['saved notes', 'new article', 'new edit'],
+        )
+
+
+class TestSemanticCacheHits(ConfigTestCase):
+    """A cached run answers a similar topic without running a crew"""
+
+    def test_hit_reports_the_requested_topic(self):
+        # Word-level embedding, so reordered words are a perfect match
+        def embedder(texts):
+            return [[float(word in text.lower().split()) for word in ('quantum', 'computing', 'biology')] for text in texts]
+
+        cache = SemanticCache(embedder, similarity_threshold=0.9)
+        task_llms = main.task_llm_names(self.snapshot, 'local', main.resolve_pinned_llms(self.snapshot))
+        scope = main.semantic_cache_scope('local', None, self.snapshot, task_llms)
+        output = CrewOutput(raw='cached article', tasks_output=[])
+        cache.store('quantum computing', scope, main.CrewRun('quantum computing', 'local', output, {}, 1.5).to_dict())
+
+        with patch('main.get_semantic_cache', return_value=cache), patch('main.get_pooled_llm') as get_pooled_llm:
+            run = main.run_crew('computing quantum')
+
+        get_pooled_llm.assert_not_called()
+        self.assertTrue(run.cached)
+        self.assertEqual(run.output.raw, 'cached article')
+        self.assertEqual(run.topic, 'computing quantum')
+        self.assertEqual(run.llm_name, 'local')
+
+
+if __name__ == '__main__':
+    unittest.main()
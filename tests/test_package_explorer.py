@@ -0,0 +1,355 @@
+import os
+import sys
+import tempfile
+import textwrap
+import unittest
+from unittest import mock
+
+# Add the artifacts directory to the Python path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'artifacts')))
+
+import package_explorer
+
+
+SAMPLE = textwrap.dedent('''
+    import os
+    from typing import List
+
+    @dataclass
+    class Config(Base, metaclass=Meta):
+        """Settings"""
+
+        @classmethod
+        def load(cls, path: str) -> "Config":
+            return cls()
+
+        class Nested:
+            pass
+
+    if os.name == "nt":
+        def platform_helper():
+            pass
+
+    async def fetch(
+        url,
+        retries=3,
+    ):
+        def parse(body):
+            return body
+        return parse(url)
+''')
+
+
+def write_package(root, files):
+    """Create a package tree from {relative_path: content}"""
+    for relative_path, content in files.items():
+        path = os.path.join(root, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+
+class TestExtraction(unittest.TestCase):
+    """Test AST-based symbol extraction"""
+    
+    def test_classes_methods_and_nested_definitions(self):
+        blocks = package_explorer.extract_key_classes_functions(SAMPLE)
+        
+        classes = {symbol['qualname']: symbol for symbol in blocks['classes']}
+        self.assertEqual(set(classes), {'Config', 'Config.Nested'})
+        self.assertEqual(classes['Config']['header'], '@dataclass class Config(Base, metaclass=Meta):')
+        self.assertEqual(classes['Config']['docstring'], 'Settings')
+        self.assertEqual(
+            [method['header'] for method in classes['Config']['methods']],
+            ["@classmethod def load(cls, path: str) -> 'Config':"]
+        )
+        
+        functions = [symbol['qualname'] for symbol in blocks['functions']]
+        self.assertEqual(functions, ['platform_helper', 'fetch', 'fetch.<locals>.parse'])
+        fetch = blocks['functions'][1]
+        self.assertEqual(fetch['header'], 'async def fetch(url, retries=3):')
+        self.assertEqual((fetch['lineno'], fetch['end_lineno']), (20, 26))
+    
+    def test_unparsable_files_fall_back_to_line_scan(self):
+        blocks = package_explorer.extract_key_classes_functions("class Old:\n    print 'python 2'\ndef f():\n    pass\n")
+        self.assertEqual([symbol['name'] for symbol in blocks['classes']], ['Old'])
+        self.assertEqual([symbol['name'] for symbol in blocks['functions']], ['f'])
+
+
+class TestImports(unittest.TestCase):
+    """Test import extraction and dependency analysis"""
+    
+    def test_imports_in_source_order(self):
+        content = textwrap.dedent('''
+            import os, json
+            from . import sibling
+            from ..utils import (
+                helper,
+                other,
+            )
+            from typing import TYPE_CHECKING
+            if TYPE_CHECKING:
+                from litellm.types import Message
+            def lazy():
+                import numpy as np
+        ''')
+        imports = package_explorer.extract_imports(content)
+        self.assertEqual(
+            [(entry['module'], entry['names'], entry['lineno'], entry['runtime']) for entry in imports],
+            [
+                ('os', [], 2, True),
+                ('json', [], 2, True),
+                ('.', ['sibling'], 3, True),
+                ('..utils', ['helper', 'other'], 4, True),
+                ('typing', ['TYPE_CHECKING'], 8, True),
+                ('litellm.types', ['Message'], 10, False),
+                ('numpy', [], 12, False),
+            ]
+        )
+    
+    def test_dependencies_skip_stdlib_and_relative_imports(self):
+        def entries(*modules):
+            return [{'module': module, 'names': [], 'lineno': 1, 'runtime': True} for module in modules]
+        dependencies = package_explorer.analyze_imports({
+            'a.py': entries('os', 'numpy.linalg', '.sibling'),
+            'b.py': entries('litellm.types', 'json'),
+        })
+        self.assertEqual(dependencies, {'numpy', 'litellm'})
+
+
+class TestImportGraph(unittest.TestCase):
+    """Test the module import graph"""
+    
+    def test_resolve_relative_imports(self):
+        resolve = package_explorer.resolve_import
+        self.assertEqual(resolve('pkg.sub.mod', False, '.'), 'pkg.sub')
+        self.assertEqual(resolve('pkg.sub.mod', False, '..utils'), 'pkg.utils')
+        self.assertEqual(resolve('pkg.sub', True, '.mod'), 'pkg.sub.mod')
+        self.assertEqual(resolve('pkg.mod', False, 'os.path'), 'os.path')
+        self.assertIsNone(resolve('pkg.mod', False, '...beyond'))
+    
+    def test_parse_importtime_log(self):
+        log = textwrap.dedent('''
+            import time: self [us] | cumulative | imported package
+            import time:       120 |        120 |     pkg.utils
+            import time:       300 |       4420 |   pkg
+            some other stderr output
+        ''')
+        self.assertEqual(package_explorer.parse_importtime_log(log), {
+            'pkg.utils': {'self_us': 120, 'cumulative_us': 120},
+            'pkg': {'self_us': 300, 'cumulative_us': 4420},
+        })
+    
+    def test_graph_nodes_and_edges(self):
+        sources = {
+            'pkg/__init__.py': 'from .core import run\nfrom . import utils\n',
+            'pkg/core.py': 'import os\nimport numpy as np\nfrom .utils import helper, text\n',
+            'pkg/utils/__init__.py': 'def helper(): pass\n',
+            'pkg/utils/text.py': 'def lazy():\n    from pkg.core import run\n',
+        }
+        files = [(path, package_explorer.extract_imports(content)) for path, content in sources.items()]
+        graph = package_explorer.build_import_graph(files, {'numpy': {'self_us': 10, 'cumulative_us': 90}})
+        
+        nodes = {node['id']: node for node in graph['nodes']}
+        self.assertEqual(nodes['pkg.utils']['path'], 'pkg/utils/__init__.py')
+        self.assertEqual((nodes['numpy']['kind'], nodes['numpy']['cumulative_us']), ('external', 90))
+        self.assertEqual(nodes['os']['kind'], 'stdlib')
+        
+        edges = {(edge['source'], edge['target']): edge for edge in graph['edges']}
+        self.assertEqual(set(edges), {
+            ('pkg', 'pkg.core'),
+            ('pkg', 'pkg.utils'),
+            ('pkg.core', 'os'),
+            ('pkg.core', 'numpy'),
+            ('pkg.core', 'pkg.utils'),
+            ('pkg.core', 'pkg.utils.text'),
+            ('pkg.utils.text', 'pkg.core'),
+        })
+        self.assertFalse(edges[('pkg.utils.text', 'pkg.core')]['runtime'])
+        self.assertEqual(nodes['pkg.utils']['imported_by'], 2)
+        
+        dot = package_explorer.format_graph_dot(graph)
+        self.assertIn('"numpy" [label="numpy\\n0.1 ms", style=filled, fillcolor=lightgrey];', dot)
+        self.assertIn('"pkg.utils.text" -> "pkg.core" [style=dashed];', dot)
+
+
+class TestPackageIndex(unittest.TestCase):
+    """Test the incremental SQLite index"""
+    
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.path = os.path.join(self.root, 'module.py')
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write('import os\ndef f(): pass\n')
+        self.index = package_explorer.PackageIndex(os.path.join(self.root, 'index', 'index.db'))
+        self.addCleanup(self.index.close)
+    
+    def index_file(self):
+        fresh, stale = self.index.lookup([self.path])
+        for path, stamp in stale.items():
+            content, code_blocks, imports = package_explorer.analyze_file(path)
+            self.index.store([(path, stamp, content, code_blocks, imports)])
+        return fresh, stale
+    
+    def test_unchanged_files_come_from_index(self):
+        fresh, stale = self.index_file()
+        self.assertEqual((list(fresh), list(stale)), ([], [self.path]))
+        
+        fresh, stale = self.index_file()
+        self.assertEqual(stale, {})
+        code_blocks, imports = fresh[self.path]
+        self.assertEqual([symbol['name'] for symbol in code_blocks['functions']], ['f'])
+        self.assertEqual([entry['module'] for entry in imports], ['os'])
+    
+    def test_changed_files_are_parsed_again(self):
+        self.index_file()
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write('import sys\nclass Changed: pass\n')
+        
+        fresh, stale = self.index_file()
+        self.assertEqual(list(stale), [self.path])
+        fresh, _ = self.index_file()
+        self.assertEqual([entry['module'] for entry in fresh[self.path][1]], ['sys'])
+    
+    def test_missing_files_are_skipped(self):
+        fresh, stale = self.index.lookup([os.path.join(self.root, 'missing.py')])
+        self.assertEqual((fresh, stale), ({}, {}))
+
+
+class TestSearch(unittest.TestCase):
+    """Test the inverted index behind --search"""
+    
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.package = os.path.join(self.root, 'pkg')
+        write_package(self.package, {
+            'keys.py': textwrap.dedent('''
+                import os
+
+                def load_api_key():
+                    """Read the Gemini API key from the environment"""
+                    return os.environ["GEMINI_API_KEY"]
+            '''),
+            'client.py': textwrap.dedent('''
+                class GeminiClient:
+                    def send(self, api_key):
+                        return api_key
+            '''),
+        })
+        self.index = package_explorer.PackageIndex(':memory:')
+        self.addCleanup(self.index.close)
+        files = package_explorer.get_package_files(self.package, 10)
+        package_explorer.update_index(self.index, files, workers=1)
+    
+    def test_tokenize_splits_identifiers(self):
+        self.assertEqual(package_explorer.tokenize('GEMINI_API_KEY GeminiApiKey'), ['gemini', 'api', 'key'] * 2)
+        self.assertEqual(package_explorer.tokenize('LLMHealthRegistry x'), ['llm', 'health', 'registry'])
+    
+    def test_matches_are_ranked_with_locations(self):
+        matches = self.index.search('gemini api key', self.package)
+        locations = [(os.path.basename(match['path']), match['lineno'], match['field']) for match in matches]
+        # Every term matched: the definition (name and docstring) beats the
+        # plain source line; the class name matches one term and comes last
+        self.assertEqual(locations[0], ('keys.py', 4, 'symbol'))
+        self.assertEqual(locations[1:3], [('keys.py', 5, 'line'), ('keys.py', 6, 'line')])
+        self.assertEqual(locations[-1][:2], ('client.py', 2))
+    
+    def test_symbol_names_outrank_lines(self):
+        matches = self.index.search('GeminiClient', self.package, limit=1)
+        self.assertEqual((os.path.basename(matches[0]['path']), matches[0]['field']), ('client.py', 'symbol'))
+    
+    def test_search_is_scoped_and_pruned(self):
+        self.assertEqual(self.index.search('gemini', os.path.join(self.root, 'other')), [])
+        self.assertEqual(self.index.prune(self.package, [os.path.join(self.package, 'keys.py')]), 1)
+        self.assertEqual({os.path.basename(match['path']) for match in self.index.search('api', self.package)}, {'keys.py'})
+        self.assertEqual(self.index.search('', self.package), [])
+    
+    def test_max_files_limits_search_to_the_selected_files(self):
+        index_path = os.path.join(self.root, 'index.db')
+        first, _ = next(package_explorer.iter_package_files(self.package))
+        with mock.patch.object(package_explorer, 'get_installed_package_location', return_value=self.package):
+            # A full run leaves every file in the reused index
+            everything = package_explorer.search_package('pkg', 'api', index_path=index_path)
+            selected = package_explorer.search_package('pkg', 'api', max_files=1, index_path=index_path)
+        self.assertEqual({os.path.basename(match['path']) for match in everything}, {'keys.py', 'client.py'})
+        self.assertEqual({match['path'] for match in selected}, {first})
+
+
+class TestReport(unittest.TestCase):
+    """Test streamed report generation"""
+    
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        write_package(os.path.join(self.root, 'streamed_pkg'), {
+            '__init__.py': '',
+            'core.py': 'import requests\n\nclass Core:\n    def run(self): pass\n',
+        })
+        sys.path.insert(0, self.root)
+        self.addCleanup(sys.path.remove, self.root)
+    
+    def explore(self, **kwargs):
+        output = os.path.join(self.root, 'report.md')
+        written = package_explorer.explore_package('streamed_pkg', output_file=output, index_path=None, workers=1, **kwargs)
+        with open(output, encoding='utf-8') as f:
+            return written, f.read()
+    
+    def test_report_is_written_with_sources(self):
+        written, report = self.explore()
+        self.assertTrue(written)
+        self.assertIn('- requests', report)
+        self.assertIn('1. `class Core:`\n   - `def run(self):`', report)
+        self.assertIn('## Detailed Source Code\n\n### streamed_pkg/core.py\n```python\nimport requests', report)
+        # Empty files have nothing to report
+        self.assertNotIn('__init__.py', report)
+    
+    def test_sources_can_be_omitted(self):
+        _, report = self.explore(include_source=False)
+        self.assertIn('class Core:', report)
+        self.assertNotIn('Detailed Source Code', report)
+    
+    def test_sources_are_read_lazily(self):
+        path = os.path.join(self.root, 'streamed_pkg', 'core.py')
+        lines = package_explorer.generate_report('streamed_pkg', self.root, [(path, 'core.py', {'classes': [], 'functions': []})], set())
+        for line in lines:
+            if line == '```python':
+                break
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('# rewritten\n')
+        self.assertEqual(next(lines), '# rewritten\n')
+
+
+class TestPackageFiles(unittest.TestCase):
+    """Test file discovery"""
+    
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.package = os.path.join(self.root, 'pkg')
+        write_package(self.package, {
+            '__init__.py': '',
+            'b.py': 'def b(): pass\n',
+            'a.py': 'def a(): pass\n',
+            'sub/__init__.py': '',
+            'sub/c.py': 'class C: pass\n',
+            'tests/test_a.py': 'def test(): pass\n',
+        })
+    
+    def test_focus_first_then_sorted_without_duplicates(self):
+        files = package_explorer.get_package_files(self.package, 10, ['sub/c', 'a'])
+        self.assertEqual(
+            [relative for _, relative in files],
+            [os.path.join('pkg', p) for p in ['sub/c.py', 'a.py', '__init__.py', 'b.py', 'sub/__init__.py']]
+        )
+    
+    def test_stops_at_max_files(self):
+        files = package_explorer.get_package_files(self.package, 2)
+        self.assertEqual(len(files), 2)
+    
+    def test_parallel_and_serial_analysis_agree(self):
+        paths = [path for path, _ in package_explorer.get_package_files(self.package, 10)] * 5
+        serial = list(package_explorer.analyze_files(paths, workers=1))
+        parallel = list(package_explorer.analyze_files(paths, workers=2))
+        self.assertEqual(serial, parallel)
+
+
+if __name__ == '__main__':
+    unittest.main()
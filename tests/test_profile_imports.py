@@ -0,0 +1,68 @@
+import os
+import sys
+import unittest
+
+# Add the benchmarks directory to the Python path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'benchmarks')))
+
+import profile_imports
+
+
+def record(cumulative_ms, self_ms=None, cumulative_kb=0.0):
+    return {
+        'self_ms': cumulative_ms if self_ms is None else self_ms,
+        'cumulative_ms': cumulative_ms,
+        'self_kb': cumulative_kb,
+        'cumulative_kb': cumulative_kb,
+    }
+
+
+class TestImportProfile(unittest.TestCase):
+    """Test the import-time profiler"""
+    
+    def test_profiles_a_cold_import(self):
+        result = profile_imports.profile('colorsys', runs=1)
+        self.assertEqual(result['target'], 'colorsys')
+        self.assertIn('colorsys', result['modules'])
+        self.assertGreater(result['modules']['colorsys']['cumulative_ms'], 0)
+        self.assertGreaterEqual(result['total_ms'], result['modules']['colorsys']['cumulative_ms'])
+    
+    def test_failed_import_raises(self):
+        with self.assertRaises(RuntimeError):
+            profile_imports.run_once('module_that_does_not_exist', 'tracemalloc')
+    
+    def test_package_totals(self):
+        totals = profile_imports.package_totals({
+            'litellm': record(900, self_ms=100, cumulative_kb=2048),
+            'litellm.utils': record(50, cumulative_kb=1024),
+            'json': record(2),
+        })
+        self.assertEqual(totals['litellm'], {'self_ms': 150, 'self_kb': 3072, 'modules': 2})
+        self.assertEqual(totals['json']['modules'], 1)
+    
+    def test_diff_against_baseline(self):
+        baseline = {'total_ms': 1000, 'total_kb': 1024, 'modules': {
+            'api': record(1000),
+            'main': record(400),
+            'stable': record(300),
+            'chromadb': record(200),
+            'chromadb.api': record(150),
+        }}
+        current = {'total_ms': 1500, 'total_kb': 4096, 'modules': {
+            'api': record(1500),
+            'main': record(420),
+            'stable': record(303),
+            'torch': record(600),
+            'torch.nn': record(300),
+        }}
+        changes = profile_imports.diff(baseline, current)
+        
+        self.assertEqual((changes['total_ms'], changes['total_kb']), (500, 3072))
+        # 3 ms on stable is noise; 20 ms on main is below 10% of 400 ms
+        self.assertEqual([item['module'] for item in changes['changed']], ['api'])
+        self.assertEqual([item['module'] for item in changes['added']], ['torch'])
+        self.assertEqual([item['module'] for item in changes['removed']], ['chromadb'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,11 @@
+import contextlib
+import json
 import os
 import sys
+import tempfile
+import threading
+import time
+import warnings
 import unittest
 from unittest.mock import patch, MagicMock
 
@@ -7,9 +13,32 @@ from unittest.mock import patch, MagicMock
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 # Import the provider components
-from providers import BaseProvider, ProviderRegistry
+from providers import BaseProvider, ProviderRegistry, make_llm_calls_thread_safe
 from providers.ollama import OllamaProvider
 from providers.gemini import GeminiProvider
+from providers.race import RaceLLM, RaceProvider
+from providers.resilience import ResilientLLM, RetryBudget, wrap_with_policies
+from providers.health import HealthMonitor, LLMHealthRegistry, probe_llm
+from providers.secrets import EnvSource, FileSource, SecretResolver, SecretSourceRegistry, VaultSource, get_secret_resolver
+import crewai.llm
+import litellm
+from crewai import LLM
+
+
+class FakeLLM(LLM):
+    """LLM that answers after a fixed delay without any network access"""
+    
+    def __init__(self, model, answer="answer", delay=0.0, error=None):
+        super().__init__(model=model)
+        self.answer = answer
+        self.delay = delay
+        self.error = error
+    
+    def call(self, messages, tools=None, callbacks=None, available_functions=None):
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return self.answer
 
 
 class TestProviderRegistry(unittest.TestCase):
@@ -142,5 +171,402 @@ class TestGeminiProvider(unittest.TestCase):
         )
 
 
+class TestRaceProvider(unittest.TestCase):
+    """Test speculative execution across several LLMs"""
+    
+    def test_fastest_answer_wins(self):
+        race = RaceProvider.create_llm({'members': [
+            FakeLLM('slow', answer='slow', delay=0.5),
+            FakeLLM('fast', answer='fast', delay=0.01),
+        ]})
+        
+        started = time.perf_counter()
+        self.assertEqual(race.call("hello"), 'fast')
+        self.assertLess(time.perf_counter() - started, 0.4)
+        self.assertEqual(race.stats(), {'slow': 0, 'fast': 1})
+    
+    def test_failures_and_empty_answers_are_skipped(self):
+        race = RaceProvider.create_llm({'members': [
+            FakeLLM('broken', error=ConnectionError("refused")),
+            FakeLLM('empty', answer='  '),
+            FakeLLM('working', answer='ok', delay=0.05),
+        ]})
+        self.assertEqual(race.call("hello"), 'ok')
+    
+    def test_all_members_failing(self):
+        race = RaceProvider.create_llm({'members': [
+            FakeLLM('a', error=ConnectionError("refused")),
+            FakeLLM('b', error=TimeoutError("slow")),
+        ]})
+        with self.assertRaises(RuntimeError):
+            race.call("hello")
+    
+    def test_timeout_covers_the_whole_race(self):
+        """Test that members failing along the way do not extend the timeout"""
+        race = RaceProvider.create_llm({'timeout': 0.3, 'members': [
+            FakeLLM('a', error=ConnectionError("refused"), delay=0.15),
+            FakeLLM('b', error=ConnectionError("refused"), delay=0.25),
+            FakeLLM('hung', delay=1.0),
+        ]})
+        
+        started = time.perf_counter()
+        with self.assertRaises(TimeoutError):
+            race.call("hello")
+        self.assertLess(time.perf_counter() - started, 0.45)
+    
+    def test_stop_words_are_forwarded(self):
+        """Test that stop words set by an agent reach the members but not the originals"""
+        member = FakeLLM('a')
+        race = RaceProvider.create_llm({'members': [member, FakeLLM('b')]})
+        race.stop = ['Observation:']
+        race.call("hello")
+        self.assertEqual(race.members[0].stop, ['Observation:'])
+        self.assertEqual(member.stop, [])
+    
+    def test_invalid_members(self):
+        with self.assertRaises(ValueError):
+            RaceProvider.create_llm({'members': [FakeLLM('only')]})
+        with self.assertRaises(ValueError):
+            RaceProvider.create_llm({'members': ['llama_local', 'gemini_remote']})
+
+
+class FlakyLLM(FakeLLM):
+    """Fails with the given errors before answering"""
+    
+    def __init__(self, model, errors, **kwargs):
+        super().__init__(model, **kwargs)
+        self.errors = list(errors)
+        self.calls = 0
+    
+    def call(self, messages, tools=None, callbacks=None, available_functions=None):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return super().call(messages, tools, callbacks, available_functions)
+
+
+class TestResilientLLM(unittest.TestCase):
+    """Test the retry and hedging wrapper"""
+    
+    def test_transient_errors_are_retried(self):
+        inner = FlakyLLM('flaky', [ConnectionError("reset"), TimeoutError("slow")])
+        llm = ResilientLLM(inner, retry={'max_attempts': 3, 'base_delay': 0.001})
+        self.assertEqual(llm.call("hello"), 'answer')
+        self.assertEqual(inner.calls, 3)
+        self.assertEqual(llm.stats()['retries'], 2)
+    
+    def test_non_transient_errors_are_raised(self):
+        inner = FlakyLLM('flaky', [ValueError("bad request")])
+        llm = ResilientLLM(inner, retry={'base_delay': 0.001})
+        with self.assertRaises(ValueError):
+            llm.call("hello")
+        self.assertEqual(inner.calls, 1)
+    
+    def test_max_attempts(self):
+        inner = FlakyLLM('flaky', [ConnectionError("reset")] * 5)
+        llm = ResilientLLM(inner, retry={'max_attempts': 2, 'base_delay': 0.001})
+        with self.assertRaises(ConnectionError):
+            llm.call("hello")
+        self.assertEqual(inner.calls, 2)
+    
+    def test_retry_budget(self):
+        """Test that an exhausted budget stops retries"""
+        budget = RetryBudget(ratio=0.5, minimum=1)
+        self.assertTrue(budget.withdraw())
+        self.assertFalse(budget.withdraw())
+        budget.deposit()
+        budget.deposit()
+        self.assertTrue(budget.withdraw())
+        
+        inner = FlakyLLM('flaky', [ConnectionError("reset")] * 5)
+        llm = ResilientLLM(inner, retry={'max_attempts': 5, 'base_delay': 0.001, 'budget_min': 1})
+        with self.assertRaises(ConnectionError):
+            llm.call("hello")
+        self.assertEqual(inner.calls, 2)
+        self.assertEqual(llm.stats()['budget_exhausted'], 1)
+    
+    def test_hidden_retries_are_disabled(self):
+        llm = ResilientLLM(FakeLLM('a'), retry={})
+        self.assertEqual(llm.inner.additional_params['max_retries'], 0)
+    
+    def hedged_llm(self, responses):
+        """Warm a hedging LLM up, then answer each call with the next (delay, answer or error)"""
+        inner = FakeLLM('a', delay=0.01)
+        llm = ResilientLLM(inner, retry={'base_delay': 1.0}, hedge={'enabled': True, 'min_samples': 5})
+        for _ in range(5):
+            llm.call("warm up")
+        
+        responses = iter(responses)
+        threads = []
+        def call(*args, **kwargs):
+            delay, answer = next(responses)
+            threads.append(threading.current_thread())
+            time.sleep(delay)
+            if isinstance(answer, Exception):
+                raise answer
+            return answer
+        inner.call = call
+        return llm, threads
+    
+    def test_hedged_request_beats_slow_call(self):
+        """Test that a call slower than the p95 latency is raced by a duplicate"""
+        llm, threads = self.hedged_llm([(1.0, 'primary'), (0.05, 'hedged')])
+        hedge_after = llm.stats()['hedge_after_seconds']
+        started = time.perf_counter()
+        self.assertEqual(llm.call("hello"), 'hedged')
+        elapsed = time.perf_counter() - started
+        # About the hedge delay plus the hedge's own latency
+        self.assertGreaterEqual(elapsed, 0.05)
+        self.assertLess(elapsed, hedge_after + 0.05 + 0.2)
+        self.assertTrue(threads[1].name.startswith('llm-hedge'))
+        self.assertEqual(llm.stats()['hedge_wins'], 1)
+    
+    def test_hedge_stands_in_for_a_failed_call(self):
+        llm, _ = self.hedged_llm([(0.05, ConnectionError("reset")), (0.2, 'hedged')])
+        self.assertEqual(llm.call("hello"), 'hedged')
+        self.assertEqual(llm.stats()['hedge_wins'], 1)
+        self.assertEqual(llm.stats()['retries'], 0)
+    
+    def test_faster_primary_keeps_its_answer(self):
+        llm, threads = self.hedged_llm([(0.05, 'primary'), (0.5, 'hedged')])
+        self.assertEqual(llm.call("hello"), 'primary')
+        self.assertEqual(len(threads), 2)
+        self.assertEqual(llm.stats()['hedges'], 1)
+        self.assertEqual(llm.stats()['hedge_wins'], 0)
+    
+    def test_wrap_with_policies(self):
+        plain = FakeLLM('a')
+        self.assertIs(wrap_with_policies(plain, {}), plain)
+        self.assertIsInstance(wrap_with_policies(plain, {'retry': {'max_attempts': 2}}), ResilientLLM)
+        self.assertTrue(wrap_with_policies(plain, {'hedge': {'percentile': 90}}).hedge_policy['enabled'])
+
+
+def fake_stream(*args, stream=False, **kwargs):
+    """Streamed litellm response with three chunks"""
+    if not stream:
+        raise AssertionError("expected a streaming call")
+    for text in ['1, ', '2, ', '3']:
+        yield MagicMock(choices=[MagicMock(delta=MagicMock(content=text))])
+
+
+class TestLLMHealth(unittest.TestCase):
+    """Test health records and probing"""
+    
+    def test_unhealthy_after_consecutive_failures(self):
+        registry = LLMHealthRegistry(unhealthy_after=2)
+        self.assertTrue(registry.is_available('local'))
+        registry.record_failure('local', "refused")
+        self.assertTrue(registry.is_available('local'))
+        registry.record_failure('local', "refused")
+        self.assertFalse(registry.is_available('local'))
+        registry.record_success('local', {'latency_seconds': 0.1})
+        self.assertTrue(registry.is_available('local'))
+        self.assertEqual(registry.snapshot()['local']['status'], 'healthy')
+    
+    def test_group_available_while_any_member_is(self):
+        registry = LLMHealthRegistry(unhealthy_after=1)
+        registry.set_group('race', ['a', 'b'])
+        registry.record_failure('a', "refused")
+        self.assertTrue(registry.is_available('race'))
+        registry.record_failure('b', "refused")
+        self.assertFalse(registry.is_available('race'))
+        self.assertEqual(registry.snapshot()['race']['status'], 'unhealthy')
+    
+    @patch('providers.health.litellm.completion', side_effect=fake_stream)
+    def test_probe_measures_streaming(self, mock_completion):
+        measurements = probe_llm(FakeLLM('ollama/test'), "Count", max_tokens=8)
+        self.assertTrue(measurements['supports_streaming'])
+        self.assertIsNotNone(measurements['time_to_first_token'])
+        self.assertGreater(measurements['latency_seconds'], 0)
+        self.assertEqual(mock_completion.call_args.kwargs['max_retries'], 0)
+    
+    @patch('providers.health.litellm.completion', side_effect=ConnectionError("refused"))
+    def test_probe_all_records_failures(self, mock_completion):
+        registry = LLMHealthRegistry()
+        
+        def load_llm(name):
+            if name == 'broken_config':
+                raise ValueError("Environment variable 'KEY' not found")
+            return FakeLLM('ollama/test')
+        
+        configs = {
+            'local': {'type': 'ollama'},
+            'broken_config': {'type': 'gemini'},
+            'race': {'type': 'race', 'members': ['local', 'broken_config']},
+        }
+        monitor = HealthMonitor(registry, lambda: configs, load_llm, {'unhealthy_after': 1})
+        monitor.probe_all()
+        
+        records = registry.snapshot()
+        self.assertEqual(records['local']['status'], 'unhealthy')
+        self.assertIn('configuration', records['broken_config']['last_error'])
+        self.assertEqual(records['race']['status'], 'unhealthy')
+        self.assertEqual(records['local']['context_window'], FakeLLM('ollama/test').get_context_window_size())
+    
+    @patch('providers.health.litellm.completion', side_effect=fake_stream)
+    def test_probe_all_skips_unselected_llms(self, mock_completion):
+        registry = LLMHealthRegistry()
+        configs = {'local': {'type': 'ollama'}, 'paid': {'type': 'gemini'}}
+        monitor = HealthMonitor(registry, lambda: configs, lambda name: FakeLLM(f'ollama/{name}'), {'llms': ['local']})
+        monitor.probe_all()
+        
+        self.assertEqual(mock_completion.call_count, 1)
+        self.assertEqual(set(registry.snapshot()), {'local'})
+        self.assertTrue(registry.is_available('paid'))
+
+
+
+class TestSecretResolver(unittest.TestCase):
+    """Test ${VAR} resolution and the secret sources"""
+    
+    def setUp(self):
+        self.vault_path = os.path.join(tempfile.mkdtemp(), 'vault.json')
+        self.write_vault({'API_KEY': 'vault-key', 'HOST': 'vault.local'})
+        self.resolver = SecretResolver([EnvSource(), VaultSource(self.vault_path)], ttl_seconds=60)
+    
+    def write_vault(self, values):
+        with open(self.vault_path, 'w') as f:
+            json.dump(values, f)
+    
+    def test_embedded_nested_and_default_references(self):
+        os.environ['TEST_SECRET_PORT'] = '8080'
+        config = {
+            'base_url': 'http://${HOST}:${TEST_SECRET_PORT}/v1',
+            'headers': {'Authorization': 'Bearer ${API_KEY}'},
+            'fallbacks': ['${MISSING_NAME:-${HOST}}', '${MISSING_NAME:-}'],
+            'template': '$${topic}',
+            'temperature': 0.7,
+        }
+        resolved = self.resolver.resolve(config)
+        self.assertEqual(resolved['base_url'], 'http://vault.local:8080/v1')
+        self.assertEqual(resolved['headers'], {'Authorization': 'Bearer vault-key'})
+        self.assertEqual(resolved['fallbacks'], ['vault.local', ''])
+        self.assertEqual(resolved['template'], '${topic}')
+        self.assertEqual(resolved['temperature'], 0.7)
+        self.assertEqual(config['headers'], {'Authorization': 'Bearer ${API_KEY}'})
+    
+    def test_missing_and_invalid_references(self):
+        with self.assertRaisesRegex(ValueError, "'MISSING_NAME' not found"):
+            self.resolver.resolve({'api_key': '${MISSING_NAME}'})
+        # Defaults are only looked up when they are used
+        self.assertEqual(self.resolver.resolve('${HOST:-${MISSING_NAME}}'), 'vault.local')
+        for text in ('${HOST', '${}', '${HOST:-x'):
+            with self.assertRaises(ValueError):
+                self.resolver.resolve(text)
+    
+    def test_secrets_are_refreshed_after_the_ttl(self):
+        self.assertEqual(self.resolver.resolve('${API_KEY}'), 'vault-key')
+        self.write_vault({'API_KEY': 'rotated-key-value'})
+        self.assertEqual(self.resolver.resolve('${API_KEY}'), 'vault-key')
+        
+        with patch('providers.secrets.time.monotonic', return_value=time.monotonic() + 61):
+            self.assertEqual(self.resolver.resolve('${API_KEY}'), 'rotated-key-value')
+    
+    def test_sources_from_settings(self):
+        directory = tempfile.mkdtemp()
+        with open(os.path.join(directory, 'FILE_SECRET'), 'w') as f:
+            f.write('from-file\n')
+        
+        resolver = get_secret_resolver({'sources': [{'type': 'file', 'directory': directory}]})
+        self.assertIsInstance(resolver.sources[0], FileSource)
+        self.assertEqual(resolver.resolve('${FILE_SECRET}'), 'from-file')
+        self.assertIs(get_secret_resolver(), resolver)
+        with self.assertRaises(ValueError):
+            SecretSourceRegistry.create({'type': 'unknown'})
+        get_secret_resolver({})
+    
+    def test_missing_secrets_are_not_cached(self):
+        resolver = SecretResolver([VaultSource(self.vault_path)], ttl_seconds=0)
+        with self.assertRaises(ValueError):
+            resolver.resolve('${LATE_SECRET}')
+        self.write_vault({'LATE_SECRET': 'provided later'})
+        self.assertEqual(resolver.resolve('${LATE_SECRET}'), 'provided later')
+    
+    def test_pooled_llms_are_resolved_once(self):
+        import config_loader
+        import main
+        
+        config_dir = tempfile.mkdtemp()
+        self.write_vault({'BRACED_KEY': 'abc${X}def', 'GEMINI_HOST': 'http://gateway.local'})
+        files = {
+            'llms.yaml': {
+                'escaped': {'type': 'ollama', 'model': 'ollama/llama3', 'base_url': 'http://h/$${literal}'},
+                'braced': {'type': 'gemini', 'model': 'gemini-1.5-flash', 'api_key': '${BRACED_KEY}',
+                           'api_base': '${GEMINI_HOST}/models/gemini-1.5-flash'},
+            },
+            'agents.yaml': {},
+            'tasks.yaml': {},
+            'settings.yaml': {'secrets': {'sources': [{'type': 'vault', 'path': self.vault_path}]}},
+        }
+        for name, data in files.items():
+            with open(os.path.join(config_dir, name), 'w') as f:
+                json.dump(data, f)
+        
+        with patch.object(config_loader, 'CONFIG_DIR', config_dir):
+            try:
+                self.assertEqual(main.get_pooled_llm('escaped').base_url, 'http://h/${literal}')
+                braced = main.get_pooled_llm('braced')
+                self.assertEqual(braced.api_key, 'abc${X}def')
+                self.assertEqual(braced.api_base, 'http://gateway.local/models/gemini-1.5-flash')
+            finally:
+                get_secret_resolver({})
+
+
+class TestThreadSafeLLMCalls(unittest.TestCase):
+    """crewai's per-call warning suppression from concurrent crews"""
+
+    def setUp(self):
+        # Stands in for crewai's own version, restored afterwards
+        self.stock = contextlib.nullcontext
+        for target, name, value in (
+            (crewai.llm, 'suppress_warnings', self.stock),
+            (litellm, 'suppress_debug_info', False),
+        ):
+            patcher = patch.object(target, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_only_installed_where_calls_run_concurrently(self):
+        ResilientLLM(LLM(model='ollama/llama3'), hedge={'enabled': False})
+        self.assertIs(crewai.llm.suppress_warnings, self.stock)
+
+        ResilientLLM(LLM(model='ollama/llama3'), hedge={'enabled': True})
+        self.assertIsNot(crewai.llm.suppress_warnings, self.stock)
+        self.assertTrue(litellm.suppress_debug_info)
+
+    def test_races_install_it(self):
+        RaceLLM([LLM(model='ollama/llama3'), LLM(model='ollama/mistral')])
+        self.assertIsNot(crewai.llm.suppress_warnings, self.stock)
+
+    def test_streams_are_left_alone(self):
+        make_llm_calls_thread_safe()
+        stdout, stderr = sys.stdout, sys.stderr
+        with crewai.llm.suppress_warnings():
+            self.assertIs(sys.stdout, stdout)
+            self.assertIs(sys.stderr, stderr)
+
+    def test_overlapping_calls_restore_the_filters(self):
+        make_llm_calls_thread_safe()
+        filters = list(warnings.filters)
+        first_in, second_out = threading.Event(), threading.Event()
+
+        def first():
+            with crewai.llm.suppress_warnings():
+                first_in.set()
+                second_out.wait(5)
+
+        thread = threading.Thread(target=first)
+        thread.start()
+        first_in.wait(5)
+        # Leaves while the first call is still in flight
+        with crewai.llm.suppress_warnings():
+            pass
+        self.assertEqual(warnings.filters[0][0], 'ignore')
+        second_out.set()
+        thread.join(5)
+
+        self.assertEqual(warnings.filters, filters)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,214 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import yaml
+
+# Keep crewai's telemetry off the network
+os.environ.setdefault('OTEL_SDK_DISABLED', 'true')
+
+# Add the project root directory to the Python path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import config_loader
+import main
+from api import run_crew_job
+from crewai import LLM
+from executor import CrewExecutor
+from providers import make_llm_calls_thread_safe
+from tests.mock_backend import MockLLMBackend, mock_llm_configs
+
+# Every completion from the mock backend takes this long, so parallel and
+# serial execution are easy to tell apart
+LATENCY = 0.3
+# Upper bounds with plenty of headroom for slow CI machines
+CONSTRUCTION_BUDGET = 5.0   # seconds to build every configured LLM
+CREW_OVERHEAD_BUDGET = 10.0  # seconds of crewai work per crew beyond LLM latency
+
+PROJECT_CONFIG_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', config_loader.CONFIG_DIR))
+
+backend = None
+config_dir = None
+original_config_dir = None
+
+
+def read_project_config(name):
+    with open(os.path.join(PROJECT_CONFIG_DIR, name), 'r') as f:
+        return yaml.safe_load(f) or {}
+
+
+def write_config(name, data):
+    with open(os.path.join(config_dir, name), 'w') as f:
+        yaml.safe_dump(data, f)
+
+
+def setUpModule():
+    """
+    Run the project's configuration against a local mock backend.
+
+    llms.yaml, agents.yaml and tasks.yaml are copied to a temporary config
+    directory with endpoints pointed at the mock; settings turn off the
+    background health probes, the semantic cache and checkpoints.
+    """
+    global backend, config_dir, original_config_dir
+    # LLMs are called from several threads here, as the API and batch runner do
+    make_llm_calls_thread_safe()
+    backend = MockLLMBackend(latency=LATENCY).start()
+    config_dir = tempfile.mkdtemp()
+
+    write_config('llms.yaml', mock_llm_configs(read_project_config('llms.yaml'), backend.url))
+    write_config('tasks.yaml', read_project_config('tasks.yaml'))
+    write_config('agents.yaml', mock_agent_configs(read_project_config('agents.yaml'), backend.url, config_dir))
+
+    write_config('settings.yaml', {
+        'semantic_cache': {'enabled': False},
+        'llm_health': {'enabled': False},
+        'checkpoints': {'enabled': False},
+    })
+
+    original_config_dir = config_loader.CONFIG_DIR
+    config_loader.CONFIG_DIR = config_dir
+
+
+def tearDownModule():
+    config_loader.CONFIG_DIR = original_config_dir
+    backend.stop()
+    shutil.rmtree(config_dir, ignore_errors=True)
+
+
+def mock_agent_configs(agent_configs, url, data_dir):
+    """Turn on configured agent memory, with embedders pointed at the mock backend and files in data_dir"""
+    for name, agent in agent_configs.items():
+        memory = agent.get('memory')
+        if not isinstance(memory, dict):
+            continue
+        memory['enabled'] = True
+        embedder = memory.setdefault('embedder', {'provider': 'ollama', 'config': {}})
+        embedder.setdefault('config', {})['url'] = f'{url}/api/embeddings'
+        if memory.get('path'):
+            memory['path'] = os.path.join(data_dir, f'{name}-memory')
+        if (memory.get('embedding_cache') or {}).get('path'):
+            memory['embedding_cache']['path'] = os.path.join(data_dir, f'{name}-embeddings.db')
+    return agent_configs
+
+
+def configured_llms():
+    return list(config_loader.get_config_snapshot().llms)
+
+
+class TestProviderConstruction(unittest.TestCase):
+    """Build every LLM in llms.yaml through the real providers"""
+
+    def test_every_configured_llm_builds(self):
+        names = configured_llms()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(names)) as pool:
+            llms = dict(zip(names, pool.map(main.get_pooled_llm, names)))
+        elapsed = time.perf_counter() - start
+
+        for name, llm in llms.items():
+            with self.subTest(llm=name):
+                self.assertIsInstance(llm, LLM)
+                self.assertTrue(llm.model)
+        self.assertLess(elapsed, CONSTRUCTION_BUDGET)
+
+    def test_llms_are_pooled(self):
+        name = configured_llms()[0]
+        self.assertIs(main.get_pooled_llm(name), main.get_pooled_llm(name))
+
+
+class TestMockedCalls(unittest.TestCase):
+    """Every configured LLM answers through its real wire format"""
+
+    def setUp(self):
+        backend.reset()
+
+    def test_calls_run_in_parallel(self):
+        names = configured_llms()
+        messages = [{'role': 'user', 'content': 'Count from 1 to 3.'}]
+
+        # Build the pool and warm up each client first (the OpenAI one
+        # takes about a second on first use) so only the calls are timed
+        llms = {name: main.get_pooled_llm(name) for name in names}
+        for llm in llms.values():
+            llm.call(messages)
+        backend.reset()
+
+        def call(name):
+            return llms[name].call(messages)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(names)) as pool:
+            answers = dict(zip(names, pool.map(call, names)))
+        elapsed = time.perf_counter() - start
+
+        for name, answer in answers.items():
+            with self.subTest(llm=name):
+                self.assertIn('Mock answer', answer)
+        # Each wire format was exercised and the calls overlapped
+        self.assertTrue({'ollama', 'gemini', 'openai'} <= set(backend.routes()))
+        self.assertGreaterEqual(backend.max_concurrency(), 2)
+        self.assertGreaterEqual(elapsed, LATENCY)
+        self.assertLess(elapsed, LATENCY * len(backend.requests))
+
+
+class TestCrewExecution(unittest.TestCase):
+    """Run full crews on the API's executor against the mock backend"""
+
+    def setUp(self):
+        backend.reset()
+
+    def test_crews_run_in_parallel_per_llm(self):
+        # The harness turns on the writer's memory, so this also covers
+        # memory saves and task evaluation from concurrent crews
+        self.assertTrue(main.crew_memory_kwargs(config_loader.get_config_snapshot().agents))
+        names = configured_llms()
+        executor = CrewExecutor(max_workers=len(names), max_queue=0)
+        self.addCleanup(executor.shutdown)
+
+        start = time.perf_counter()
+        futures = {
+            name: executor.submit(run_crew_job, {'topic': f'mock topic {i}', 'llm_name': name, 'variables': {}})
+            for i, name in enumerate(names)
+        }
+        runs = {name: future.result(timeout=120) for name, future in futures.items()}
+        elapsed = time.perf_counter() - start
+
+        task_count = len(config_loader.get_config_snapshot().tasks)
+        for name, run in runs.items():
+            with self.subTest(llm=name):
+                self.assertEqual(run.llm_name, name)
+                self.assertIn('Mock answer', run.output.raw)
+                self.assertEqual(len(run.output.tasks_output), task_count)
+                self.assertLess(run.duration, LATENCY * 2 * task_count + CREW_OVERHEAD_BUDGET)
+        self.assertIn('embed', backend.routes())
+        # Crews overlapped: the batch took less than running them one by one
+        self.assertGreaterEqual(backend.max_concurrency(), 2)
+        self.assertLess(elapsed, sum(run.duration for run in runs.values()))
+
+    def test_crew_runs_without_memory_when_the_embedder_is_unreachable(self):
+        agents = config_loader.get_config_snapshot().agents
+        memory = dict(agents['writer']['memory'], path=None, embedding_cache={'max_entries': 10})
+        # Nothing listens on port 9 here, so every embedding request fails
+        memory['embedder'] = {'provider': 'ollama', 'config': {'model': 'nomic-embed-text', 'url': 'http://127.0.0.1:9/api/embeddings'}}
+        kwargs = main.crew_memory_kwargs({'writer': {'memory': memory}})
+        self.assertTrue(kwargs)
+
+        with mock.patch('main.crew_memory_kwargs', return_value=kwargs), self.assertLogs(level='ERROR') as logs:
+            run = run_crew_job({'topic': 'mock topic offline', 'llm_name': configured_llms()[0], 'variables': {}})
+
+        # Memory lookups failed and were logged, but the crew finished
+        self.assertTrue(any('search' in line for line in logs.output))
+
+        self.assertIn('Mock answer', run.output.raw)
+        self.assertEqual(len(run.output.tasks_output), len(config_loader.get_config_snapshot().tasks))
+        self.assertNotIn('embed', backend.routes())
+
+
+if __name__ == '__main__':
+    unittest.main()
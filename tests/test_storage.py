@@ -0,0 +1,337 @@
+import importlib.util
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+# Add the project root directory to the Python path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from storage import VectorIndex, CachedEmbedder, SemanticCache
+from storage.semantic_cache import normalize_topic
+
+
+def fake_embedder(texts):
+    """Deterministic embedding: letter counts of the lowercased text"""
+    vectors = []
+    for text in texts:
+        vector = [0.0] * 26
+        for char in text.lower():
+            if 'a' <= char <= 'z':
+                vector[ord(char) - ord('a')] += 1.0
+        vectors.append(vector)
+    return vectors
+
+
+class TestVectorIndex(unittest.TestCase):
+    """Test the bounded vector index"""
+
+    def test_search_orders_by_similarity(self):
+        index = VectorIndex(max_entries=10)
+        index.add('x', [1.0, 0.0, 0.0], 'x-payload')
+        index.add('y', [0.0, 1.0, 0.0], 'y-payload')
+        index.add('xy', [1.0, 1.0, 0.0], 'xy-payload')
+
+        hits = index.search([1.0, 0.1, 0.0], limit=2)
+        self.assertEqual([key for key, _, _ in hits], ['x', 'xy'])
+        self.assertEqual(hits[0][2], 'x-payload')
+
+    def test_min_score(self):
+        index = VectorIndex(max_entries=10)
+        index.add('x', [1.0, 0.0])
+        index.add('y', [0.0, 1.0])
+        hits = index.search([1.0, 0.0], limit=5, min_score=0.5)
+        self.assertEqual([key for key, _, _ in hits], ['x'])
+
+    def test_fifo_eviction(self):
+        """Test that the oldest entry is evicted when the index is full"""
+        index = VectorIndex(max_entries=2, eviction='fifo')
+        index.add('a', [1.0, 0.0])
+        index.add('b', [0.0, 1.0])
+        index.search([1.0, 0.0], limit=1)
+        evicted = index.add('c', [1.0, 1.0])
+        self.assertEqual(evicted, ['a'])
+        self.assertEqual(len(index), 2)
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted"""
+        index = VectorIndex(max_entries=2, eviction='lru')
+        index.add('a', [1.0, 0.0])
+        index.add('b', [0.0, 1.0])
+        index.search([1.0, 0.0], limit=1)
+        evicted = index.add('c', [1.0, 1.0])
+        self.assertEqual(evicted, ['b'])
+        self.assertIn('a', index)
+
+    def test_replace_existing_key(self):
+        index = VectorIndex(max_entries=2)
+        index.add('a', [1.0, 0.0], 'old')
+        index.add('a', [0.0, 1.0], 'new')
+        self.assertEqual(len(index), 1)
+        self.assertEqual(index.search([0.0, 1.0], limit=1)[0][2], 'new')
+
+    def test_dimension_mismatch(self):
+        index = VectorIndex(max_entries=2)
+        index.add('a', [1.0, 0.0])
+        with self.assertRaises(ValueError):
+            index.add('b', [1.0, 0.0, 0.0])
+
+    @unittest.skipUnless(importlib.util.find_spec('hnswlib'), 'hnswlib is not installed')
+    def test_hnsw_matches_flat_after_replacements(self):
+        """Test that replaced and evicted slots keep hnsw hits pointing at the right keys"""
+        flat = VectorIndex(max_entries=4)
+        hnsw = VectorIndex(max_entries=4, index='hnsw')
+        words = ['alpha', 'beta', 'gamma', 'delta', 'alpha', 'epsilon', 'beta', 'zeta', 'alpha']
+        for position, (word, vector) in enumerate(zip(words, fake_embedder(words))):
+            for index in (flat, hnsw):
+                index.add(word, vector, f'{word}-{position}')
+        hnsw.remove('zeta')
+        flat.remove('zeta')
+
+        self.assertEqual(len(hnsw), len(flat))
+        for word, vector in zip(words, fake_embedder(words)):
+            if word not in flat:
+                continue
+            key, _, payload = hnsw.search(vector, limit=1)[0]
+            self.assertEqual((key, payload), (word, flat.get(word)))
+            self.assertEqual({hit[0] for hit in hnsw.search(vector, limit=4)}, {hit[0] for hit in flat.search(vector, limit=4)})
+
+    def test_invalid_settings(self):
+        with self.assertRaises(ValueError):
+            VectorIndex(max_entries=0)
+        with self.assertRaises(ValueError):
+            VectorIndex(eviction='random')
+
+
+class TestCachedEmbedder(unittest.TestCase):
+    """Test the two-tier embedding cache"""
+
+    def test_repeated_texts_are_embedded_once(self):
+        calls = []
+
+        def counting_embedder(texts):
+            calls.append(list(texts))
+            return fake_embedder(texts)
+
+        embedder = CachedEmbedder(counting_embedder, max_entries=10)
+        first = embedder(['alpha', 'beta', 'alpha'])
+        second = embedder(['beta', 'gamma'])
+
+        self.assertEqual(calls, [['alpha', 'beta'], ['gamma']])
+        self.assertEqual(first[1], second[0])
+        self.assertEqual(first[0], first[2])
+        self.assertEqual(embedder.stats()['misses'], 3)
+
+    def test_disk_tier_survives_restart(self):
+        """Test that persisted embeddings are reused by a new cache instance"""
+        calls = []
+
+        def counting_embedder(texts):
+            calls.append(list(texts))
+            return fake_embedder(texts)
+
+        path = os.path.join(tempfile.mkdtemp(), 'embeddings.db')
+        CachedEmbedder(counting_embedder, path=path, namespace='test:model')(['alpha'])
+        restarted = CachedEmbedder(counting_embedder, path=path, namespace='test:model')
+        vector = restarted(['alpha'])[0]
+
+        self.assertEqual(calls, [['alpha']])
+        self.assertEqual(vector, fake_embedder(['alpha'])[0])
+        self.assertEqual(restarted.stats()['disk_hits'], 1)
+
+    def test_namespaces_do_not_collide(self):
+        """Test that different embedding models never share cached vectors"""
+        path = os.path.join(tempfile.mkdtemp(), 'embeddings.db')
+        CachedEmbedder(fake_embedder, path=path, namespace='model-a')(['alpha'])
+        other = CachedEmbedder(fake_embedder, path=path, namespace='model-b')
+        other(['alpha'])
+        self.assertEqual(other.stats()['disk_hits'], 0)
+
+
+class TestSemanticCache(unittest.TestCase):
+    """Test the topic-level result cache"""
+
+    def test_normalize_topic(self):
+        self.assertEqual(normalize_topic("  Quantum   Computing! "), "quantum computing")
+
+    def test_exact_and_similar_hits(self):
+        cache = SemanticCache(fake_embedder, similarity_threshold=0.9)
+        cache.store("Quantum computing", "scope", {'result': 'article'})
+
+        payload, score = cache.lookup("quantum computing?", "scope")
+        self.assertEqual(payload, {'result': 'article'})
+        self.assertEqual(score, 1.0)
+
+        # Same letters, different order: similar enough for the fake embedder
+        payload, score = cache.lookup("computing quantum", "scope")
+        self.assertEqual(payload, {'result': 'article'})
+
+        self.assertIsNone(cache.lookup("marine biology", "scope"))
+        self.assertEqual(cache.stats()['hits'], 2)
+        self.assertEqual(cache.stats()['exact_hits'], 1)
+        self.assertEqual(cache.stats()['misses'], 1)
+
+    def test_scope_must_match(self):
+        """Test that results for another LLM or configuration are never served"""
+        cache = SemanticCache(fake_embedder)
+        cache.store("quantum computing", "llm-a", {'result': 'a'})
+        self.assertIsNone(cache.lookup("quantum computing", "llm-b"))
+
+    def test_expired_entries_miss(self):
+        cache = SemanticCache(fake_embedder, ttl_seconds=60)
+        with mock.patch('storage.semantic_cache.time.time', return_value=0.0):
+            cache.store("quantum computing", "scope", {'result': 'old'})
+        self.assertIsNone(cache.lookup("quantum computing", "scope"))
+        self.assertEqual(len(cache.index), 0)
+
+    def test_embedding_failure_is_a_miss(self):
+        def failing_embedder(texts):
+            raise ConnectionError("embedder unreachable")
+
+        cache = SemanticCache(failing_embedder)
+        cache.store("quantum computing", "scope", {'result': 'article'})
+        self.assertIsNone(cache.lookup("quantum computing", "scope"))
+        self.assertEqual(cache.stats()['errors'], 2)
+
+    def test_persisted_results_survive_restart(self):
+        path = os.path.join(tempfile.mkdtemp(), 'semantic_cache.db')
+        SemanticCache(fake_embedder, path=path).store("quantum computing", "scope", {'result': 'article'})
+        restarted = SemanticCache(fake_embedder, path=path)
+        payload, _ = restarted.lookup("Quantum computing", "scope")
+        self.assertEqual(payload, {'result': 'article'})
+
+
+class TestJobStore(unittest.TestCase):
+    """Test the hand-over queue between processes"""
+
+    def test_claim_all_empties_the_store(self):
+        from storage.jobs import JobStore
+
+        store = JobStore(os.path.join(tempfile.mkdtemp(), 'jobs.db'))
+        store.add({'topic': 'first'})
+        store.add({'topic': 'second', 'variables': {'audience': 'developers'}})
+
+        self.assertEqual(len(store), 2)
+        self.assertEqual(
+            store.claim_all(),
+            [{'topic': 'first'}, {'topic': 'second', 'variables': {'audience': 'developers'}}],
+        )
+        self.assertEqual(store.claim_all(), [])
+
+
+class TestCheckpointStore(unittest.TestCase):
+    """Test per-request task checkpoints"""
+
+    def test_save_load_and_clear(self):
+        from storage.checkpoints import CheckpointStore, request_fingerprint
+
+        store = CheckpointStore(os.path.join(tempfile.mkdtemp(), 'checkpoints.db'))
+        fingerprint = request_fingerprint('ai', 'llama_local', {'audience': 'developers'}, 'config')
+        store.save(fingerprint, 1, 'write_task', {'raw': 'article'})
+        store.save(fingerprint, 0, 'research_task', {'raw': 'research'})
+
+        checkpoints = store.load(fingerprint)
+        self.assertEqual([checkpoint['task_name'] for checkpoint in checkpoints], ['research_task', 'write_task'])
+        self.assertEqual(checkpoints[0]['output'], {'raw': 'research'})
+        self.assertEqual(store.load(request_fingerprint('ai', 'gemini_remote', {}, 'config')), [])
+
+        store.clear(fingerprint)
+        self.assertEqual(store.load(fingerprint), [])
+
+    def test_fingerprint_ignores_variable_order(self):
+        from storage.checkpoints import request_fingerprint
+
+        self.assertEqual(
+            request_fingerprint('ai', 'llm', {'a': '1', 'b': '2'}, 'config'),
+            request_fingerprint('ai', 'llm', {'b': '2', 'a': '1'}, 'config'),
+        )
+        self.assertNotEqual(
+            request_fingerprint('ai', 'llm', {}, 'config'),
+            request_fingerprint('ai', 'llm', {}, 'changed config'),
+        )
+
+
+class TestResultStore(unittest.TestCase):
+    """Test the indexed result store and its keyset pagination"""
+
+    def setUp(self):
+        from storage.results import ResultStore
+
+        self.store = ResultStore(os.path.join(tempfile.mkdtemp(), 'results.db'))
+        self.ids = []
+        for i, (topic, llm_name) in enumerate([('AI', 'llama_local'), ('ai', 'gemini_remote'), ('robots', 'llama_local')] * 3):
+            with mock.patch('storage.results.time.time', return_value=1000.0 + i):
+                self.ids.append(self.store.add(topic, llm_name, 'config', {'round': str(i)}, {'result': f'article {i}'}))
+
+    def test_newest_first_with_filters(self):
+        records, cursor = self.store.query(topic='ai', llm_name='llama_local')
+        self.assertEqual([record['response']['result'] for record in records], ['article 6', 'article 3', 'article 0'])
+        self.assertEqual(records[0]['variables'], {'round': '6'})
+        self.assertIsNone(cursor)
+
+        records, _ = self.store.query(since=1007.0)
+        self.assertEqual([record['id'] for record in records], self.ids[:-3:-1])
+        records, _ = self.store.query(config_version='other')
+        self.assertEqual(records, [])
+
+    def test_pages_cover_every_result_once(self):
+        pages, cursor = [], None
+        while True:
+            records, cursor = self.store.query(limit=4, after=cursor)
+            pages.append([record['id'] for record in records])
+            if cursor is None:
+                break
+        self.assertEqual([len(page) for page in pages], [4, 4, 1])
+        self.assertEqual(sum(pages, []), self.ids[::-1])
+
+        exported = [record['id'] for record in self.store.export(batch_size=2, topic='robots')]
+        self.assertEqual(exported, self.ids[8::-3])
+
+    def test_cursor_outlives_its_row(self):
+        records, cursor = self.store.query(limit=4)
+        # The page's last row expires before the next page is requested
+        with sqlite3.connect(self.store.path) as conn:
+            conn.execute("DELETE FROM results WHERE id = ?", (records[-1]['id'],))
+
+        records, _ = self.store.query(limit=4, after=cursor)
+        self.assertEqual([record['id'] for record in records], self.ids[4:0:-1])
+
+        with self.assertRaises(ValueError):
+            self.store.query(after='42')
+
+
+class TestBoundedMemoryStorage(unittest.TestCase):
+    """Test the crewai memory storage adapter"""
+
+    def test_save_search_and_reload(self):
+        """Test that entries are searchable and survive a restart when persisted"""
+        from storage.memory import BoundedMemoryStorage
+
+        path = tempfile.mkdtemp()
+        storage = BoundedMemoryStorage('short_term', fake_embedder, max_entries=2, path=path)
+        storage.save("aaaa", {'agent': 'writer'})
+        storage.save("bbbb", {})
+        storage.save("abab", {})
+
+        results = storage.search("aaab", limit=5, score_threshold=0.1)
+        self.assertEqual([result['context'] for result in results], ["abab", "bbbb"])
+
+        reloaded = BoundedMemoryStorage('short_term', fake_embedder, max_entries=2, path=path)
+        self.assertEqual(len(reloaded.index), 2)
+        self.assertEqual(reloaded.search("bbbb", limit=1)[0]['context'], "bbbb")
+
+    def test_normalize_memory_config(self):
+        from storage.memory import normalize_memory_config, MEMORY_DEFAULTS
+
+        self.assertIsNone(normalize_memory_config(False))
+        self.assertEqual(normalize_memory_config(True), MEMORY_DEFAULTS)
+        self.assertEqual(normalize_memory_config({'max_entries': 5})['max_entries'], 5)
+        self.assertIsNone(normalize_memory_config({'enabled': False}))
+        with self.assertRaises(ValueError):
+            normalize_memory_config({'backend': 'unknown'})
+
+
+if __name__ == '__main__':
+    unittest.main()